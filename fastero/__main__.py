@@ -1,4 +1,6 @@
+import sys
+
 from .core import app
 
 if __name__ == "__main__":
-    app()
+    sys.exit(app())
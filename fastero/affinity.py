@@ -0,0 +1,109 @@
+"""Module for pinning the timing loop to CPUs and raising its priority, used by ``--cpu`` and ``--isolate``."""
+
+import os
+import threading
+from typing import Optional, Set, Tuple
+
+from .environment import parse_cpu_list
+
+# The CPUs the other threads (e.g. the progress bar) are moved to with --isolate
+_other_cpus: Optional[Set[int]] = None
+
+
+def affinity_supported() -> bool:
+    """Get whether the CPU affinity can be set on this platform (only on Linux)."""
+    return hasattr(os, "sched_setaffinity")
+
+
+def choose_cpus(cpu: Optional[str]) -> Tuple[Set[int], Set[int]]:
+    """
+    Choose the CPUs to run the timing loop on.
+
+    Parameters
+    ----------
+    cpu : Optional[str]
+        The CPUs in the format used by the kernel, e.g. ``3`` or ``2-3``. If it's
+        not given, the last CPU this process can run on is used
+
+    Returns
+    -------
+    Tuple[Set[int], Set[int]]
+        The CPUs for the timing loop and the rest of the CPUs this process can run on
+
+    Raises
+    ------
+    ValueError
+        If the CPUs can't be parsed or this process isn't allowed to run on them
+    """
+    available = os.sched_getaffinity(0)
+    if cpu:
+        try:
+            cpus = set(parse_cpu_list(cpu))
+        except ValueError:
+            raise ValueError(f"{cpu!r} is not a valid list of CPUs") from None
+        if not cpus:
+            raise ValueError(f"{cpu!r} is not a valid list of CPUs")
+    else:
+        cpus = {max(available)}
+    unavailable = cpus - available
+    if unavailable:
+        raise ValueError(
+            f"fastero can't run on the CPUs {', '.join(map(str, sorted(unavailable)))}, "
+            f"the available CPUs are {', '.join(map(str, sorted(available)))}"
+        )
+    return cpus, available - cpus
+
+
+def pin_timing_loop(cpus: Set[int], other_cpus: Optional[Set[int]] = None):
+    """
+    Pin the current thread, which runs the timing loop, to the given CPUs.
+
+    Threads and processes started by it (e.g. the commands of ``--shell``) inherit
+    the affinity. If ``other_cpus`` is given, :func:`move_other_threads` moves the
+    rest of the threads to them.
+    """
+    global _other_cpus
+
+    # On Linux, 0 is the calling thread and not the whole process
+    os.sched_setaffinity(0, cpus)
+    _other_cpus = other_cpus or None
+
+
+def move_other_threads():
+    """Move every thread but the current one to the other CPUs, if they were given to :func:`pin_timing_loop`."""
+    if not _other_cpus:
+        return
+    current = threading.get_ident()
+    for thread in threading.enumerate():
+        if thread.ident == current or thread.native_id is None:
+            continue
+        try:
+            os.sched_setaffinity(thread.native_id, _other_cpus)
+        except OSError:
+            # The thread finished in the meantime
+            pass
+
+
+def raise_priority() -> Optional[int]:
+    """
+    Raise the priority of the current thread as much as it is permitted.
+
+    Unprivileged users can usually only lower the priority, unless ``RLIMIT_NICE``
+    allows more (e.g. set in ``/etc/security/limits.conf``).
+
+    Returns
+    -------
+    Optional[int]
+        The new niceness, None if the priority couldn't be raised
+    """
+    if not hasattr(os, "setpriority"):
+        return None
+    current = os.getpriority(os.PRIO_PROCESS, 0)
+    # Try the highest priority first and go down until one is permitted
+    for niceness in range(-20, current):
+        try:
+            os.setpriority(os.PRIO_PROCESS, 0, niceness)
+        except PermissionError:
+            continue
+        return niceness
+    return None
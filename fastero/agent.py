@@ -0,0 +1,314 @@
+"""Module for running benchmarks on other machines, using agents that listen on a TCP port."""
+
+import json
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import rich_click as click
+from rich import box
+from rich.table import Table
+
+from .utils import choose_unit, format_snippet, mean_or_min
+
+DEFAULT_PORT = 8760
+# The command line flag of each option that can be set per benchmark
+OPTION_FLAGS = {
+    "warmup": "--warmup",
+    "runs": "--runs",
+    "min_runs": "--min-runs",
+    "max_runs": "--max-runs",
+    "total_time": "--total-time",
+    "time_per_batch": "--time-per-batch",
+    "input": "--input",
+    "input_pool": "--input-pool",
+}
+
+
+class AgentError(Exception):
+    """An agent couldn't be reached or replied with an error."""
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """
+    Parse an address in the format ``HOST:PORT`` or ``HOST``, which uses the default port.
+
+    IPv6 addresses need brackets to be given a port, e.g. ``[::1]:8760``, an address
+    with more than one colon and no brackets (e.g. ``::1``) is a host without a port.
+    """
+    if address.startswith("["):
+        host, _, port = address[1:].partition("]")
+        if not port:
+            return host, DEFAULT_PORT
+        if not port.startswith(":"):
+            raise click.BadParameter(f"{address!r} is not in the format [HOST]:PORT", param_hint="--agent")
+        port = port[1:]
+    elif address.count(":") > 1:
+        return address, DEFAULT_PORT
+    else:
+        host, separator, port = address.rpartition(":")
+        if not separator:
+            return port, DEFAULT_PORT
+    try:
+        return host, int(port)
+    except ValueError:
+        raise click.BadParameter(f"{address!r} is not in the format HOST:PORT", param_hint="--agent")
+
+
+def job_arguments(job: dict) -> List[str]:
+    """Get the arguments to run the benchmark of a job with ``fastero --json``."""
+    benchmark = job["benchmark"]
+    arguments = [
+        sys.executable, "-m", "fastero", "--json", "--no-check-system",
+        "--snippet-name", benchmark["snippet_name"], "--setup", benchmark["setup"],
+    ]
+    for option, value in benchmark.get("options", {}).items():
+        if value is not None and option in OPTION_FLAGS:
+            # The times are in seconds
+            value = f"{value}s" if option in ("total_time", "time_per_batch") else str(value)
+            arguments += [OPTION_FLAGS[option], value]
+    if job.get("shell"):
+        arguments += ["--shell", "--shell-program", job.get("shell_program") or "default"]
+        if job.get("prepare"):
+            arguments += ["--prepare", job["prepare"]]
+    if job.get("cpu"):
+        arguments += ["--cpu", job["cpu"]]
+    if job.get("isolate"):
+        arguments.append("--isolate")
+    if job.get("latency"):
+        arguments.append("--latency")
+    # The code may start with a dash, so it comes after "--"
+    return arguments + ["--", benchmark["snippet_code"]]
+
+
+def run_job(job: dict) -> dict:
+    """
+    Run the benchmark of a job in a fresh interpreter.
+
+    Returns
+    -------
+    dict
+        A reply with the ``type`` "result" and the ``result`` including the raw samples,
+        or the ``type`` "error" and a ``message``
+    """
+    process = subprocess.run(job_arguments(job), stdin=subprocess.DEVNULL, capture_output=True, text=True)
+    if process.returncode != 0:
+        return {"type": "error", "message": process.stderr.strip() or f"fastero exited with {process.returncode}"}
+    try:
+        return {"type": "result", "result": json.loads(process.stdout)["results"][0]}
+    except (ValueError, KeyError, IndexError):
+        return {"type": "error", "message": f"Could not read the result: {process.stdout[:200]!r}"}
+
+
+class AgentHandler(socketserver.StreamRequestHandler):
+    """Handle a connection from a coordinator, which sends a JSON request per line."""
+
+    def handle(self):
+        from .environment import collect_environment
+
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                break
+            if self.server.token and request.get("token") != self.server.token:
+                self.reply({"type": "error", "message": "Invalid token"})
+                break
+            if request.get("type") == "info":
+                self.reply({"type": "info", "name": self.server.name, "environment": collect_environment()})
+            elif request.get("type") == "job":
+                self.server.log(f"Running [cyan]{request['benchmark']['snippet_name']}[/]")
+                self.reply(run_job(request))
+            else:
+                self.reply({"type": "error", "message": f"Unknown request type {request.get('type')!r}"})
+
+    def reply(self, data: dict):
+        self.wfile.write(json.dumps(data).encode() + b"\n")
+        self.wfile.flush()
+
+
+class AgentServer(socketserver.TCPServer):
+    """
+    A server that runs the benchmarks sent by coordinators.
+
+    Connections are handled one at a time so the benchmarks of different coordinators
+    don't slow each other down.
+    """
+
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int], name: str, token: Optional[str] = None, log: Callable = print):
+        self.name = name
+        self.token = token
+        self.log = log
+        super().__init__(address, AgentHandler)
+
+
+class AgentConnection:
+    """A connection from the coordinator to an agent."""
+
+    def __init__(self, address: str, token: Optional[str] = None, timeout: Optional[float] = None):
+        self.address = address
+        self.token = token
+        try:
+            self.socket = socket.create_connection(parse_address(address), timeout=timeout)
+        except OSError as e:
+            raise AgentError(f"Could not connect to the agent {address}: {e}") from None
+        self.file = self.socket.makefile("rwb")
+
+    def request(self, data: dict) -> dict:
+        """Send a request and wait for the reply."""
+        try:
+            self.file.write(json.dumps({**data, "token": self.token}).encode() + b"\n")
+            self.file.flush()
+            reply = self.file.readline()
+        except OSError as e:
+            raise AgentError(f"Lost the connection to the agent {self.address}: {e}") from None
+        if not reply:
+            raise AgentError(f"The agent {self.address} closed the connection")
+        reply = json.loads(reply)
+        if reply["type"] == "error":
+            raise AgentError(f"The agent {self.address} replied with an error: {reply['message']}")
+        return reply
+
+    def close(self):
+        """Close the connection."""
+        self.file.close()
+        self.socket.close()
+
+
+def run_on_agents(
+    benchmarks: List[dict], agents: List[str], job_options: dict, token: Optional[str] = None,
+    callback: Callable[[str, dict], None] = None,
+) -> Dict[str, dict]:
+    """
+    Run every benchmark on every agent, the agents run at the same time.
+
+    Parameters
+    ----------
+    benchmarks : List[dict]
+        The benchmarks to run, as loaded from a suite or the command line
+    agents : List[str]
+        The addresses of the agents in the format ``HOST:PORT``
+    job_options : dict
+        The options sent with every job, e.g. ``shell`` and ``cpu``. ``prepare`` is
+        a list with the prepare command of each benchmark
+    token : Optional[str], optional
+        The token the agents were started with, by default None
+    callback : Callable[[str, dict], None], optional
+        Called with the address and the result every time an agent finishes a benchmark
+
+    Returns
+    -------
+    Dict[str, dict]
+        The ``name``, ``environment``, ``results`` and ``error`` (None if every benchmark
+        finished) of every agent, by address
+    """
+    for address in agents:
+        # Check the addresses before connecting to any agent
+        parse_address(address)
+    machines = {address: {"name": address, "environment": None, "results": [], "error": None} for address in agents}
+
+    def run_agent(address: str):
+        machine = machines[address]
+        try:
+            connection = AgentConnection(address, token)
+            try:
+                info = connection.request({"type": "info"})
+                machine["name"], machine["environment"] = info["name"], info["environment"]
+                for index, benchmark in enumerate(benchmarks):
+                    prepare = job_options.get("prepare") or [None]
+                    job = {**job_options, "prepare": prepare[index] if len(prepare) > 1 else prepare[0]}
+                    result = connection.request({"type": "job", "benchmark": benchmark, **job})["result"]
+                    machine["results"].append(result)
+                    if callback is not None:
+                        callback(address, result)
+            finally:
+                connection.close()
+        except AgentError as e:
+            machine["error"] = str(e)
+
+    threads = [threading.Thread(target=run_agent, args=(address,), daemon=True) for address in agents]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return machines
+
+
+def machine_labels(machines: Dict[str, dict]) -> Dict[str, str]:
+    """Get a unique label for every machine, its name or its name and address if several agents have the same name."""
+    names = [machine["name"] for machine in machines.values()]
+    return {
+        address: machine["name"] if names.count(machine["name"]) == 1 else f"{machine['name']} ({address})"
+        for address, machine in machines.items()
+    }
+
+
+def make_matrix_table(
+    benchmarks: List[dict], machines: Dict[str, dict], labels: Dict[str, str], time_unit: str = "dynamic",
+    code_theme: str = "one-dark",
+) -> Table:
+    """
+    Generate a table with the mean time of every benchmark (rows) on every machine (columns).
+
+    The fastest run is shown instead of the mean for the results without enough data to calculate it.
+    """
+    table = Table("Benchmark", box=box.SIMPLE_HEAD, title="Results per machine", title_justify="left", title_style="b")
+    for address in machines:
+        table.add_column(labels[address], justify="right")
+    for index, benchmark in enumerate(benchmarks):
+        means = [
+            mean_or_min(machine["results"][index]) if index < len(machine["results"]) else None
+            for machine in machines.values()
+        ]
+        fastest = min((mean for mean in means if mean is not None), default=None)
+        cells = []
+        for machine, mean in zip(machines.values(), means):
+            if mean is None:
+                cells.append("[red]failed[/]")
+                continue
+            result = machine["results"][index]
+            style = "green b" if mean == fastest and len(machines) > 1 else "green"
+            stddev = choose_unit(result["stddev"], unit=time_unit) if result["stddev"] != -1 else "?"
+            cells.append(f"[{style}]{choose_unit(mean, unit=time_unit)}[/] ± {stddev}")
+        table.add_row(format_snippet(benchmark, code_theme=code_theme, replace_newlines=True), *cells)
+    return table
+
+
+@click.command()
+@click.option("--host", "-H", metavar="HOST", default="127.0.0.1", show_default=True, help="The address to listen on, use 0.0.0.0 to accept connections from other machines") # noqa
+@click.option("--port", "-P", metavar="PORT", default=DEFAULT_PORT, show_default=True, type=click.IntRange(min=0, max=65535), help="The TCP port to listen on") # noqa
+@click.option("--name", metavar="NAME", default=None, help="The name of this machine in the results, by default its hostname") # noqa
+@click.option("--token", metavar="TOKEN", envvar="FASTERO_AGENT_TOKEN", default=None, help="Only run the benchmarks of coordinators that use the same ``--agent-token``. Can also be set with the FASTERO_AGENT_TOKEN environment variable") # noqa
+@click.help_option('-h', '--help')
+def agent(host, port, name, token):
+    """
+    Run benchmarks sent by a coordinator, a `fastero --agent HOST:PORT` run on another machine.
+
+    The agent runs every benchmark in a fresh interpreter and sends back the results with the raw samples.
+    **Anyone who can connect to the agent can run any code on this machine**, so only listen on other addresses
+    than localhost on trusted networks and use `--token`.
+    """
+    from .core import alt_console
+
+    if host not in ("127.0.0.1", "localhost", "::1") and not token:
+        alt_console.print(
+            "[u yellow]Warning:[/] The agent accepts connections from other machines without a token, "
+            "anyone who can connect to it can run any code on this machine"
+        )
+    try:
+        server = AgentServer((host, port), name or socket.gethostname(), token, log=alt_console.print)
+    except OSError as e:
+        alt_console.print(f"[red b]Error:[/] Could not listen on [cyan]{host}:{port}[/]: {e}")
+        raise click.exceptions.Exit(1)
+    alt_console.print(f"[cyan]Info:[/] Listening on [green]{host}:{server.server_address[1]}[/], press Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
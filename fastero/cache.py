@@ -0,0 +1,118 @@
+"""Module for timing snippets with cold CPU caches, used by ``--cache cold``."""
+
+import timeit
+from time import perf_counter_ns
+from typing import List, Tuple
+
+from rich import box
+from rich.table import Table
+
+from .utils import choose_unit, mean_or_min
+
+# The size of the eviction buffer when the size of the CPU caches can't be found
+DEFAULT_BUFFER_SIZE = 64 * 1024 ** 2
+
+# Like the template of timeit, but every run is timed on its own and the CPU caches are filled with
+# other data before it by copying a buffer bigger than them. The copy happens before reading the
+# clock, so it is not part of the measurement
+TEMPLATE = """
+def inner(_it, _timer, _evict, _source{init}):
+    {setup}
+    _times = []
+    for _i in _it:
+        _evict[:] = _source
+        _t0 = _timer()
+        {stmt}
+        _t1 = _timer()
+        _times.append(_t1 - _t0)
+    return _times
+"""
+
+
+def default_buffer_size() -> int:
+    """Get the size of the eviction buffer, the size of the biggest CPU cache or 64 MB if it can't be found."""
+    from .environment import cpu_cache_size
+
+    return cpu_cache_size() or DEFAULT_BUFFER_SIZE
+
+
+class ColdTimer:
+    """
+    A timer that evicts the CPU caches before every run of the snippet.
+
+    Before each run a buffer of ``buffer_size`` bytes is copied into another one,
+    which reads and writes twice the size of the buffer and pushes the data and
+    code of the snippet out of the caches, so every run starts with cold caches
+    like the first call of a function in a real program usually does.
+    """
+
+    def __init__(self, stmt="pass", setup="pass", buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """
+        Compile the timing loop.
+
+        Parameters
+        ----------
+        stmt : Union[str, Callable], optional
+            The code to time, or a callable to call, by default "pass"
+        setup : str, optional
+            The code executed once before every batch, by default "pass"
+        buffer_size : int, optional
+            The size of the buffer copied before every run in bytes, by default 64 MB
+        """
+        self.timer = perf_counter_ns
+        local_ns = {}
+        global_ns = {}
+        init = ""
+        if callable(stmt):
+            local_ns["_stmt"] = stmt
+            init = ", _stmt=_stmt"
+            stmt = "_stmt()"
+        self.src = TEMPLATE.format(stmt=timeit.reindent(stmt, 8), setup=timeit.reindent(setup, 4), init=init)
+        exec(compile(self.src, timeit.dummy_src_name, "exec"), global_ns, local_ns)
+        self.inner = local_ns["inner"]
+        # Filled with non-zero bytes so the pages are really allocated
+        self.source = bytearray(b"\x01") * buffer_size
+        self.evict = bytearray(buffer_size)
+
+    def time_runs(self, number: int) -> List[int]:
+        """
+        Run the snippet ``number`` times, evicting the caches before each run.
+
+        Returns
+        -------
+        List[int]
+            The time of every run in nanoseconds
+        """
+        return self.inner(range(number), self.timer, self.evict, self.source)
+
+    def print_exc(self, file=None):
+        """Print the traceback of an exception raised by the snippet, see :meth:`timeit.Timer.print_exc`."""
+        timeit.Timer.print_exc(self, file)
+
+
+def make_cache_table(pairs: List[Tuple[dict, dict]], time_unit: str = "dynamic") -> Table:
+    """
+    Generate a table with the mean time of every snippet with hot and cold caches.
+
+    Parameters
+    ----------
+    pairs : List[Tuple[dict, dict]]
+        The hot and the cold result of every snippet
+    """
+    table = Table(
+        "Snippet", "Hot cache", "Cold cache", "Cold / hot",
+        box=box.SIMPLE_HEAD,
+        title="Hot compared to cold CPU caches",
+        title_justify="left",
+        title_style="b",
+    )
+    for hot, cold in pairs:
+        # Results without enough data to calculate the mean use the fastest run instead
+        hot_mean, cold_mean = mean_or_min(hot), mean_or_min(cold)
+        table.add_row(
+            f"[cyan]{hot['snippet_name']}[/]",
+            f"[green]{choose_unit(hot_mean, unit=time_unit)}[/]",
+            f"[blue]{choose_unit(cold_mean, unit=time_unit)}[/]",
+            f"[yellow]{cold_mean / hot_mean:.2f}x[/]" if hot_mean > 0 else "-",
+        )
+    return table
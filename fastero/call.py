@@ -0,0 +1,129 @@
+"""Module for benchmarking callables by their import path."""
+
+import functools
+import importlib
+import os
+import sys
+from typing import Any, Callable
+
+import rich_click as click
+
+from .utils import TIME_FORMAT_UNITS, Time
+
+
+def resolve_import_path(import_path: str, param_hint: str = "TARGETS") -> Any:
+    """
+    Import the object at an import path such as ``package.module:function`` or ``package.module:Class.method``.
+
+    The current directory is added to the module search path, the same as ``python -m``.
+    """
+    module_name, _, attributes = import_path.partition(":")
+    if not module_name or not attributes:
+        raise click.BadParameter(
+            f"{import_path!r} is not in the format module:attribute, e.g. app.codec:encode", param_hint=param_hint
+        )
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    try:
+        obj = importlib.import_module(module_name)
+    except ImportError as e:
+        raise click.BadParameter(f"Could not import {module_name!r}: {e}", param_hint=param_hint)
+    for attribute in attributes.split("."):
+        try:
+            obj = getattr(obj, attribute)
+        except AttributeError:
+            raise click.BadParameter(f"{import_path!r} does not exist", param_hint=param_hint)
+    return obj
+
+
+def make_arguments(factory: Callable[[], Any] = None):
+    """
+    Build the arguments for the call using a factory.
+
+    The factory can return a tuple of positional arguments, an ``(args, kwargs)``
+    pair of a tuple and a dict to also pass keyword arguments, or any other object
+    to be used as the only positional argument.
+
+    Returns
+    -------
+    Tuple[tuple, dict]
+        The positional and the keyword arguments
+    """
+    if factory is None:
+        return (), {}
+    arguments = factory()
+    if (
+        isinstance(arguments, tuple) and len(arguments) == 2
+        and isinstance(arguments[0], tuple) and isinstance(arguments[1], dict)
+    ):
+        return arguments
+    if isinstance(arguments, tuple):
+        return arguments, {}
+    return (arguments,), {}
+
+
+def bind_call(function: Callable, args: tuple = (), kwargs: dict = None) -> Callable[[], Any]:
+    """
+    Make a callable that calls function with the arguments already bound.
+
+    This is a :func:`functools.partial`, which is implemented in C and stores the
+    arguments itself, so calling it adds no Python frame of its own and the
+    overhead of the call stays as low as possible.
+    """
+    if not args and not kwargs:
+        return function
+    return functools.partial(function, *args, **(kwargs or {}))
+
+
+@click.command()
+@click.argument("TARGETS", nargs=-1, required=True)
+@click.option("--args-from", "-a", metavar="MODULE:FACTORY", default=None, help="Build the arguments by calling FACTORY once before benchmarking. It can return a tuple of positional arguments, an (args, kwargs) pair to also pass keyword arguments or any other object to use as the only argument") # noqa
+@click.option("--snippet-name", "-n", metavar="NAME", multiple=True, help="Give a meaningful name to a target. This can be specified multiple times if several targets are benchmarked.") # noqa
+@click.option("--warmup", "-w", metavar="NUM", type=click.IntRange(min=1), help="Perform NUM warmup runs before the actual benchmark") # noqa
+@click.option("--total-time", "-t", metavar="TIME", default="3s", show_default=True, type=Time(), help="How long to test each target for, specifying ``--runs`` overrides this") # noqa
+@click.option("--time-per-batch", "-b", metavar="TIME", default="200ms", show_default=True, type=Time(), help="How long each test batch will last for") # noqa
+@click.option("--runs", "-r", metavar="NUM", type=click.IntRange(min=1), help="Perform exactly NUM runs for each target") # noqa
+@click.option("--min-runs", "-m", metavar="NUM", default=2, show_default=True, type=click.IntRange(min=1), help="Perform at least NUM runs for each target") # noqa
+@click.option("--max-runs", "-M", metavar="NUM", type=click.IntRange(min=1), help="Perform at most NUM runs for each target, by default unlimited") # noqa
+@click.option("--time-unit", "-u", metavar="UNIT", default="dynamic", show_default=True, type=click.Choice(TIME_FORMAT_UNITS, case_sensitive=False), help="Set the time unit to be used. Possible values: ns, us, ms, s, dynamic") # noqa
+@click.option("--code-theme", "-c", default="one-dark", show_default=True, metavar="THEME_NAME", help="Theme for the code output") # noqa
+@click.option("--export-json", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Export the timing summary statistics as JSON to the given FILE") # noqa
+@click.help_option('-h', '--help')
+def call(
+    targets, args_from, snippet_name, warmup, total_time, time_per_batch, runs, min_runs, max_runs, time_unit,
+    code_theme, export_json
+):
+    """
+    Benchmark calling each callable in **TARGETS**, given by import path e.g. `app.codec:encode`.
+
+    Each target is imported once and called through a functools.partial with the arguments already bound, so the
+    measurement doesn't include compiling a statement or looking up names.
+    """
+    from .core import console, alt_console, run_benchmark, print_summary
+
+    factory = resolve_import_path(args_from, param_hint="--args-from") if args_from else None
+    try:
+        args, kwargs = make_arguments(factory)
+    except Exception:
+        alt_console.print(f"[red b]Error:[/] Calling the factory [cyan]{args_from}[/] failed")
+        alt_console.print_exception()
+        raise click.exceptions.Exit(1)
+    arguments = f"{args_from}()" if args_from else ""
+
+    results = []
+    for index, target in enumerate(targets):
+        function = resolve_import_path(target)
+        if not callable(function):
+            raise click.BadParameter(f"{target!r} is not callable", param_hint="TARGETS")
+        name = snippet_name[index] if index < len(snippet_name) else target
+        results.append(
+            run_benchmark(
+                f"{target}({arguments})", name, "pass", warmup=warmup, runs=runs, min_runs=min_runs,
+                max_runs=max_runs, total_time=total_time, time_per_batch=time_per_batch, time_unit=time_unit,
+                code_theme=code_theme, stmt=bind_call(function, args, kwargs),
+            )
+        )
+    if len(results) > 1:
+        print_summary(console.exporter.snippets, code_theme)
+    if export_json:
+        console.exporter.export_json(export_json)
@@ -0,0 +1,69 @@
+"""Module for saving the results as soon as each snippet finishes, so interrupted runs can be resumed."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+from .incremental import IncrementalCache
+
+
+class Checkpoint:
+    """
+    A JSON Lines file with a line for every finished snippet.
+
+    Every line is written and synced to the disk as soon as the snippet finishes, so
+    at most the snippet that was running is lost if fastero is killed. A line that
+    was cut off while being written is ignored when resuming.
+    """
+
+    def __init__(self, filename, resume: bool = False):
+        """
+        Open the checkpoint file.
+
+        Parameters
+        ----------
+        filename : Union[str, Path]
+            The location of the checkpoint file
+        resume : bool, optional
+            Whether to load the results already in the file and add to them, by
+            default False, which starts a new file
+        """
+        self.filename = Path(filename)
+        self.results = {}
+        if resume and self.filename.exists():
+            with open(self.filename, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.results[entry["key"]] = entry["result"]
+        self.file = open(self.filename, "a" if resume else "w", encoding="utf-8")
+
+    @staticmethod
+    def key(benchmark: dict) -> str:
+        """
+        Hash everything that affects the results of a benchmark and its name.
+
+        Unlike :meth:`IncrementalCache.key`, the name is included so that the same code
+        benchmarked under different names is measured once for every name.
+        """
+        data = IncrementalCache.key(benchmark) + benchmark["snippet_name"]
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Get the result of a snippet that already finished, or None if it didn't."""
+        return self.results.get(key)
+
+    def add(self, key: str, result: dict):
+        """Write the result of a snippet that finished to the file."""
+        self.results[key] = result
+        self.file.write(json.dumps({"key": key, "result": result}) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        """Close the checkpoint file."""
+        self.file.close()
@@ -0,0 +1,163 @@
+"""Module for comparing results against a saved baseline."""
+
+import re
+from statistics import mean
+from typing import List
+
+import rich_click as click
+from rich import box
+from rich.table import Table
+
+from .utils import TIME_FORMAT_UNITS, choose_unit, compare_samples, mean_or_min
+
+# The name snippets get when they aren't given one with --snippet-name
+default_name_regex = re.compile(r"Benchmark \d+")
+
+
+def is_default_name(name: str) -> bool:
+    """Check whether a snippet name is the default ``Benchmark N`` and not one given by the user."""
+    return default_name_regex.fullmatch(name) is not None
+
+
+def load_results(filename) -> List[dict]:
+    """Load the results from a JSON file exported by fastero, with the samples from its ``.npy`` file if it has one."""
+    from .samples import load_export
+
+    return load_export(filename)["results"]
+
+
+def _samples(result: dict) -> List[float]:
+    """Get the raw samples of a result, falling back to the statistics for older exports."""
+    if result.get("timings"):
+        return result["timings"]
+    # Exports without raw samples only have the statistics, use the mean if there was
+    # enough data to calculate it and the fastest run otherwise
+    return [mean_or_min(result)]
+
+
+def match_results(baseline: List[dict], current: List[dict]):
+    """
+    Match the current results to the baseline results.
+
+    Snippets are matched by name, except the ones with the default name
+    (``Benchmark N``) which are matched by their code instead.
+
+    Returns
+    -------
+    List[Tuple[Optional[dict], dict]]
+        A list of (baseline result, current result) pairs, the baseline
+        result is None if there is no matching snippet in the baseline
+    """
+    by_name = {result["snippet_name"]: result for result in baseline}
+    by_code = {result["snippet_code"]: result for result in baseline}
+    pairs = []
+    for result in current:
+        name = result["snippet_name"]
+        if name and not is_default_name(name) and name in by_name:
+            pairs.append((by_name[name], result))
+        else:
+            pairs.append((by_code.get(result["snippet_code"]), result))
+    return pairs
+
+
+def compare_results(baseline: List[dict], current: List[dict], threshold: float = 0.05, confidence: float = 0.95):
+    """
+    Compare the current results with the baseline results.
+
+    A snippet is considered a regression if it is slower by more than ``threshold``
+    and the slowdown is statistically significant, meaning the lower bound of the
+    confidence interval of the change is above zero.
+
+    Parameters
+    ----------
+    baseline : List[dict]
+        The results of the baseline, as exported by :meth:`Exporter.export_json`
+    current : List[dict]
+        The current results, in the same format
+    threshold : float, optional
+        The relative slowdown to tolerate, by default 0.05 (5%)
+    confidence : float, optional
+        The confidence level for the confidence intervals, by default 0.95
+
+    Returns
+    -------
+    List[dict]
+        One comparison per current result, with the keys ``baseline``, ``current``,
+        ``change``, ``low``, ``high`` and ``status`` (one of ``"new"``, ``"regression"``,
+        ``"improvement"`` or ``"unchanged"``)
+    """
+    comparisons = []
+    for base, result in match_results(baseline, current):
+        comparison = {"baseline": base, "current": result, "change": None, "low": None, "high": None}
+        if base is None:
+            comparison["status"] = "new"
+        else:
+            change, low, high = compare_samples(_samples(base), _samples(result), confidence=confidence)
+            comparison.update(change=change, low=low, high=high)
+            if change > threshold and low > 0:
+                comparison["status"] = "regression"
+            elif change < -threshold and high < 0:
+                comparison["status"] = "improvement"
+            else:
+                comparison["status"] = "unchanged"
+        comparisons.append(comparison)
+    return comparisons
+
+
+def print_comparison(console, comparisons: List[dict], time_unit: str = "dynamic", confidence: float = 0.95):
+    """Print the comparisons as a table."""
+    styles = {"regression": "red b", "improvement": "green b", "unchanged": "dim", "new": "cyan"}
+    table = Table(
+        "Snippet", "Baseline", "Current", "Change", f"{confidence:.0%} CI", "Status",
+        box=box.SIMPLE_HEAD,
+        title="Comparison with baseline",
+    )
+    for comparison in comparisons:
+        base, result = comparison["baseline"], comparison["current"]
+        if base is None:
+            table.add_row(result["snippet_name"], "-", choose_unit(mean(_samples(result)), unit=time_unit), "-", "-",
+                          f"[{styles['new']}]new[/]")
+            continue
+        table.add_row(
+            result["snippet_name"],
+            choose_unit(mean(_samples(base)), unit=time_unit),
+            choose_unit(mean(_samples(result)), unit=time_unit),
+            f"{comparison['change']:+.2%}",
+            f"{comparison['low']:+.2%} … {comparison['high']:+.2%}",
+            f"[{styles[comparison['status']]}]{comparison['status']}[/]",
+        )
+    console.print(table)
+
+
+def check_regressions(console, comparisons: List[dict], threshold: float):
+    """Print a message about the regressions and return whether there were any."""
+    regressions = [i for i in comparisons if i["status"] == "regression"]
+    if regressions:
+        console.print(
+            f"[red b]Error:[/] {len(regressions)} snippet(s) are more than {threshold:.0%} slower than the baseline"
+        )
+    return bool(regressions)
+
+
+@click.command()
+@click.argument("BASELINE", type=click.Path(exists=True, dir_okay=False, resolve_path=True, readable=True))
+@click.argument("CURRENT", type=click.Path(exists=True, dir_okay=False, resolve_path=True, readable=True))
+@click.option("--threshold", "-t", metavar="PERCENT", default=5.0, show_default=True, type=click.FloatRange(min=0), help="Fail if a snippet is slower than the baseline by more than PERCENT percent") # noqa
+@click.option("--confidence", metavar="LEVEL", default=0.95, show_default=True, type=click.FloatRange(min=0, max=1, min_open=True, max_open=True), help="The confidence level used for the confidence intervals") # noqa
+@click.option("--time-unit", "-u", metavar="UNIT", default="dynamic", show_default=True, type=click.Choice(TIME_FORMAT_UNITS, case_sensitive=False), help="Set the time unit to be used. Possible values: ns, us, ms, s, dynamic") # noqa
+@click.help_option('-h', '--help')
+def compare(baseline, current, threshold, confidence, time_unit):
+    """
+    Compare the results in **CURRENT** with the ones in **BASELINE**.
+
+    Both files need to be JSON files exported by fastero. Exits with a non-zero exit code if any snippet is
+    significantly slower than the baseline by more than the threshold.
+    """
+    from .core import console
+
+    comparisons = compare_results(
+        load_results(baseline), load_results(current), threshold=threshold / 100, confidence=confidence
+    )
+    print_comparison(console, comparisons, time_unit=time_unit, confidence=confidence)
+    if check_regressions(console, comparisons, threshold / 100):
+        raise click.exceptions.Exit(1)
@@ -1,10 +1,10 @@
 """Core file for fastero."""
 import os
-import statistics
+import sys
 
 from pathlib import Path
 from math import floor, ceil
-from typing import List, Optional, Union
+from typing import Any, Callable, List, Optional, Union
 
 import rich
 import rich_click as click
@@ -16,10 +16,13 @@
 
 from .__init__ import __version__ as VERSION
 from .utils import (MofNCompleteColumn, StatefulColumn, Time, TIME_FORMAT_UNITS,
-                    get_code_input, choose_unit, format_snippet, make_bar_plot,
-                    _Timer as Timer, factors
+                    get_code_input, choose_unit, format_snippet, make_bar_plot, make_histogram_plot, make_sparkline,
+                    _Timer as Timer, factors, autorange, calculate_batches, compute_statistics, MIN_HISTOGRAM_SAMPLES,
+                    is_file_directive, read_file_directive, mean_or_min
                     )
 from .exporter import Exporter
+from .affinity import move_other_threads
+from .results import Result
 
 
 # Help command formatting configuration
@@ -39,7 +42,8 @@
         {
             "name": "General",
             "options": ["--warmup", "--time-unit", "--snippet-name", "--code-theme", "--from-json",
-                        "--quiet", "--json", "--version", "--help"],
+                        "--suite", "--keyword", "--quiet", "--json", "--jsonl", "--jsonl-batches", "--version",
+                        "--help"],
         },
         {
             "name": "Runs",
@@ -47,19 +51,67 @@
         },
         {
             "name": "Execution",
-            "options": ["--setup", "--total-time", "--time-per-batch"],
+            "options": ["--setup", "--total-time", "--time-per-batch", "--incremental", "--incremental-file",
+                        "--checkpoint", "--resume", "--check-system", "--cpu", "--isolate", "--latency",
+                        "--input", "--input-pool", "--cache", "--cache-buffer"],
+        },
+        {
+            "name": "Shell",
+            "options": ["--shell", "--shell-program", "--prepare"],
+        },
+        {
+            "name": "Profiling",
+            "options": ["--profile", "--line-profile", "--profile-runs", "--profile-top"],
+        },
+        {
+            "name": "Agents",
+            "options": ["--agent", "--agent-token"],
+        },
+        {
+            "name": "Comparing",
+            "options": ["--baseline", "--threshold", "--history", "--history-file"],
         },
         {
             "name": "Exporting",
-            "options": ["--export-json", "--export-csv", "--export-yaml", "--export-markdown", "--export-svg",
-                        "--export-asciidoc", "--export-plot", "--label-format", "--dark-background", "--bar-color",
-                        "--export-html", "--export-image", "--background", "--selenium-browser", "--watermark",
-                        "--only-export"]
+            "options": ["--export-json", "--npy-samples", "--export-jsonl", "--export-csv", "--export-yaml",
+                        "--export-markdown", "--export-svg", "--export-asciidoc", "--export-plot", "--label-format",
+                        "--dark-background", "--bar-color", "--export-html", "--export-image", "--image-renderer",
+                        "--image-font", "--background", "--selenium-browser", "--watermark", "--only-export"]
         }
     ]
 )
 
 
+class FasteroCommand(click.RichCommand):
+    """The fastero command, which also dispatches ``fastero <subcommand>`` to the subcommands."""
+
+    # The name of each subcommand and the "module:attribute" it's in.
+    # These are imported lazily to keep the startup time low
+    subcommands = {
+        "compare": ".compare:compare",
+        "history": ".history:history",
+        "call": ".call:call",
+        "import-time": ".importtime:import_time",
+        "agent": ".agent:agent",
+        "merge": ".merge:merge",
+        "revisions": ".revisions:revisions",
+    }
+
+    def main(self, args=None, prog_name=None, **extra):
+        """Run the subcommand if the first argument is the name of one, otherwise run fastero itself."""
+        if args is None:
+            args = sys.argv[1:]
+        if args and args[0] in self.subcommands:
+            from importlib import import_module
+
+            module_name, attribute = self.subcommands[args[0]].split(":")
+            command = getattr(import_module(module_name, __package__), attribute)
+            # Click only detects the program name inside main, so use the name of the installed command
+            prog_name = f"{prog_name or 'fastero'} {args[0]}"
+            return command.main(list(args[1:]), prog_name=prog_name, **extra)
+        return super().main(args, prog_name, **extra)
+
+
 def autorange_callback(n, t):
     """Show the number currently being tried by autorange in the autorange progress bar."""
     console.stateful_data[0] = f"(trying [magenta]{n}[/])"
@@ -93,14 +145,575 @@ def set_prompt_toolkit_color():
 set_prompt_toolkit_color()
 # Defining an infinity constant
 INFINITY = float('inf')
+# Cache for the number of runs in one batch, keyed by (snippet code, setup code)
+_autorange_cache = {}
+
+
+def print_setup(setup: str, code_theme: str):
+    """Print the setup code in a panel."""
+    console.print(
+        Panel(
+            Syntax(
+                setup, 'python',
+                theme=code_theme,
+                code_width=65,
+                indent_guides=True,
+                line_numbers=True,
+                word_wrap=True
+            ),
+            title="Setup code",
+            border_style='dim',
+            expand=False,
+        )
+    )
+
+
+def print_snippet_header(snippet_name: str, snippet_code: str, code_theme: str, lexer: str = "python"):
+    """Print the snippet name and code with syntax highlighting."""
+    console.print(
+        f"[b]{snippet_name}[/]:",
+        Syntax('', lexer, theme=code_theme).highlight(snippet_code),
+        sep=" ",
+        end=""
+    )
+
+
+def print_statistics(result: dict, time_unit: str):
+    """Print the statistics of a result."""
+    # Format all the statistics (add units such as ns, ms, s)
+    # The mean and the standard deviation are -1 if there weren't enough batches to calculate them
+    formatted_mean = choose_unit(result['mean'], unit=time_unit) if result['mean'] != -1 else "?"
+    formatted_stddev = choose_unit(result['stddev'], unit=time_unit) if result['stddev'] != -1 else "?"
+    formatted_min = choose_unit(result['min'], unit=time_unit)
+    formatted_max = choose_unit(result['max'], unit=time_unit)
+
+    # Figure out which statistic takes the highest width
+    # This is going to be used for padding
+    highest_width = max(len(i) for i in (formatted_mean, formatted_stddev, formatted_min, formatted_max))
+
+    console.print(
+        f"  Time  ([green b]mean[/] ± [green]σ[/]):       "
+        f"[green b]{formatted_mean.rjust(highest_width)}[/] ± [green]{formatted_stddev.rjust(highest_width)}[/]"
+    )
+    console.print(
+        f"  Range ([cyan b]min[/]  … [magenta]max[/]):     "
+        f"[cyan b]{formatted_min.rjust(highest_width)}[/] … [magenta]{formatted_max.rjust(highest_width)}[/]" +
+        f"    " + f"[bright_black]\[runs: {int(result['runs']):,}][/]"
+    )
+    if result['mean'] == -1:
+        alt_console.print(
+            "  [bright_black](only one batch, increase --total-time or --runs to calculate the mean and σ)[/]"
+        )
+    if result.get('p50') is not None:
+        console.print(
+            "  Latency ([yellow]p50[/] … [red]p99.9[/]):  " +
+            " … ".join(
+                f"[{style}]{choose_unit(result[key], unit=time_unit)}[/]"
+                for key, style in (("p50", "yellow"), ("p90", "yellow"), ("p99", "red"), ("p999", "red"))
+            ) +
+            f"    [bright_black]\[max: {choose_unit(result['max_latency'], unit=time_unit)}][/]"
+        )
+    # Show how the batch timings are distributed, this makes bimodal timings visible
+    timings = result.get('timings')
+    if timings is not None and len(timings) >= MIN_HISTOGRAM_SAMPLES:
+        console.print(
+            "  Distribution:           ",
+            make_sparkline(timings, ascii_only=console.options.ascii_only),
+            sep=""
+        )
+
+
+def _ratio(time: float, fastest_time: float) -> str:
+    """Format how many times slower ``time`` is than ``fastest_time``, "-" if the fastest took no time at all."""
+    return str(round(time / fastest_time, 2)) if fastest_time > 0 else "-"
+
 
+def print_summary(all_snippets: List[dict], code_theme: str):
+    """Print a bar chart and a comparison of all the snippets."""
+    console.print("\n[b]Summary[/]:")
+    # Generate a bar plot of all the snippets
+    plot = make_bar_plot(
+        labels=[format_snippet(i, code_theme=code_theme, replace_newlines=True) for i in all_snippets],
+        amounts=[i["min"] for i in all_snippets],
+        ascii_only=console.options.ascii_only
+    )
+    # Simulate a console with 500 width, used to get max bar chart size
+    # This is needed because the text is truncated in less wide consoles
+    # And measuring the size with the current console [options] will
+    # Get the size after truncating the text, I don't want that
+    opts = console.options.copy()
+    opts.size = (500, 500)
+    opts.min_width, opts.max_width = (0, 500)
+    # Get the size needed to print the plot
+    plot_size = console.measure(plot, options=opts)
+    # Print the plot if there it sufficient space
+    if console.width > plot_size.minimum:
+        console.print(plot)
+    else:
+        alt_console.print("[u yellow]Warning:[/] Bar Chart not printed due to insufficient console width")
 
-@click.command()
+    # Generate a histogram of the timings of all the snippets on the same scale
+    with_timings = [
+        i for i in all_snippets if i.get("timings") is not None and len(i["timings"]) >= MIN_HISTOGRAM_SAMPLES
+    ]
+    if len(with_timings) > 1:
+        histogram = make_histogram_plot(
+            labels=[format_snippet(i, code_theme=code_theme, replace_newlines=True) for i in with_timings],
+            timings=[i["timings"] for i in with_timings],
+            ascii_only=console.options.ascii_only
+        )
+        if console.width > console.measure(histogram, options=opts).minimum:
+            console.print(histogram)
+        else:
+            alt_console.print("[u yellow]Warning:[/] Distribution not printed due to insufficient console width")
+
+    fastest_snippet = min(all_snippets, key=mean_or_min)
+    console.print(" ", format_snippet(fastest_snippet, code_theme=code_theme, replace_newlines=True), "is the fastest.")
+    for code_snippet in all_snippets:
+        if code_snippet == fastest_snippet:
+            continue
+        console.print(
+            f"    [b green]{_ratio(mean_or_min(code_snippet), mean_or_min(fastest_snippet))}[/] "
+            f"([cyan]{_ratio(code_snippet['min'], fastest_snippet['min'])}[/] …"
+            f" [magenta]{_ratio(code_snippet['max'], fastest_snippet['max'])}[/])"
+            " times faster than",
+            format_snippet(code_snippet, code_theme=code_theme)
+        )
+
+
+def run_benchmark(
+    code_snippet: str,
+    snippet_name: str,
+    setup: str,
+    warmup: Optional[int],
+    runs: Optional[int],
+    min_runs: int,
+    max_runs: Optional[int],
+    total_time: float,
+    time_per_batch: float,
+    time_unit: str,
+    code_theme: str,
+    stmt: Optional[Callable[[], Any]] = None,
+    latency: bool = False,
+    input: Optional[str] = None,
+    input_pool: int = 1000,
+) -> Result:
+    """
+    Benchmark a single snippet while showing a progress bar, then print and record its statistics.
+
+    If ``stmt`` is given, that callable is timed instead of compiling ``code_snippet``,
+    which is then only used to display and record the snippet.
+
+    If ``latency`` is used, every iteration is timed on its own and recorded in a
+    :class:`~fastero.histogram.LatencyHistogram`, and the percentiles of the iteration
+    times and the histogram are recorded too.
+
+    If ``input`` is given, in the format ``NAME=EXPRESSION``, a new input is made for
+    every run before each batch is timed, see :class:`~fastero.pool.PoolTimer`. A batch
+    has at most ``input_pool`` runs, since all of its inputs are kept in memory.
+
+    Returns
+    -------
+    Result
+        The result as added to the exporter
+    """
+    if input:
+        from .pool import PoolTimer
+
+        timer = PoolTimer(stmt=code_snippet if stmt is None else stmt, setup=setup, input=input)
+    elif latency:
+        from .latency import LatencyTimer
+
+        # Reading the clock for every iteration makes them slower, so the amount of runs is found with this timer too
+        timer = LatencyTimer(stmt=code_snippet if stmt is None else stmt, setup=setup)
+    else:
+        timer = Timer(stmt=code_snippet if stmt is None else stmt, setup=setup)
+
+    print_snippet_header(snippet_name, code_snippet, code_theme)
+
+    with Progress(
+        TextColumn(''),  # Indentation
+        SpinnerColumn(),  # Spinner
+        TextColumn("[progress.description]{task.description}"),  # Task Description
+        StatefulColumn(console),  # Stateful data
+        BarColumn(),  # Progress Bar
+        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),  # Task Percentage
+        MofNCompleteColumn(),  # "Done/Total"
+        TextColumn("[cyan]ETA[/]"),  # ETA Text
+        TimeRemainingColumn(),  # ETA Value
+        console=alt_console,  # Not shown in exported output, and keeps stdout clean for --json/--jsonl
+        transient=True,  # Remove it after it's finished
+    ) as progress:
+        # Keep rendering the progress bar off the CPUs of the timing loop with --isolate
+        move_other_threads()
+        if warmup:
+            warmup_task = progress.add_task("Warmup runs…", total=warmup)
+            for i in range(warmup):
+                timer.timeit(number=1)
+                progress.update(warmup_task, advance=1)
+            progress.remove_task(warmup_task)
+
+        # Logic for calculating number of total runs
+        initial_task = progress.add_task("Calculating amount of runs…", total=1, start=False)
+        cache_key = (code_snippet, setup, input, input_pool, latency)
+        # Every run in a batch needs its own input
+        max_number = min(runs or INFINITY, input_pool) if input else runs or INFINITY
+        try:
+            if cache_key not in _autorange_cache:
+                # determine number so that 0.1 <= total time < 2.0
+                _autorange_cache[cache_key] = autorange(
+                    timer, time_per_batch, autorange_callback, max_number=max_number
+                )
+                if input or latency:
+                    # Making the inputs or counting the iterations isn't timed but it still takes time,
+                    # so count it towards --total-time
+                    _autorange_cache[cache_key] = (_autorange_cache[cache_key][0], timer.last_batch_time)
+            num_in_one_batch, time_taken = _autorange_cache[cache_key]
+        except Exception:
+            timer.print_exc()
+            raise click.exceptions.Exit()
+        progress.remove_task(initial_task)
+        num_of_batches, num_in_one_batch = calculate_batches(
+            num_in_one_batch, time_taken, total_time, runs=runs, min_runs=min_runs, max_runs=max_runs
+        )
+        if latency and num_of_batches < min_runs:
+            # The runs of a batch all go in the histogram anyway, so split them into enough batches
+            # to calculate the mean and the standard deviation of the batches
+            total_runs = num_of_batches * num_in_one_batch
+            num_of_batches = min(min_runs, total_runs)
+            num_in_one_batch = total_runs // num_of_batches
+        if latency:
+            from .histogram import LatencyHistogram
+            from .latency import latency_fields, timer_overhead
+
+            overhead = timer_overhead()
+            # The histogram is shared by all the batches, its size doesn't depend on the amount of runs
+            histogram = LatencyHistogram()
+        total_runs = num_of_batches * num_in_one_batch
+
+        # Start the actual benchmarking process
+        progress_task = progress.add_task("Current run:", total=total_runs)
+        raw_timings = []
+        for batch in range(num_of_batches):
+            if latency:
+                # The timer overhead is subtracted from every iteration, the same as from the percentiles, so the
+                # mean and the percentiles are calculated from the same iteration times
+                timed = timer.timeit(num_in_one_batch, histogram, overhead)
+            else:
+                timed = timer.timeit(num_in_one_batch)
+            raw_timings.append(timed)
+            if console.exporter.jsonl_batches:
+                console.exporter.emit_jsonl({
+                    "type": "batch", "snippet_name": snippet_name, "batch": batch + 1, "batches": num_of_batches,
+                    "runs": num_in_one_batch, "time": timed / num_in_one_batch,
+                })
+            console.stateful_data[1] = \
+                f"[green]{choose_unit(raw_timings[-1] / num_in_one_batch, unit=time_unit)}[/]"
+            progress.update(progress_task, advance=num_in_one_batch)
+        timings = [time_taken_for_entire_batch / num_in_one_batch for time_taken_for_entire_batch in raw_timings]
+
+    # Calculate mean, median, standard_deviation, min, max
+    stats = compute_statistics(timings)
+
+    # Add the statistics to a exporter class to keep track of them
+    console.exporter.add_result(
+        code_snippet, snippet_name, total_runs,
+        stats["mean"], stats["median"], stats["stddev"], stats["min"], stats["max"], timings,
+        **(latency_fields(histogram, overhead) if latency else {})
+    )
+    if latency:
+        console.exporter.timer_overhead = overhead / 1e9
+    result = console.exporter.snippets[-1]
+    print_statistics(result, time_unit)
+    return result
+
+
+def run_shell_benchmark(
+    command: str,
+    snippet_name: str,
+    setup: str,
+    warmup: Optional[int],
+    runs: Optional[int],
+    min_runs: int,
+    max_runs: Optional[int],
+    total_time: float,
+    time_per_batch: float,
+    time_unit: str,
+    code_theme: str,
+    shell: Optional[List[str]] = None,
+    prepare: Optional[str] = None,
+    overhead: float = 0.0,
+) -> Result:
+    """
+    Benchmark an external command while showing a progress bar, then print and record its statistics.
+
+    Each run is a single execution of the command, the time it takes to start the shell
+    (``overhead``) is subtracted from every run. If any run took less than the overhead
+    the command is too fast to tell apart from starting the shell, so the raw times are
+    kept instead and a warning is shown. ``time_per_batch`` is not used since commands
+    aren't batched.
+
+    Returns
+    -------
+    Result
+        The result as added to the exporter
+    """
+    from .shell import CommandFailed, run_command, run_prepare
+
+    print_snippet_header(snippet_name, command, code_theme, lexer="bash")
+
+    with Progress(
+        TextColumn(''),  # Indentation
+        SpinnerColumn(),  # Spinner
+        TextColumn("[progress.description]{task.description}"),  # Task Description
+        StatefulColumn(console),  # Stateful data
+        BarColumn(),  # Progress Bar
+        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),  # Task Percentage
+        MofNCompleteColumn(),  # "Done/Total"
+        TextColumn("[cyan]ETA[/]"),  # ETA Text
+        TimeRemainingColumn(),  # ETA Value
+        console=alt_console,  # Not shown in exported output, and keeps stdout clean for --json/--jsonl
+        transient=True,  # Remove it after it's finished
+    ) as progress:
+        # Keep rendering the progress bar off the CPUs of the timing loop with --isolate
+        move_other_threads()
+        try:
+            if setup and setup != "pass":
+                run_command(setup, shell)
+            if warmup:
+                warmup_task = progress.add_task("Warmup runs…", total=warmup)
+                for i in range(warmup):
+                    run_prepare(prepare, shell)
+                    run_command(command, shell)
+                    progress.update(warmup_task, advance=1)
+                progress.remove_task(warmup_task)
+
+            # Time the first run to figure out how many runs fit in the total time
+            initial_task = progress.add_task("Calculating amount of runs…", total=1, start=False)
+            run_prepare(prepare, shell)
+            raw_timings = [run_command(command, shell)]
+            progress.remove_task(initial_task)
+            total_runs, _ = calculate_batches(
+                1, max(raw_timings[0] - overhead, 1e-9), total_time, runs=runs, min_runs=min_runs, max_runs=max_runs
+            )
+
+            progress_task = progress.add_task("Current run:", total=total_runs)
+            progress.update(progress_task, advance=1)
+            for run in range(1, total_runs):
+                run_prepare(prepare, shell)
+                raw_timings.append(run_command(command, shell))
+                # Runs faster than starting the shell are shown with the overhead
+                timing = raw_timings[-1] - overhead if raw_timings[-1] > overhead else raw_timings[-1]
+                if console.exporter.jsonl_batches:
+                    console.exporter.emit_jsonl({
+                        "type": "batch", "snippet_name": snippet_name, "batch": run + 1, "batches": total_runs,
+                        "runs": 1, "time": timing,
+                    })
+                console.stateful_data[1] = f"[green]{choose_unit(timing, unit=time_unit)}[/]"
+                progress.update(progress_task, advance=1)
+        except CommandFailed as e:
+            alt_console.print(
+                f"[red b]Error:[/] The command [cyan]{e.command}[/] exited with the exit code {e.returncode}"
+            )
+            if e.stderr.strip():
+                alt_console.print(e.stderr.rstrip(), markup=False, highlight=False)
+            raise click.exceptions.Exit(1)
+
+    if not overhead or min(raw_timings) > overhead:
+        timings = [timing - overhead for timing in raw_timings]
+    else:
+        timings = raw_timings
+        alt_console.print(
+            f"[u yellow]Warning:[/] Some runs of [cyan]{snippet_name}[/] took less than starting the shell "
+            f"({choose_unit(overhead, unit=time_unit)}), the times include starting the shell"
+        )
+    stats = compute_statistics(timings)
+    console.exporter.add_result(
+        command, snippet_name, len(timings),
+        stats["mean"], stats["median"], stats["stddev"], stats["min"], stats["max"], timings
+    )
+    result = console.exporter.snippets[-1]
+    print_statistics(result, time_unit)
+    return result
+
+
+def run_cold_benchmark(
+    code_snippet: str,
+    snippet_name: str,
+    setup: str,
+    runs: Optional[int],
+    min_runs: int,
+    max_runs: Optional[int],
+    total_time: float,
+    time_unit: str,
+    buffer_size: int,
+) -> Result:
+    """
+    Benchmark a single snippet with cold CPU caches, then print and record its statistics.
+
+    Every run is timed on its own after evicting the caches, see :class:`~fastero.cache.ColdTimer`.
+    The result is recorded as ``snippet_name (cold cache)``, evicting the caches isn't timed
+    but counts towards ``total_time``.
+
+    Returns
+    -------
+    Result
+        The result as added to the exporter
+    """
+    from time import perf_counter
+    from .cache import ColdTimer
+    from .latency import timer_overhead
+
+    overhead = timer_overhead()
+    timer = ColdTimer(stmt=code_snippet, setup=setup, buffer_size=buffer_size)
+    console.print("  [b]Cold cache[/]")
+
+    with Progress(
+        TextColumn(''),  # Indentation
+        SpinnerColumn(),  # Spinner
+        TextColumn("[progress.description]{task.description}"),  # Task Description
+        StatefulColumn(console),  # Stateful data
+        BarColumn(),  # Progress Bar
+        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),  # Task Percentage
+        MofNCompleteColumn(),  # "Done/Total"
+        TextColumn("[cyan]ETA[/]"),  # ETA Text
+        TimeRemainingColumn(),  # ETA Value
+        console=alt_console,  # Not shown in exported output, and keeps stdout clean for --json/--jsonl
+        transient=True,  # Remove it after it's finished
+    ) as progress:
+        # Keep rendering the progress bar off the CPUs of the timing loop with --isolate
+        move_other_threads()
+        # Time the first run, including evicting the caches, to figure out how many runs fit in the total time
+        initial_task = progress.add_task("Calculating amount of runs…", total=1, start=False)
+        try:
+            start = perf_counter()
+            raw_timings = timer.time_runs(1)
+            first_run = perf_counter() - start
+        except Exception:
+            timer.print_exc()
+            raise click.exceptions.Exit()
+        progress.remove_task(initial_task)
+        total_runs, _ = calculate_batches(
+            1, max(first_run, 1e-9), total_time, runs=runs, min_runs=min_runs, max_runs=max_runs
+        )
+
+        progress_task = progress.add_task("Current run:", total=total_runs)
+        progress.update(progress_task, advance=1)
+        for run in range(1, total_runs):
+            raw_timings += timer.time_runs(1)
+            console.stateful_data[1] = f"[green]{choose_unit(raw_timings[-1] / 1e9, unit=time_unit)}[/]"
+            progress.update(progress_task, advance=1)
+    timings = [max(timing - overhead, 0) / 1e9 for timing in raw_timings]
+
+    stats = compute_statistics(timings)
+    console.exporter.add_result(
+        code_snippet, f"{snippet_name} (cold cache)", len(timings),
+        stats["mean"], stats["median"], stats["stddev"], stats["min"], stats["max"], timings
+    )
+    result = console.exporter.snippets[-1]
+    print_statistics(result, time_unit)
+    return result
+
+
+def runs_in_one_batch(result: Result) -> int:
+    """Get how many runs there were in one batch of a result, used as the default amount of runs for profiling."""
+    return max(result["runs"] // len(result["timings"] or [None]), 1)
+
+
+def print_profile(result: Result, setup: str, number: Optional[int], top: int, time_unit: str):
+    """Profile a snippet, then print and record the functions that took the most time."""
+    from .profiling import profile_snippet, make_profile_table
+
+    if number is None:
+        number = runs_in_one_batch(result)
+    with alt_console.status(f"Profiling {result['snippet_name']}"):
+        profile = profile_snippet(result["snippet_code"], setup, number=number, top=top)
+    console.exporter.add_profile(result["snippet_name"], profile)
+    console.print(make_profile_table(profile, time_unit=time_unit))
+
+
+def print_line_profile(
+    result: Result, setup: str, number: Optional[int], first_line: int, time_unit: str, code_theme: str
+):
+    """Trace the lines of a snippet, then print and record how much time each line took."""
+    from .profiling import profile_lines, make_line_profile_table
+
+    if number is None:
+        number = runs_in_one_batch(result)
+    with alt_console.status(f"Profiling the lines of {result['snippet_name']}"):
+        profile = profile_lines(result["snippet_code"], setup, number=number, first_line=first_line)
+    console.exporter.add_line_profile(result["snippet_name"], profile)
+    console.print(make_line_profile_table(profile, time_unit=time_unit, code_theme=code_theme))
+
+
+def export_results(
+    export_json, export_csv, export_yaml, export_markdown, export_svg, export_image, export_asciidoc,
+    export_plot, export_html, time_unit, label_format, dark_background, bar_color, selenium_browser, watermark,
+    background, image_renderer, image_font, npy_samples=False,
+):
+    """Export the results, in order of most error prone to least."""
+    if export_svg:
+        console.exporter.export_svg(export_svg)
+    if export_json:
+        console.exporter.export_json(export_json, npy_samples=npy_samples)
+    if export_csv:
+        console.exporter.export_csv(export_csv)
+    if export_markdown:
+        console.exporter.export_markdown(export_markdown, unit=time_unit)
+    if export_asciidoc:
+        console.exporter.export_asciidoc(export_asciidoc, unit=time_unit)
+    if export_html:
+        console.exporter.export_html(export_html, unit=time_unit)
+    if export_yaml:
+        console.exporter.export_yaml(export_yaml)
+    if export_image:
+        console.exporter.export_image(
+            export_image, browser=selenium_browser, add_watermark=watermark, background=background,
+            renderer=image_renderer, font=image_font
+        )
+    if export_plot:
+        console.exporter.export_plot(
+            export_plot, unit=time_unit, label_format=label_format,
+            dark_background=dark_background, bar_color=bar_color
+        )
+
+
+@click.command(cls=FasteroCommand)
 @click.argument("CODE_SNIPPETS", nargs=-1)
 @click.option("--snippet-name", "-n", metavar="NAME", multiple=True, help="Give a meaningful name to a snippet. This can be specified multiple times if several snippets are benchmarked.") # noqa
 @click.option("--setup", "-s", metavar="STMT", default="pass", show_default=True, help="Code to be executed once in each batch .\nExecution time of this setup code is *not* timed") # noqa
 @click.option("--from-json", "-f", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=True, writable=False), default=None, help="If used, get all the parameters from FILE. The file needs to be a json file with a schema simillar to exported json files") # noqa
+@click.option("--suite", "-S", metavar="FILE", type=click.Path(exists=True, dir_okay=False, resolve_path=True, readable=True, writable=False), default=None, help="Run all the benchmarks in a suite FILE (TOML, YAML or JSON). A suite has multiple groups, each with their own setup, options, tags and benchmarks") # noqa
+@click.option("--keyword", "-k", metavar="EXPRESSION", default=None, help="Only run the benchmarks whose name or tags match EXPRESSION, e.g. ``-k \"lists and not slow\"``. Matching is case-insensitive and by substring") # noqa
+@click.option("--baseline", metavar="FILE", type=click.Path(exists=True, dir_okay=False, resolve_path=True, readable=True, writable=False), default=None, help="Compare the results with the ones in FILE, a JSON file exported by fastero, and exit with a non-zero exit code if any snippet is slower than ``--threshold``") # noqa
+@click.option("--threshold", metavar="PERCENT", default=5.0, show_default=True, type=click.FloatRange(min=0), help="How many percent slower than the ``--baseline`` a snippet is allowed to be") # noqa
+@click.option("--history", "record_history", is_flag=True, default=False, help="Record the results of this run in the history database, see ``fastero history --help``") # noqa
+@click.option("--history-file", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True), default=None, help="The history database to record the results in, by default the one in the fastero app directory or FASTERO_HISTORY_FILE") # noqa
+@click.option("--incremental", "-i", is_flag=True, default=False, help="Only benchmark the snippets that changed since the last incremental run, and reuse the stored results for the rest. A snippet changes if its code, setup, ``file:`` sources, options or the interpreter change") # noqa
+@click.option("--incremental-file", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True), default=None, help="Where to store the results for ``--incremental``, by default .fastero_incremental.json in the current directory") # noqa
+@click.option("--shell", "-x", is_flag=True, default=False, help="Benchmark CODE_SNIPPETS as shell commands instead of Python code, like hyperfine. Each run is one execution of the command and the time it takes to start the shell is subtracted") # noqa
+@click.option("--shell-program", metavar="SHELL", default="default", show_default=True, help="The shell used by ``--shell``, e.g. bash or \"bash -e\". default is /bin/sh (cmd.exe on Windows), none runs the commands directly without a shell") # noqa
+@click.option("--prepare", metavar="CMD", multiple=True, help="With ``--shell``, run CMD before every run of the commands, without timing it. Specify it once for all the commands or once for each command") # noqa
+@click.option("--profile", "-p", is_flag=True, default=False, help="After timing each snippet, run it again under cProfile with the same setup and show the functions that took the most time. The profiles are included in the JSON exports") # noqa
+@click.option("--line-profile", "-l", is_flag=True, default=False, help="After timing each snippet, run it again while tracing its lines and show how much time each line took. Useful with ``file:`` snippets that select some lines, e.g. ``file: foo.py:10-40``") # noqa
+@click.option("--profile-runs", metavar="NUM", type=click.IntRange(min=1), default=None, help="How many times to run each snippet while profiling, by default as many times as in one batch") # noqa
+@click.option("--profile-top", metavar="NUM", type=click.IntRange(min=1), default=10, show_default=True, help="How many functions to show in each profile") # noqa
+@click.option("--agent", "agents", metavar="HOST:PORT", multiple=True, help="Run the benchmarks on the agent at HOST:PORT, started with ``fastero agent``, instead of on this machine. Specify this multiple times to run every benchmark on every agent and get a table with the results of each machine") # noqa
+@click.option("--agent-token", metavar="TOKEN", envvar="FASTERO_AGENT_TOKEN", default=None, help="The token the agents were started with. Can also be set with the FASTERO_AGENT_TOKEN environment variable") # noqa
+@click.option("--checkpoint", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True), default=None, help="Write the result of every snippet, including the raw samples, to FILE as soon as it finishes. If the run is interrupted, it can be continued with ``--resume FILE``") # noqa
+@click.option("--resume", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True), default=None, help="Continue a run that was interrupted, reusing the results in the checkpoint FILE and adding the results of the remaining snippets to it") # noqa
+@click.option("--check-system/--no-check-system", default=True, show_default=True, help="Check the CPU frequency governor, turbo boost, load and isolated CPUs before benchmarking and how busy the CPUs were during each benchmark, and warn about anything that makes the results noisy. The environment is included in the JSON exports") # noqa
+@click.option("--cpu", metavar="CPUS", help="Pin the timing loop to the CPUs in CPUS, e.g. 3 or 2-3. This stops it from moving between CPUs, which makes the results less noisy. Only available on Linux") # noqa
+@click.option("--isolate", is_flag=True, default=False, help="Pin the timing loop to the CPUs given by --cpu (the last CPU if not given), raise its priority where permitted and keep rendering the progress bar on the other CPUs") # noqa
+@click.option("--latency", is_flag=True, default=False, help="Time every iteration on its own with perf_counter_ns and show the p50, p90, p99 and p99.9 iteration times and the slowest iteration, which the mean of a batch hides. The iteration times are counted in a log-bucketed histogram, so the memory used doesn't grow with the amount of runs and the percentiles are within 0.8%. The timer overhead is measured and subtracted from every iteration, for the mean as well as the percentiles. The percentiles are included in all the exports and the histogram in the JSON and YAML exports") # noqa
+@click.option("--input", metavar="NAME=EXPR", default=None, help="Give every run of the snippets a new input, for snippets that use up or change their data such as ``heapq.heappop(h)`` or ``next(it)``. Before each batch is timed, EXPR is evaluated once for every run, then each run gets one of the results as NAME, e.g. ``--input \"h=make_heap()\"``") # noqa
+@click.option("--input-pool", metavar="NUM", default=1000, show_default=True, type=click.IntRange(min=1), help="With ``--input``, the most runs in one batch, all the inputs of a batch are kept in memory") # noqa
+@click.option("--cache", metavar="MODE", default="hot", show_default=True, type=click.Choice(["hot", "cold"], case_sensitive=False), help="With cold, also time every snippet with cold CPU caches, evicting them before every run by copying a buffer bigger than them, and show the hot and cold results side by side. Evicting the caches isn't timed") # noqa
+@click.option("--cache-buffer", metavar="MB", default=None, type=click.IntRange(min=1), help="With ``--cache cold``, the size of the buffer copied to evict the caches in MB, by default the size of the biggest CPU cache or 64 MB if it can't be found") # noqa
 @click.option("--json", "-j", "to_json", is_flag=True, default=False, show_default=False, help="If used, output results in a json format to stdout.") # noqa
+@click.option("--jsonl", "to_jsonl", is_flag=True, default=False, show_default=False, help="If used, stream results as JSON Lines to stdout, one record as soon as each snippet finishes.") # noqa
+@click.option("--export-jsonl", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Stream the results as JSON Lines to the given FILE while benchmarking, so it can be tailed") # noqa
+@click.option("--jsonl-batches", is_flag=True, default=False, show_default=False, help="If used alongside ``--jsonl`` or ``--export-jsonl``, also stream a record for every batch") # noqa
 @click.option("--quiet", "-q", is_flag=True, default=False, show_default=False, help="If used, there will be no output printed.") # noqa
 @click.option("--only-export", "-e", metavar="FILE", is_flag=True, default=None, show_default=True, help="If used alongside ``--from-json``, skips the benchmarking part and just exports the data.") # noqa
 @click.option("--warmup", "-w", metavar="NUM", type=click.IntRange(min=1), help="Perform NUM warmup runs before the actual benchmark. Perform this only for presistent improvements. Otherwise all performance gains are lost on each batch") # noqa
@@ -112,12 +725,15 @@ def set_prompt_toolkit_color():
 @click.option("--min-runs", "-m", metavar="NUM", default=2, show_default=True, type=click.IntRange(min=1), help="Perform at least NUM runs for each snippet") # noqa
 @click.option("--max-runs", "-M", metavar="NUM", type=click.IntRange(min=1), help="Perform at least NUM runs for each snippet, by default unlimited.") # noqa
 @click.option("--export-json", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Export the timing summary statistics as JSON to the given FILE") # noqa
+@click.option("--npy-samples", is_flag=True, default=False, help="With ``--export-json``, write the raw samples to a binary .npy file next to the JSON file instead of into it. The file is much smaller and faster to load, and can be memory-mapped with NumPy") # noqa
 @click.option("--export-csv", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Export the timing summary statistics as CSV  to the given FILE.") # noqa
 @click.option("--export-yaml", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Export the timing summary statistics as YAML to the given FILE.") # noqa
 @click.option("--export-markdown", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Export the timing summary statistics as a Markdown table to the given FILE.") # noqa
 @click.option("--export-svg", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Export the console output as a svg image to the given FILE") # noqa
-@click.option("--export-image", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Export the console output as an image to the given FILE. Exports to svg then uses a headless browser to screenshot that svg output.") # noqa
-@click.option("--background", metavar="CSS_COLOR", default='random', show_default=True, help="Specify a custom background for the generated image. This supports anything the CSS background property supports including images, gradients etc. For more info see https://www.w3schools.com/cssref/css3_pr_background.asp") # noqa
+@click.option("--export-image", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Export the console output as an image to the given FILE. By default the image is drawn directly using Pillow, see ``--image-renderer``") # noqa
+@click.option("--image-renderer", metavar="RENDERER", default="pillow", show_default=True, type=click.Choice(['pillow', 'browser'], case_sensitive=False), help="How to make the image for ``--export-image``. pillow draws it directly and is fast, browser exports to svg then uses a headless browser to screenshot that svg output") # noqa
+@click.option("--image-font", metavar="FILE", default=None, help="The monospace font file used by the pillow image renderer, by default the first one found from Fira Code, Cascadia Code, DejaVu Sans Mono, Menlo, Consolas, Liberation Mono and Courier New") # noqa
+@click.option("--background", metavar="CSS_COLOR", default='random', show_default=True, help="Specify a custom background for the generated image. With the browser renderer, this supports anything the CSS background property supports including images, gradients etc. With the pillow renderer this needs to be a color, otherwise the browser renderer is used For more info see https://www.w3schools.com/cssref/css3_pr_background.asp") # noqa
 @click.option("--selenium-browser", metavar="BROWSER", default="chrome", show_default=True, type=click.Choice(['chrome','edge','firefox', 'opera', 'safari'], case_sensitive=False), help="The browser to use for exporting the image") # noqa
 @click.option("--watermark/--no-watermark", default=True, show_default=True, help="Whether to add a watermark to the bottom right corner of the generated image. A watermark helps spread the word") # noqa
 @click.option("--export-asciidoc", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Export the timing summary statistics as an AsciiDoc table to the given FILE.") # noqa
@@ -133,7 +749,37 @@ def app(
     snippet_name     : List[str],
     setup            : str,
     from_json        : Path,
+    suite            : Path,
+    keyword          : str,
+    baseline         : Path,
+    threshold        : float,
+    record_history   : bool,
+    incremental      : bool,
+    incremental_file : Path,
+    checkpoint       : Path,
+    resume           : Path,
+    history_file     : Path,
+    shell            : bool,
+    shell_program    : str,
+    prepare          : List[str],
+    profile          : bool,
+    line_profile     : bool,
+    profile_runs     : int,
+    profile_top      : int,
+    agents           : List[str],
+    agent_token      : str,
+    check_system     : bool,
+    cpu              : str,
+    isolate          : bool,
+    latency          : bool,
+    input            : str,
+    input_pool       : int,
+    cache            : str,
+    cache_buffer     : int,
     to_json          : bool,
+    to_jsonl         : bool,
+    export_jsonl     : Path,
+    jsonl_batches    : bool,
     quiet            : bool,
     only_export      : bool,
     warmup           : int,
@@ -145,6 +791,7 @@ def app(
     min_runs         : int,
     max_runs         : int,
     export_json      : Path,
+    npy_samples      : bool,
     export_csv       : Path,
     export_yaml      : Path,
     export_markdown  : Path,
@@ -152,6 +799,8 @@ def app(
     export_image     : Path,
     background       : str,
     selenium_browser : str,
+    image_renderer   : str,
+    image_font       : str,
     watermark        : bool,
     export_asciidoc  : Path,
     export_plot      : Path,
@@ -163,440 +812,400 @@ def app(
     """
     Benchmark each snippet in **CODE_SNIPPETS**.
 
+    Other commands: `fastero compare BASELINE CURRENT` compares two exported JSON files,
+    `fastero history NAME` shows the trend of a snippet recorded with `--history`,
+    `fastero call MODULE:FUNCTION` benchmarks calling a function by its import path,
+    `fastero import-time MODULES` measures how long importing modules takes,
+    `fastero agent` runs the benchmarks sent by `--agent` on another machine,
+    `fastero merge FILES` merges the results of several runs,
+    `fastero revisions BASE HEAD -- CODE_SNIPPETS` compares the snippets between two git revisions.
+
     Detailed documentation available at https://fastero.readthedocs.io
     """
 
     # Suppress all output if the user we only wants json
-    if quiet or to_json:
+    if quiet or to_json or to_jsonl:
         console.file = open(os.devnull, 'a', encoding="utf-8")
         alt_console.file = open(os.devnull, 'a', encoding="utf-8")
 
         # Emulate a dumb terminal that doesn't know how to show progress bars
         os.environ["TERM"] = "DUMB"
 
+    exports = dict(
+        export_json=export_json, export_csv=export_csv, export_yaml=export_yaml, export_markdown=export_markdown,
+        export_svg=export_svg, export_image=export_image, export_asciidoc=export_asciidoc,
+        export_plot=export_plot, export_html=export_html, time_unit=time_unit, label_format=label_format,
+        dark_background=dark_background, bar_color=bar_color, selenium_browser=selenium_browser,
+        watermark=watermark, background=background, image_renderer=image_renderer, image_font=image_font,
+        npy_samples=npy_samples,
+    )
+
     if from_json and only_export:
-        import json
-
-        with open(from_json, 'r') as f:
-            data = json.load(f)
-            console.exporter.setup = data['setup']
-            if data['setup'] and data['setup'] != 'pass':
-                console.print(
-                    Panel(
-                        Syntax(
-                            data['setup'], 'python',
-                            theme=code_theme,
-                            code_width=65,
-                            indent_guides=True,
-                            line_numbers=True,
-                            word_wrap=True
-                        ),
-                        title="Setup code",
-                        border_style='dim',
-                        expand=False,
-                    )
-                )
-            for result in data['results']:
-                console.exporter.add_result(**result)
-
-                total_runs = int(result['runs'])
-
-                # Format all the statistics (add units such as ns, ms, s)
-                formatted_mean = choose_unit(result['mean'], unit=time_unit)
-                formatted_stddev = choose_unit(result['stddev'], unit=time_unit)
-                formatted_min = choose_unit(result['min'], unit=time_unit)
-                formatted_max = choose_unit(result['max'], unit=time_unit)
-
-                # Figure out which statistic takes the highest width
-                # This is going to be used for padding
-                highest_width = max(len(i) for i in (formatted_mean, formatted_stddev, formatted_min, formatted_max))
-
-                # Print the snippet name and code with syntax highlighting
-                console.print(
-                    f"[b]{result['snippet_name']}[/]:",
-                    Syntax('', 'python', theme=code_theme).highlight(result['snippet_code']),
-                    sep=" ",
-                    end=""
-                )
+        from .samples import load_export
 
-                console.print(
-                    f"  Time  ([green b]mean[/] ± [green]σ[/]):       "
-                    f"[green b]{formatted_mean.rjust(highest_width)}[/] ± [green]{formatted_stddev.rjust(highest_width)}[/]"
-                )
-                console.print(
-                    f"  Range ([cyan b]min[/]  … [magenta]max[/]):     "
-                    f"[cyan b]{formatted_min.rjust(highest_width)}[/] … [magenta]{formatted_max.rjust(highest_width)}[/]" +
-                    f"    " + f"[bright_black]\[runs: {total_runs:,}][/]"
-                )
-            # Generate a bar plot of all the snippets
-            if len(data['results']) > 1:
-                plot = make_bar_plot(
-                    labels=[format_snippet(i, code_theme=code_theme, replace_newlines=True) for i in data['results']],
-                    amounts=[i["min"] for i in data['results']],
-                    ascii_only=console.options.ascii_only
-                )
-                # Simulate a console with 500 width, used to get max bar chart size
-                # This is needed because the text is truncated in less wide consoles
-                # And measuring the size with the current console [options] will
-                # Get the size after truncating the text, I don't want that
-                opts = console.options.copy()
-                opts.size = (500, 500)
-                opts.min_width, opts.max_width = (0, 500)
-                # Get the size needed to print the plot
-                plot_size = console.measure(plot, options=opts)
-                # Print the plot if there it sufficient space
-                if console.width > plot_size.minimum:
-                    console.print(plot)
-                else:
-                    alt_console.print("[u yellow]Warning:[/] Bar Chart not printed due to insufficient console width")
-
-                if len(data['results']) > 1:
-                    console.print("\n[b]Summary[/]:")
-                fastest_snippet = min(data['results'], key=lambda x: x["mean"])
-                console.print(" ", format_snippet(fastest_snippet, code_theme=code_theme, replace_newlines=True), "is the fastest.")
-                for code_snippet in data['results']:
-                    if code_snippet == fastest_snippet:
-                        continue
-                    console.print(
-                        f"    [b green]{round(code_snippet['mean']/fastest_snippet['mean'],2 )}[/] "
-                        f"([cyan]{round(code_snippet['min']/fastest_snippet['min'],2 )}[/] …"
-                        f" [magenta]{round(code_snippet['max']/fastest_snippet['max'],2 )}[/])"
-                        " times faster than",
-                        format_snippet(code_snippet, code_theme=code_theme)
-                    )
+        data = load_export(from_json)
+        # The setup and the timings are optional in the schema, exports made by older versions don't have them
+        console.exporter.setup = data.get('setup', 'pass')
+        if console.exporter.setup and console.exporter.setup != 'pass':
+            print_setup(console.exporter.setup, code_theme)
+        for result in data['results']:
+            console.exporter.add_result(**result)
+            print_snippet_header(result['snippet_name'], result['snippet_code'], code_theme)
+            print_statistics(result, time_unit)
+        # Generate a bar plot and a summary of all the snippets
+        if len(data['results']) > 1:
+            print_summary(data['results'], code_theme)
 
         if to_json:
             console.exporter.export_json("", stdout=True)
 
-        if export_image:
-            console.exporter.export_image(export_image, browser=selenium_browser, add_watermark=watermark, background=background)
-        if export_svg:
-            console.exporter.export_svg(export_svg)
-        if export_json:
-            console.exporter.export_json(export_json)
-        if export_csv:
-            console.exporter.export_csv(export_csv)
-        if export_markdown:
-            console.exporter.export_markdown(export_markdown, unit=time_unit)
-        if export_asciidoc:
-            console.exporter.export_asciidoc(export_asciidoc, unit=time_unit)
-        if export_html:
-            console.exporter.export_html(export_html, unit=time_unit)
-        if export_yaml:
-            console.exporter.export_yaml(export_yaml)
-        if export_plot:
-            console.exporter.export_plot(
-                export_plot, unit=time_unit, label_format=label_format,
-                dark_background=dark_background, bar_color=bar_color
-            )
+        export_results(**exports)
 
         raise click.exceptions.Exit()
     elif from_json:
-        import json
-
-        with open(from_json, 'r') as f:
-            data = json.load(f)
-            setup = data['setup']
-            code_snippets = (i['snippet_code'] for i in data['results'])
-            snippet_name = (i.get('snippet_name') for i in data['results'])
-
-    # Convert from tuple to list to make mutable
-    # This is needed to get the snippets that are set to "-"
-    code = list(code_snippets)
-    statement_name = list(snippet_name)
-
-    # If there are parameters, Print a rule to separate them from the results
-    if any(i == '-' for i in [setup, *code]):
-        alt_console.print(Rule("Parameters"))
-
-    # First get the input for setup and then get the other code
-    _setup_is_gotten_later = False
-    if setup == '-':
-        gotten_code = get_code_input(f"Enter code for --setup ")
-        if gotten_code is None:
-            setup = "pass"
-        else:
-            setup = gotten_code
-            _setup_is_gotten_later = True
-    elif setup.startswith("file:"):
-        import re
+        from .samples import load_export
 
-        setup_regex_match = re.match(r"file: ?((?:[\w,\s-]+\.?\w*)+)", setup)
-        setup_file = setup_regex_match.group(1)
-        if setup_file == "stdin":
-            import sys
+        data = load_export(from_json)
+        setup = data.get('setup', 'pass')
+        code_snippets = (i['snippet_code'] for i in data['results'])
+        snippet_name = (i.get('snippet_name') for i in data['results'])
 
-            setup = sys.stdin.read()
-        else:
-            path = click.Path(
-                exists=True, file_okay=True, dir_okay=False, writable=False,
-                readable=True, resolve_path=True, allow_dash=True
-            ).convert(setup_file, None, None)
-            with open(path, "rt", encoding="utf-8") as f:
-                setup = f.read()
+    # The options that can be overridden per benchmark in a suite
+    options = dict(
+        warmup=warmup, runs=runs, min_runs=min_runs, max_runs=max_runs,
+        total_time=total_time, time_per_batch=time_per_batch, input=input, input_pool=input_pool,
+    )
 
-    console.exporter.setup = setup
+    if suite:
+        from .suite import load_suite
 
-    if setup and setup != "pass" and not _setup_is_gotten_later:
-        console.print(
-            Panel(
-                Syntax(
-                    setup, 'python',
-                    theme=code_theme,
-                    code_width=65,
-                    indent_guides=True,
-                    line_numbers=True,
-                    word_wrap=True
-                ),
-                title="Setup code",
-                border_style='dim',
-                expand=False,
-            )
-        )
-    elif setup and setup != "pass" and _setup_is_gotten_later and any((export_svg, export_image)):
-        alt_console.print("[cyan]Info:[/] Printing setup to make sure it is shown in the exported output")
-        console.print(
-            Panel(
-                Syntax(
-                    setup, 'python',
-                    theme=code_theme,
-                    code_width=65,
-                    indent_guides=True,
-                    line_numbers=True,
-                    word_wrap=True
-                ),
-                title="Setup code",
-                border_style='dim',
-                expand=False,
+        if code_snippets:
+            raise click.UsageError("CODE_SNIPPETS can not be used alongside --suite")
+        setup, benchmarks = load_suite(suite, defaults=options)
+        console.exporter.setup = setup
+    else:
+        # Convert from tuple to list to make mutable
+        # This is needed to get the snippets that are set to "-"
+        code = list(code_snippets)
+        statement_name = list(snippet_name)
+
+        # If there are parameters, Print a rule to separate them from the results
+        if any(i == '-' for i in [setup, *code]):
+            alt_console.print(Rule("Parameters"))
+
+        # The files read using the "file:" directive, used for incremental runs
+        setup_files = []
+        snippet_files = {}
+        # The line number in the file of the first line of each snippet read from a file
+        first_lines = {}
+
+        # First get the input for setup and then get the other code
+        _setup_is_gotten_later = False
+        if setup == '-':
+            gotten_code = get_code_input(f"Enter code for --setup ")
+            if gotten_code is None:
+                setup = "pass"
+            else:
+                setup = gotten_code
+                _setup_is_gotten_later = True
+        elif is_file_directive(setup):
+            setup, path, _ = read_file_directive(setup)
+            if path:
+                setup_files.append(path)
+
+        console.exporter.setup = setup
+
+        if setup and setup != "pass" and not _setup_is_gotten_later:
+            print_setup(setup, code_theme)
+        elif setup and setup != "pass" and _setup_is_gotten_later and any((export_svg, export_image)):
+            alt_console.print("[cyan]Info:[/] Printing setup to make sure it is shown in the exported output")
+            print_setup(setup, code_theme)
+
+        # Loop through each snippet and if it has a name provided with the
+        # --snippet-name option then use that name, otherwise set the name to "Benchmark {index}".
+        for index, code_snippet in enumerate(code):
+            try:
+                name = statement_name[index]
+            except IndexError:
+                name = f"Benchmark {index+1}"
+                statement_name.insert(index, name)
+            # If the snippet isn't provided when using the command. Get it now.
+            if code_snippet == "-":
+                gotten_code = get_code_input(f"Enter code for {name} ", theme=code_theme)
+                if gotten_code is None:
+                    raise click.Abort()
+                # Insert it in place of the "-"
+                code[index] = gotten_code
+            elif is_file_directive(code_snippet):
+                code[index], path, first_lines[index] = read_file_directive(code_snippet)
+                if path:
+                    snippet_files[index] = path
+
+        benchmarks = [
+            {"snippet_code": code_snippet, "snippet_name": name, "group": None, "setup": setup, "tags": [],
+             "options": options, "files": setup_files + ([snippet_files[index]] if index in snippet_files else []),
+             "first_line": first_lines.get(index, 1)}
+            for index, (code_snippet, name) in enumerate(zip(code, statement_name))
+        ]
+
+    if keyword:
+        from .suite import filter_benchmarks
+
+        benchmarks = filter_benchmarks(benchmarks, keyword)
+        if not benchmarks:
+            alt_console.print(f"[u yellow]Warning:[/] No benchmarks matched the expression [yellow]{keyword}[/]")
+            raise click.exceptions.Exit()
+
+    if latency and shell:
+        raise click.UsageError("--latency can not be used alongside --shell, every run of a command is already timed")
+    if any(benchmark["options"]["input"] for benchmark in benchmarks):
+        from .pool import parse_input
+
+        if shell or latency or cache == "cold" or profile or line_profile:
+            raise click.UsageError(
+                "--input can not be used alongside --shell, --latency, --cache cold, --profile or --line-profile"
             )
+        for benchmark in benchmarks:
+            if benchmark["options"]["input"]:
+                parse_input(benchmark["options"]["input"])
+    if cache == "cold" and shell:
+        raise click.UsageError("--cache cold can not be used alongside --shell")
+    if agents and (profile or line_profile or incremental or checkpoint or resume or cache == "cold"):
+        raise click.UsageError(
+            "--profile, --line-profile, --incremental, --checkpoint, --resume and --cache cold "
+            "can not be used alongside --agent"
         )
 
-    # Loop through each snippet and if it has a name provided with the
-    # --snippet-name option then use that name, otherwise set the name to "Benchmark {index}".
-    for index, code_snippet in enumerate(code):
-        try:
-            name = statement_name[index]
-        except IndexError:
-            name = f"Benchmark {index+1}"
-            statement_name.insert(index, name)
-        # If the snippet isn't provided when using the command. Get it now.
-        if code_snippet == "-":
-            gotten_code = get_code_input(f"Enter code for {name} ", theme=code_theme)
-            if gotten_code is None:
-                raise click.Abort()
-            # Insert it in place of the "-"
-            code[index] = gotten_code
-        elif code_snippet.startswith("file:"):
-            import re
-
-            code_snippet_regex_match = re.match(r"file: ?((?:[\w,\s-]+\.?\w*)+)", code_snippet)
-            code_snippet_file = code_snippet_regex_match.group(1)
-            if code_snippet_file == "stdin":
-                import sys
-
-                setup = sys.stdin.read()
+    # The system checks and the CPU affinity are done by the agents for their machines
+    if check_system and not agents:
+        from .environment import LoadMonitor, check_environment, collect_environment
+
+        console.exporter.environment = collect_environment()
+        for warning in check_environment(console.exporter.environment):
+            alt_console.print(f"[u yellow]Warning:[/] {warning}")
+        load_monitor = LoadMonitor().start()
+
+    if (cpu or isolate) and not agents:
+        from .affinity import affinity_supported, choose_cpus, pin_timing_loop, raise_priority
+
+        if not affinity_supported():
+            alt_console.print("[u yellow]Warning:[/] Setting the CPU affinity is not available on this platform")
+        else:
+            try:
+                timing_cpus, other_cpus = choose_cpus(cpu)
+            except ValueError as e:
+                raise click.BadParameter(str(e), param_hint="--cpu")
+            if isolate and not other_cpus:
+                alt_console.print(
+                    "[u yellow]Warning:[/] There are no other CPUs to move the progress bar to"
+                )
+            pin_timing_loop(timing_cpus, other_cpus if isolate else None)
+            move_other_threads()
+            alt_console.print(
+                f"[cyan]Info:[/] Running the timing loop on the CPUs "
+                f"[green]{', '.join(map(str, sorted(timing_cpus)))}[/]"
+            )
+        if isolate:
+            niceness = raise_priority()
+            if niceness is None:
+                alt_console.print(
+                    "[u yellow]Warning:[/] Not permitted to raise the priority, run fastero as root or raise the "
+                    "[cyan]nice[/] limit of your user to allow it"
+                )
             else:
-                path = click.Path(
-                    exists=True, file_okay=True, dir_okay=False, writable=False,
-                    readable=True, resolve_path=True, allow_dash=True
-                ).convert(code_snippet_file, None, None)
-                with open(path, "rt", encoding="utf-8") as f:
-                    code[index] = f.read()
+                alt_console.print(f"[cyan]Info:[/] Raised the priority of the timing loop to the niceness {niceness}")
 
     # Print it to the alt console so it doesn't appear in exported Image files
     alt_console.print(Rule("Benchmark started…"))
 
+    if to_jsonl:
+        console.exporter.open_jsonl_stream(batches=jsonl_batches)
+    if export_jsonl:
+        console.exporter.open_jsonl_stream(export_jsonl, batches=jsonl_batches)
+
     if any(
         (export_json, export_csv, export_yaml, export_markdown,
          export_svg, export_image, export_asciidoc, export_plot, export_html)
     ):
         console.exporter._export_needed = True
 
-    _autorange_cache = {}
-    for code_snippet, statement_name in zip(code, statement_name):
-        timer = Timer(stmt=code_snippet, setup=setup)
+    if shell and len(prepare) > 1 and len(prepare) != len(benchmarks):
+        raise click.UsageError("--prepare needs to be specified once, or once for each command")
+    if shell and not agents:
+        from .shell import CommandFailed, measure_shell_overhead, shell_arguments
 
-        # Print the snippet name and code with syntax highlighting
-        console.print(
-            f"[b]{statement_name}[/]:",
-            Syntax('', 'python', theme=code_theme).highlight(code_snippet),
-            sep=" ",
-            end=""
-        )
+        if profile or line_profile:
+            raise click.UsageError("--profile and --line-profile can not be used alongside --shell")
+        shell_command = shell_arguments(shell_program)
+        with alt_console.status("Measuring the shell spawn overhead"):
+            try:
+                shell_overhead = measure_shell_overhead(shell_command)
+            except (CommandFailed, OSError) as e:
+                alt_console.print(f"[red b]Error:[/] Could not start the shell [cyan]{shell_program}[/]: {e}")
+                raise click.exceptions.Exit(1)
+        if shell_command is not None:
+            alt_console.print(
+                f"[cyan]Info:[/] Starting the shell takes [green]{choose_unit(shell_overhead)}[/], "
+                "this is subtracted from the results"
+            )
 
-        with Progress(
-            TextColumn(''),  # Indentation
-            SpinnerColumn(),  # Spinner
-            TextColumn("[progress.description]{task.description}"),  # Task Description
-            StatefulColumn(console),  # Stateful data
-            BarColumn(),  # Progress Bar
-            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),  # Task Percentage
-            MofNCompleteColumn(),  # "Done/Total"
-            TextColumn("[cyan]ETA[/]"),  # ETA Text
-            TimeRemainingColumn(),  # ETA Value
-            transient=True,  # Remove it after it's finished
-        ) as progress:
-            if warmup:
-                warmup_task = progress.add_task("Warmup runs…", total=warmup)
-                for i in range(warmup):
-                    timer.timeit(number=1)
-                    progress.update(warmup_task, advance=1)
-                progress.remove_task(warmup_task)
+    # How the snippets are timed, this is part of the key of the stored results so changing it measures them again
+    for benchmark_index, benchmark in enumerate(benchmarks):
+        benchmark["mode"] = {
+            "shell": shell_program if shell else None,
+            "prepare": (prepare[benchmark_index] if len(prepare) > 1 else next(iter(prepare), None)) if shell else None,
+            "latency": latency,
+            "cache": cache,
+            "cpu": cpu,
+            "isolate": isolate,
+        }
 
-            def _autorange(timer: Timer, callback=None, max_number=INFINITY):
-                # This is a custom timeit.autorange implementation for lower time_taken.
-                # This is done to make the progress bar more smoother.
-                # This does have one drawback where it makes it slower if there is a long setup
-
-                # Try to get from cache
-                if timer.stmt in _autorange_cache:
-                    return _autorange_cache[timer.stmt]
-
-                i = 1
-                while True:
-                    for j in 1, 2, 5, 8:
-                        number = i * j
-                        if number > max_number:
-                            return number, time_taken
-                        time_taken = timer.timeit(number)
-                        if callback:
-                            callback(number, time_taken)
-                        if time_taken >= time_per_batch:
-                            _autorange_cache[timer.stmt] = (number, time_taken)
-                            return (number, time_taken)
-                    i *= 10
-
-
-            # Logic for calculating number of total runs
-            if not runs:
-                initial_task = progress.add_task("Calculating amount of runs…", total=1, start=False)
-                # determine number so that 0.1 <= total time < 2.0
-                try:
-                    num_in_one_batch, time_taken = _autorange(timer, autorange_callback)
-                except Exception:
-                    timer.print_exc()
-                    raise click.exceptions.Exit()
-                progress.remove_task(initial_task)
-                num_of_batches = int(total_time / time_taken)
-                total_runs_based_on_time = num_of_batches * num_in_one_batch
-                if (total_runs_based_on_time) < min_runs:
-                    num_of_batches = min_runs // num_in_one_batch
-                if max_runs and (total_runs_based_on_time) > max_runs:
-                    num_of_batches = max_runs // num_in_one_batch
-            else:
-                initial_task = progress.add_task("Calculating amount of runs…", total=1, start=False)
-                # determine number so that 0.1 <= total time < 2.0
-                try:
-                    num_in_one_batch, time_taken = _autorange(timer, autorange_callback, max_number=runs)
-                except Exception:
-                    timer.print_exc()
-                    raise click.exceptions.Exit()
-                progress.remove_task(initial_task)
-                if runs > num_in_one_batch:
-                    num_of_batches = runs // num_in_one_batch
-                else:
-                    if runs < 3:
-                        # If there are less than 3 runs then we can probably do it in one batch
-                        num_of_batches = 1
-                        num_in_one_batch = 1
-                    else:
-                        # Otherwise, we try to do it in 3 batches
-                        num_of_batches = 3
-                        num_in_one_batch = ceil(runs / 3)
-                        # If it's not divisible by 3 then we try 2
-                        if (num_of_batches * num_in_one_batch) != runs:
-                            num_of_batches = 2
-                            num_in_one_batch = ceil(runs / 2)
-            total_runs = num_of_batches * num_in_one_batch
+    if incremental:
+        from .incremental import IncrementalCache
 
-            # Start the actual benchmarking process
-            progress_task = progress.add_task("Current run:", total=total_runs)
-            raw_timings = []
-            for _ in range(num_of_batches):
-                timed = timer.timeit(num_in_one_batch)
-                raw_timings.append(timed)
-                console.stateful_data[1] = \
-                    f"[green]{choose_unit(raw_timings[-1] / num_in_one_batch, unit=time_unit)}[/]"
-                progress.update(progress_task, advance=num_in_one_batch)
-            timings = [time_taken_for_entire_batch / num_in_one_batch for time_taken_for_entire_batch in raw_timings]
-
-        # Calculate mean, median, standard_deviation, min, max
-        _min = min(timings)
-        _max = max(timings)
-        # If there aren't enough data then we just make the statistics -1
-        if len(timings) < 2:
-            # In an ideal world I would like to use "?" but
-            # it would probably mess something else up now.
-            mean = median = standard_deviation = -1
-        else:
-            mean = statistics.mean(timings)
-            median = statistics.median(timings)
-            standard_deviation = statistics.stdev(timings)
-
-        # Add the statistics to a exporter class to keep track of them
-        console.exporter.add_result(
-            code_snippet, statement_name, total_runs,
-            mean, median, standard_deviation, _min, _max
-        )
+        incremental_cache = IncrementalCache(incremental_file)
 
-        # Format all the statistics (add units such as ns, ms, s)
-        formatted_mean = choose_unit(mean, unit=time_unit)
-        formatted_stddev = choose_unit(standard_deviation, unit=time_unit)
-        formatted_min = choose_unit(_min, unit=time_unit)
-        formatted_max = choose_unit(_max, unit=time_unit)
+    checkpoint_file = None
+    if checkpoint and resume:
+        raise click.UsageError("--checkpoint and --resume can not be used together, --resume also writes to FILE")
+    if checkpoint or resume:
+        from .checkpoint import Checkpoint
 
-        # Figure out which statistic takes the highest width
-        # This is going to be used for padding
-        highest_width = max(len(i) for i in (formatted_mean, formatted_stddev, formatted_min, formatted_max))
+        checkpoint_file = Checkpoint(resume or checkpoint, resume=bool(resume))
+        if resume:
+            finished = sum(checkpoint_file.get(checkpoint_file.key(benchmark)) is not None for benchmark in benchmarks)
+            alt_console.print(
+                f"[cyan]Info:[/] Resuming, [green]{finished}[/] of {len(benchmarks)} snippets already finished"
+            )
 
+    # The hot and the cold result of every snippet with --cache cold
+    cache_pairs = []
+    if agents:
+        from .agent import machine_labels, make_matrix_table, run_on_agents
 
-        console.print(
-            f"  Time  ([green b]mean[/] ± [green]σ[/]):       "
-            f"[green b]{formatted_mean.rjust(highest_width)}[/] ± [green]{formatted_stddev.rjust(highest_width)}[/]"
-        )
-        console.print(
-            f"  Range ([cyan b]min[/]  … [magenta]max[/]):     "
-            f"[cyan b]{formatted_min.rjust(highest_width)}[/] … [magenta]{formatted_max.rjust(highest_width)}[/]" +
-            f"    " + f"[bright_black]\[runs: {total_runs:,}][/]"
+        job_options = dict(
+            shell=shell, shell_program=shell_program, prepare=list(prepare), cpu=cpu, isolate=isolate,
+            latency=latency,
         )
+        with alt_console.status(f"Running {len(benchmarks)} benchmarks on {len(agents)} agents") as status:
+            finished = [0]
+
+            def agent_finished(address, result):
+                finished[0] += 1
+                status.update(
+                    f"Running {len(benchmarks)} benchmarks on {len(agents)} agents "
+                    f"({finished[0]}/{len(benchmarks) * len(agents)})"
+                )
+
+            machines = run_on_agents(benchmarks, agents, job_options, token=agent_token, callback=agent_finished)
+        labels = machine_labels(machines)
+        for address, machine in machines.items():
+            console.print(Rule(f"[b]{labels[address]}[/]", style="dim"))
+            if machine["error"]:
+                alt_console.print(f"[red b]Error:[/] {machine['error']}")
+            for result in machine["results"]:
+                console.exporter.add_result(
+                    **{**result, "snippet_name": f"{result['snippet_name']} @ {labels[address]}"}
+                )
+                print_snippet_header(result["snippet_name"], result["snippet_code"], code_theme)
+                print_statistics(console.exporter.snippets[-1], time_unit)
+        if not console.exporter.snippets:
+            raise click.exceptions.Exit(1)
+        console.print(make_matrix_table(benchmarks, machines, labels, time_unit=time_unit, code_theme=code_theme))
+        console.exporter.machines = {
+            labels[address]: {"address": address, "environment": machine["environment"]}
+            for address, machine in machines.items()
+        }
+    else:
+        if cache == "cold":
+            from .cache import default_buffer_size, make_cache_table
+
+            buffer_size = cache_buffer * 1024 ** 2 if cache_buffer else default_buffer_size()
+        current_group = None
+        for benchmark_index, benchmark in enumerate(benchmarks):
+            # Print the group name and setup once before its first benchmark
+            if suite and benchmark["group"] != current_group:
+                current_group = benchmark["group"]
+                console.print(Rule(f"[b]{current_group}[/]", style="dim"))
+                if benchmark["setup"] != "pass":
+                    print_setup(benchmark["setup"], code_theme)
+            cached_result = resumed_result = None
+            if checkpoint_file is not None:
+                checkpoint_key = checkpoint_file.key(benchmark)
+                cached_result = resumed_result = checkpoint_file.get(checkpoint_key)
+            if cached_result is None and incremental:
+                incremental_key = incremental_cache.key(benchmark)
+                cached_result = incremental_cache.get(incremental_key)
+            if cached_result is not None:
+                # The benchmark hasn't changed, reuse the stored result under the current name
+                console.exporter.add_result(
+                    **{**cached_result, "snippet_code": benchmark["snippet_code"],
+                       "snippet_name": benchmark["snippet_name"]}
+                )
+                result = console.exporter.snippets[-1]
+                print_snippet_header(benchmark["snippet_name"], benchmark["snippet_code"], code_theme)
+                print_statistics(result, time_unit)
+                if resumed_result is not None:
+                    alt_console.print("  [bright_black](already finished, reused the result from the checkpoint)[/]")
+                else:
+                    alt_console.print("  [bright_black](unchanged, reused the stored result)[/]")
+            elif shell:
+                result = run_shell_benchmark(
+                    benchmark["snippet_code"], benchmark["snippet_name"], benchmark["setup"],
+                    time_unit=time_unit, code_theme=code_theme, shell=shell_command,
+                    prepare=prepare[benchmark_index] if len(prepare) > 1 else next(iter(prepare), None),
+                    overhead=shell_overhead,
+                    **{key: value for key, value in benchmark["options"].items() if key not in ("input", "input_pool")}
+                )
+                if incremental:
+                    incremental_cache.set(incremental_key, result.to_dict())
+            else:
+                result = run_benchmark(
+                    benchmark["snippet_code"], benchmark["snippet_name"], benchmark["setup"],
+                    time_unit=time_unit, code_theme=code_theme, latency=latency,
+                    **benchmark["options"]
+                )
+                if incremental:
+                    incremental_cache.set(incremental_key, result.to_dict())
+            if checkpoint_file is not None and resumed_result is None:
+                checkpoint_file.add(checkpoint_key, result.to_dict())
+            if profile:
+                print_profile(result, benchmark["setup"], profile_runs, profile_top, time_unit)
+            if line_profile:
+                print_line_profile(
+                    result, benchmark["setup"], profile_runs, benchmark.get("first_line", 1), time_unit, code_theme
+                )
+            if cache == "cold":
+                options = benchmark["options"]
+                cold_result = run_cold_benchmark(
+                    benchmark["snippet_code"], benchmark["snippet_name"], benchmark["setup"],
+                    runs=options["runs"], min_runs=options["min_runs"], max_runs=options["max_runs"],
+                    total_time=options["total_time"], time_unit=time_unit, buffer_size=buffer_size,
+                )
+                cache_pairs.append((result, cold_result))
+            if check_system:
+                # Only read between the benchmarks, so nothing runs alongside the timing loop
+                load_monitor.sample()
+        if cache_pairs:
+            console.print(make_cache_table(cache_pairs, time_unit=time_unit))
+
+    if incremental:
+        incremental_cache.save()
+    if checkpoint_file is not None:
+        checkpoint_file.close()
+    console.exporter.close_jsonl_streams()
+
+    if check_system and not agents:
+        from .environment import check_load
+
+        console.exporter.environment["load_during_run"] = load_monitor.stop()
+        for warning in check_load(console.exporter.environment["load_during_run"], os.cpu_count()):
+            alt_console.print(f"[u yellow]Warning:[/] {warning}")
 
     # If there are multiple code snippets, print a summary
-    if len(code) > 1:
-        console.print("\n[b]Summary[/]:")
-        all_snippets = console.exporter.snippets
-        # Generate a bar plot of all the snippets
-        plot = make_bar_plot(
-            labels=[format_snippet(i, code_theme=code_theme, replace_newlines=True) for i in all_snippets],
-            amounts=[i["min"] for i in all_snippets],
-            ascii_only=console.options.ascii_only
-        )
-        # Simulate a console with 500 width, used to get max bar chart size
-        # This is needed because the text is truncated in less wide consoles
-        # And measuring the size with the current console [options] will
-        # Get the size after truncating the text, I don't want that
-        opts = console.options.copy()
-        opts.size = (500, 500)
-        opts.min_width, opts.max_width = (0, 500)
-        # Get the size needed to print the plot
-        plot_size = console.measure(plot, options=opts)
-        # Print the plot if there it sufficient space
-        if console.width > plot_size.minimum:
-            console.print(plot)
-        else:
-            alt_console.print("[u yellow]Warning:[/] Bar Chart not printed due to insufficient console width")
-
-        fastest_snippet = min(all_snippets, key=lambda x: x["mean"])
-        console.print(" ", format_snippet(fastest_snippet, code_theme=code_theme, replace_newlines=True), "is the fastest.")
-        for code_snippet in all_snippets:
-            if code_snippet == fastest_snippet:
-                continue
-            console.print(
-                f"    [b green]{round(code_snippet['mean']/fastest_snippet['mean'],2 )}[/] "
-                f"([cyan]{round(code_snippet['min']/fastest_snippet['min'],2 )}[/] …"
-                f" [magenta]{round(code_snippet['max']/fastest_snippet['max'],2 )}[/])"
-                " times faster than",
-                format_snippet(code_snippet, code_theme=code_theme)
-            )
+    if len(benchmarks) > 1:
+        # The cold cache results are compared to the hot ones in their own table
+        print_summary([hot for hot, _ in cache_pairs] or console.exporter.snippets, code_theme)
 
     # Only print benchmark finished if there are some exports, otherwise
     # Don't need separation since the shell prompt should be enough
@@ -606,25 +1215,21 @@ def _autorange(timer: Timer, callback=None, max_number=INFINITY):
     if to_json:
         console.exporter.export_json("", stdout=True)
 
-    # Export the results, in order of most error prone to least
-    if export_svg:
-        console.exporter.export_svg(export_svg)
-    if export_json:
-        console.exporter.export_json(export_json)
-    if export_csv:
-        console.exporter.export_csv(export_csv)
-    if export_markdown:
-        console.exporter.export_markdown(export_markdown, unit=time_unit)
-    if export_asciidoc:
-        console.exporter.export_asciidoc(export_asciidoc, unit=time_unit)
-    if export_html:
-        console.exporter.export_html(export_html, unit=time_unit)
-    if export_yaml:
-        console.exporter.export_yaml(export_yaml)
-    if export_image:
-        console.exporter.export_image(export_image, browser=selenium_browser, add_watermark=watermark, background=background)
-    if export_plot:
-        console.exporter.export_plot(
-            export_plot, unit=time_unit, label_format=label_format,
-            dark_background=dark_background, bar_color=bar_color
-        )
+    export_results(**exports)
+
+    if record_history:
+        from .history import HistoryStore
+
+        with alt_console.status("Recording history"):
+            store = HistoryStore(history_file)
+            store.record_run(console.exporter.snippets, setup=console.exporter.setup)
+            store.close()
+        alt_console.print(f"[green] Success:[/] recorded the results in [yellow]{store.filename}[/]")
+
+    if baseline:
+        from .compare import load_results, compare_results, print_comparison, check_regressions
+
+        comparisons = compare_results(load_results(baseline), console.exporter.snippets, threshold=threshold / 100)
+        print_comparison(console, comparisons, time_unit=time_unit)
+        if check_regressions(console, comparisons, threshold / 100):
+            raise click.exceptions.Exit(1)
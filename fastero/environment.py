@@ -0,0 +1,199 @@
+"""Module for checking the system for things that make the results noisy."""
+
+import os
+import platform
+import sys
+from glob import glob
+from typing import List, Optional
+
+# Using more than this much of the CPUs (1 is all of them) from other processes makes the results noisy
+HIGH_LOAD = 0.2
+
+
+def _read(path: str) -> Optional[str]:
+    """Read a small file from /proc or /sys, None if it doesn't exist or can't be read."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def parse_cpu_list(cpu_list: str) -> List[int]:
+    """Parse a list of CPUs in the format used by the kernel, e.g. ``0-3,8,10-11``."""
+    cpus = []
+    for part in cpu_list.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition("-")
+        cpus.extend(range(int(start), int(end or start) + 1))
+    return cpus
+
+
+def _cpu_model() -> Optional[str]:
+    """Get the name of the CPU."""
+    cpuinfo = _read("/proc/cpuinfo")
+    if cpuinfo:
+        for line in cpuinfo.splitlines():
+            if line.startswith("model name"):
+                return line.partition(":")[2].strip()
+    return platform.processor() or None
+
+
+def cpu_cache_size() -> Optional[int]:
+    """Get the size of the biggest CPU cache in bytes (usually the L3 cache), None if it can't be found."""
+    sizes = []
+    for path in glob("/sys/devices/system/cpu/cpu0/cache/index[0-9]*/size"):
+        size = _read(path)
+        if size:
+            multiplier = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}.get(size[-1].upper(), 1)
+            try:
+                sizes.append(int(size.rstrip("KMGkmg")) * multiplier)
+            except ValueError:
+                continue
+    return max(sizes, default=None)
+
+
+def _turbo() -> Optional[bool]:
+    """Get whether turbo boost is enabled, None if it can't be found."""
+    no_turbo = _read("/sys/devices/system/cpu/intel_pstate/no_turbo")
+    if no_turbo is not None:
+        return no_turbo == "0"
+    boost = _read("/sys/devices/system/cpu/cpufreq/boost")
+    if boost is not None:
+        return boost == "1"
+    return None
+
+
+def _cpu_times():
+    """Get the total and the idle CPU time of all the CPUs from /proc/stat, None if it can't be read."""
+    stat = _read("/proc/stat")
+    if not stat:
+        return None
+    times = [int(i) for i in stat.splitlines()[0].split()[1:]]
+    # idle + iowait
+    return sum(times), times[3] + (times[4] if len(times) > 4 else 0)
+
+
+def collect_environment() -> dict:
+    """
+    Collect information about the system that affects the results.
+
+    Returns
+    -------
+    dict
+        The environment, the values that can't be found (e.g. on platforms
+        without /proc and /sys) are None
+    """
+    governors = sorted({
+        governor for governor in map(_read, glob("/sys/devices/system/cpu/cpu[0-9]*/cpufreq/scaling_governor"))
+        if governor
+    })
+    aslr = _read("/proc/sys/kernel/randomize_va_space")
+    try:
+        load_average = list(os.getloadavg())
+    except (AttributeError, OSError):
+        load_average = None
+    return {
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+        "executable": sys.executable,
+        "platform": platform.platform(),
+        "cpu": _cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "governors": governors or None,
+        "turbo": _turbo(),
+        "load_average": load_average,
+        "isolated_cpus": _read("/sys/devices/system/cpu/isolated"),
+        "aslr": int(aslr) if aslr is not None and aslr.isdigit() else None,
+    }
+
+
+def check_environment(environment: dict) -> List[str]:
+    """
+    Find the things in the environment that make the results noisy.
+
+    Returns
+    -------
+    List[str]
+        A warning for each problem found
+    """
+    warnings = []
+    governors = environment.get("governors")
+    if governors and governors != ["performance"]:
+        warnings.append(
+            f"The CPU frequency governor is [yellow]{', '.join(governors)}[/], the results may vary with the "
+            "CPU frequency. Set it to performance, e.g. with [cyan]cpupower frequency-set -g performance[/]"
+        )
+    if environment.get("turbo"):
+        warnings.append("Turbo boost is enabled, the CPU frequency depends on its temperature")
+    load_average = environment.get("load_average")
+    cpu_count = environment.get("cpu_count") or 1
+    if load_average and load_average[0] / cpu_count > HIGH_LOAD:
+        warnings.append(
+            f"The system is busy (load average [yellow]{load_average[0]:.2f}[/] on {cpu_count} CPUs), "
+            "other processes may slow down the benchmarks"
+        )
+    isolated = parse_cpu_list(environment.get("isolated_cpus") or "")
+    if isolated and hasattr(os, "sched_getaffinity") and not os.sched_getaffinity(0) <= set(isolated):
+        warnings.append(
+            f"The CPUs [yellow]{environment['isolated_cpus']}[/] are isolated but fastero isn't only running on them, "
+            "use [cyan]taskset[/] to run it on them"
+        )
+    return warnings
+
+
+class LoadMonitor:
+    """
+    Measure how busy the CPUs were while each benchmark ran.
+
+    The CPU times are only read between the benchmarks, with :meth:`sample`, so
+    nothing runs alongside the timing loop. Each sample is the load since the
+    previous one.
+    """
+
+    def __init__(self):
+        self.samples = []
+        self._previous = None
+
+    def start(self):
+        """Read the CPU times the first sample starts from."""
+        self._previous = _cpu_times()
+        return self
+
+    def sample(self):
+        """Take a sample of the load since the previous sample, or since :meth:`start` for the first one."""
+        current = _cpu_times()
+        if self._previous is not None and current is not None:
+            total, idle = current[0] - self._previous[0], current[1] - self._previous[1]
+            if total > 0:
+                self.samples.append(1 - idle / total)
+        self._previous = current
+
+    def stop(self) -> Optional[dict]:
+        """
+        Summarize the samples.
+
+        Returns
+        -------
+        Optional[dict]
+            The ``mean`` and ``max`` fraction of CPU time that was used (including by
+            fastero itself) and the amount of ``samples``, None if there are no samples
+        """
+        if not self.samples:
+            return None
+        return {"mean": sum(self.samples) / len(self.samples), "max": max(self.samples), "samples": len(self.samples)}
+
+
+def check_load(load: Optional[dict], cpu_count: Optional[int]) -> List[str]:
+    """Find whether other processes were using the CPUs while the benchmarks ran."""
+    if not load:
+        return []
+    # fastero itself keeps one CPU busy
+    others = load["max"] - 1 / (cpu_count or 1)
+    if others > HIGH_LOAD:
+        return [
+            f"Other processes used up to [yellow]{others:.0%}[/] of the CPUs while benchmarking, "
+            "the results may be noisy"
+        ]
+    return []
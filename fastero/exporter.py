@@ -1,14 +1,131 @@
 """Module for exporting data."""
 
+from typing import List
+
 import click
 
 from rich.console import Console
 from rich.terminal_theme import TerminalTheme
 
+from .results import LATENCY_FIELDS, RESULT_FIELDS, Result, ResultCollection
+
+
+# For previews in my IDE and on the GitHub website (using extensions)
+def rgb(r, g, b):
+    """Return the color as a tuple, the function name lets editors show a color preview."""
+    return (r, g, b)
+
+
+ORIGINAL_TERMINAL_THEME = TerminalTheme(
+    rgb(12, 12, 12),
+    rgb(242, 242, 242),
+    [
+        rgb(12, 12, 12),
+        rgb(205, 49, 49),
+        rgb(13, 188, 121),
+        rgb(229, 229, 16),
+        rgb(36, 114, 200),
+        rgb(138, 115, 255),
+        rgb(17, 168, 205),
+        rgb(229, 229, 229),
+    ],
+    [
+        rgb(82, 82, 82),
+        rgb(241, 76, 76),
+        rgb(35, 209, 139),
+        rgb(245, 245, 67),
+        rgb(59, 142, 234),
+        rgb(214, 112, 214),
+        rgb(41, 184, 219),
+        rgb(229, 229, 229),
+    ],
+)
+DRACULA_TERMINAL_THEME = TerminalTheme(
+    rgb(40, 42, 54),
+    rgb(248, 248, 242),
+    [
+        rgb(40, 42, 54),
+        rgb(255, 85, 85),
+        rgb(80, 250, 123),
+        rgb(241, 250, 140),
+        rgb(189, 147, 249),
+        rgb(255, 121, 198),
+        rgb(139, 233, 253),
+        rgb(248, 248, 242),
+    ],
+    [
+        rgb(100, 113, 162),
+        rgb(251, 109, 113),
+        rgb(113, 255, 151),
+        rgb(254, 255, 169),
+        rgb(214, 171, 253),
+        rgb(253, 144, 222),
+        rgb(169, 255, 254),
+        rgb(255, 255, 255),
+    ],
+)
+CUSTOM_TERMINAL_THEME = TerminalTheme(
+    rgb(34, 33, 44),
+    rgb(248, 248, 242),
+    [
+        rgb(34, 33, 44),
+        rgb(251, 149, 132),
+        rgb(138, 255, 128),
+        rgb(255, 255, 128),
+        rgb(48, 184, 243),
+        rgb(149, 128, 255),  # magenta/purple
+        # rgb(255, 121, 198),  # pink
+        rgb(128, 255, 234),
+        rgb(248, 248, 242),
+    ],
+    [
+        rgb(121, 112, 169),
+        rgb(253, 202, 194),
+        rgb(167, 237, 209),
+        rgb(254, 255, 219),
+        rgb(211, 231, 245),
+        rgb(221, 208, 243),
+        rgb(219, 255, 249),
+        rgb(255, 255, 255),
+    ],
+)
+
+# The colors of the gradients used as random backgrounds by the pillow image renderer,
+# these are the same as the CSS gradients used by the browser renderer
+GRADIENT_COLORS = [
+    ("#91EAE4", "#7F7FD5"),
+    ("#240b36", "#c31432"),
+    ("#f5af19", "#f12711"),
+    ("#2ebf91", "#8360c3"),
+    ("#ec2F4B", "#009FFF"),
+    ("#3df5a7", "#096fe0"),
+    ("#7bd860", "#ffffff"),
+    ("#478bd6", "#25d8d3"),
+    ("#2591fb", "#000780"),
+    ("#ab66ff", "#74b6f7"),
+    ("#c9256b", "#74107c"),
+    ("#0eae57", "#0c7475"),
+    ("#ad00ab", "#0f335c"),
+    ("#188a8d", "#60dd8e"),
+]
+# Monospace fonts to try for the pillow image renderer, as (regular, bold)
+MONOSPACE_FONTS = [
+    ("FiraCode-Regular.ttf", "FiraCode-Bold.ttf"),
+    ("CascadiaCode.ttf", "CascadiaCode.ttf"),
+    ("DejaVuSansMono.ttf", "DejaVuSansMono-Bold.ttf"),
+    ("Menlo.ttc", "Menlo.ttc"),
+    ("consola.ttf", "consolab.ttf"),
+    ("LiberationMono-Regular.ttf", "LiberationMono-Bold.ttf"),
+    ("cour.ttf", "courbd.ttf"),
+]
+
 
 class Exporter:
     """Class for managing and exporting data."""
 
+    # Keys of the results that hold raw data which can't be shown in a table
+    RAW_KEYS = ("timings", "latency_histogram")
+
     def __init__(self, console: Console = None, alt_console: Console = None, setup: str = None):
         """
         Initialize the exporter.
@@ -22,11 +139,25 @@ def __init__(self, console: Console = None, alt_console: Console = None, setup:
         setup : str, optional
             The code used for the setup
         """
-        self.snippets = []
+        self.snippets = ResultCollection()
         self.console = console
         self.alt_console = alt_console
         self.setup = setup
         self._export_needed = False
+        # Files that JSON Lines records are streamed to as soon as each result is added
+        self.jsonl_streams = []
+        self.jsonl_batches = False
+        # The profiles made with --profile and --line-profile, by snippet name
+        self.profiles = {}
+        self.line_profiles = {}
+        # Information about the system, collected with --check-system
+        self.environment = None
+        # The machines the benchmarks ran on with --agent, by name
+        self.machines = None
+        # The variation within and between the runs of each merged snippet, by snippet name
+        self.run_variance = {}
+        # The time it takes to read the clock with --latency, subtracted from the iteration times
+        self.timer_overhead = None
 
     def add_result(
         self,
@@ -37,7 +168,9 @@ def add_result(
         median: int,
         stddev: int,
         min: int,
-        max: int
+        max: int,
+        timings: List[float] = None,
+        **latency: float,
     ):
         """
         Add a result to the exporter's list of results.
@@ -60,21 +193,110 @@ def add_result(
             The fastest run from all runs of the snippet
         max : int
             The slowest run from all runs of the snippet
+        timings : List[float], optional
+            The time a single run took in each batch, these are the raw samples
+            the statistics were calculated from
+        **latency : float
+            The percentiles of the iteration times measured with ``--latency``, the keys
+            are :data:`~fastero.results.LATENCY_FIELDS`, and the ``latency_histogram``
         """
-        self.snippets.append(
-            {
-                "snippet_code": snippet_code,
-                "snippet_name": snippet_name,
-                "runs": runs,
-                "mean": mean,
-                "median": median,
-                "min": min,
-                "max": max,
-                "stddev": stddev,
-            }
+        result = Result(
+            snippet_code=snippet_code,
+            snippet_name=snippet_name,
+            runs=runs,
+            mean=mean,
+            median=median,
+            min=min,
+            max=max,
+            stddev=stddev,
+            timings=timings,
+            **latency,
         )
+        self.snippets.append(result)
+        if self.jsonl_streams:
+            self.emit_jsonl({"type": "result", **result.to_dict()})
+
+    def add_profile(self, snippet_name: str, profile: dict):
+        """
+        Add the profile of a snippet.
+
+        Parameters
+        ----------
+        snippet_name : str
+            The name for the snippet
+        profile : dict
+            The profile, as returned by :func:`fastero.profiling.profile_snippet`
+        """
+        self.profiles[snippet_name] = profile
+        self.emit_jsonl({"type": "profile", "snippet_name": snippet_name, **profile})
+
+    def add_line_profile(self, snippet_name: str, profile: dict):
+        """
+        Add the line profile of a snippet.
+
+        Parameters
+        ----------
+        snippet_name : str
+            The name for the snippet
+        profile : dict
+            The line profile, as returned by :func:`fastero.profiling.profile_lines`
+        """
+        self.line_profiles[snippet_name] = profile
+        self.emit_jsonl({"type": "line_profile", "snippet_name": snippet_name, **profile})
+
+    def open_jsonl_stream(self, filename=None, batches=False):
+        """
+        Start streaming the results as JSON Lines, one record per line.
 
-    def export_json(self, filename, stdout=False):
+        Parameters
+        ----------
+        filename : Union[str, Path], optional
+            The file to stream to, by default stdout
+        batches : bool, optional
+            Whether to also stream a record for each batch, by default False
+        """
+        import sys
+
+        stream = sys.stdout if filename is None else open(filename, "w", encoding="utf-8")
+        self.jsonl_streams.append(stream)
+        self.jsonl_batches = self.jsonl_batches or batches
+        self.emit_jsonl({"type": "start", "setup": self.setup})
+
+    def emit_jsonl(self, record: dict):
+        """Write a record to all the JSON Lines streams and flush them, so they can be consumed right away."""
+        if not self.jsonl_streams:
+            return
+        import json
+
+        line = json.dumps(record) + "\n"
+        for stream in self.jsonl_streams:
+            stream.write(line)
+            stream.flush()
+
+    def close_jsonl_streams(self):
+        """Write the final record to all the JSON Lines streams and close them."""
+        import sys
+
+        self.emit_jsonl({"type": "end", "count": len(self.snippets)})
+        for stream in self.jsonl_streams:
+            if stream is not sys.stdout:
+                stream.close()
+        self.jsonl_streams = []
+
+    @property
+    def table_keys(self):
+        """
+        The keys of the results that are shown in tables.
+
+        This excludes the raw samples, and the percentiles if no result was measured with ``--latency``.
+        """
+        has_latency = any(value is not None for value in self.snippets.column("p50"))
+        return [
+            key for key in RESULT_FIELDS
+            if key not in self.RAW_KEYS and (has_latency or key not in LATENCY_FIELDS)
+        ]
+
+    def export_json(self, filename, stdout=False, npy_samples=False):
         """
         Export results to a JSON file.
 
@@ -84,26 +306,44 @@ def export_json(self, filename, stdout=False):
             The path of the file to where the results will be exported
         stdout : bool
             If used, print the results to stdout and return
+        npy_samples : bool
+            If used, write the raw samples to a binary ``.npy`` file next to the JSON file
+            and only reference them from it
         """
         import json
+        if npy_samples and not stdout:
+            from .samples import npy_filename, write_npy
+
+            samples_filename = npy_filename(filename)
+            locations = write_npy(samples_filename, self.snippets.column("timings"))
+            # The same keys as without the samples file, only the timings are replaced by where they are in it
+            results = self.snippets.to_dicts()
+            for result, location in zip(results, locations):
+                result["timings"] = {"offset": location[0], "count": location[1]} if location else None
+            data = {
+                "setup": self.setup, "results": results,
+                "samples": {"file": samples_filename.name, "format": "npy", "dtype": "<f8"},
+            }
+        else:
+            data = {"setup": self.setup, "results": self.snippets.to_dicts()}
+        if self.profiles:
+            data["profiles"] = self.profiles
+        if self.line_profiles:
+            data["line_profiles"] = self.line_profiles
+        if self.environment:
+            data["environment"] = self.environment
+        if self.machines:
+            data["machines"] = self.machines
+        if self.run_variance:
+            data["run_variance"] = self.run_variance
+        if self.timer_overhead is not None:
+            data["timer_overhead"] = self.timer_overhead
         if stdout:
-            return print(
-                json.dumps(
-                    {
-                        "setup": self.setup,
-                        "results": self.snippets,
-                    },
-                    indent=4,
-                )
-            )
+            return print(json.dumps(data, indent=4))
         with self.alt_console.status("Exporting JSON"):
             with open(filename, "w", encoding="utf-8") as f:
                 json.dump(
-                    {
-                        "$schema": "https://raw.githubusercontent.com/wasi-master/fastero/main/schema.json",
-                        "setup": self.setup,
-                        "results": self.snippets,
-                    },
+                    {"$schema": "https://raw.githubusercontent.com/wasi-master/fastero/main/schema.json", **data},
                     f,
                     indent=4,
                 )
@@ -124,12 +364,11 @@ def export_csv(self, filename):
                 f.write(
                     ",".join(
                         i.replace("_", " ").title().replace("Stddev", "Standard Deviation")
-                        for i in self.snippets[0].keys()
+                        for i in self.table_keys
                     )
                     + "\n"
                 )
-                for snippet in self.snippets:
-                    f.write(",".join(map(str, snippet.values())) + "\n")
+                f.writelines(",".join(map(str, row)) + "\n" for row in self.snippets.rows(self.table_keys))
             self.alt_console.print("[green] Success:[/] exported as CSV")
 
     def export_yaml(self, filename):
@@ -156,7 +395,20 @@ def export_yaml(self, filename):
                 from yaml import Dumper
 
             with open(filename, "w", encoding="utf-8") as f:
-                f.write(dump({"results": self.snippets}))
+                data = {"results": self.snippets.to_dicts()}
+                if self.profiles:
+                    data["profiles"] = self.profiles
+                if self.line_profiles:
+                    data["line_profiles"] = self.line_profiles
+                if self.environment:
+                    data["environment"] = self.environment
+                if self.machines:
+                    data["machines"] = self.machines
+                if self.run_variance:
+                    data["run_variance"] = self.run_variance
+                if self.timer_overhead is not None:
+                    data["timer_overhead"] = self.timer_overhead
+                f.write(dump(data))
             self.alt_console.print("[green] Success:[/] exported as YAML")
 
     def export_markdown(self, filename, unit: str = None):
@@ -181,23 +433,19 @@ def export_markdown(self, filename, unit: str = None):
                         .replace("|", "\\|")
                         .title()
                         .replace("Stddev", "Standard Deviation")
-                        for i in self.snippets[0].keys()
+                        for i in self.table_keys
                     )
                     + "|\n"
                 )
-                f.write("|" + "|".join(["---"] * len(self.snippets[0].keys())) + "|\n")
-                for snippet in self.snippets:
-                    f.write(
-                        "|"
-                        + "|".join(
-                            [
-                                choose_unit(x, unit=unit, asciimode=False) if isinstance(x, float) else str(x)
-                                for x in
-                                snippet.values()
-                            ]
-                        )
-                        + "|\n"
+                f.write("|" + "|".join(["---"] * len(self.table_keys)) + "|\n")
+                f.writelines(
+                    "|"
+                    + "|".join(
+                        choose_unit(x, unit=unit, asciimode=False) if isinstance(x, float) else str(x) for x in row
                     )
+                    + "|\n"
+                    for row in self.snippets.rows(self.table_keys)
+                )
             self.alt_console.print("[green] Success:[/] exported as Markdown")
 
     def export_asciidoc(self, filename, unit: str = None):
@@ -217,7 +465,7 @@ def export_asciidoc(self, filename, unit: str = None):
             with open(filename, "w", encoding="utf-8") as f:
                 f.write(
                     '[cols="'
-                    + "".join([","] * (len(self.snippets[0].keys()) - 1))
+                    + "".join([","] * (len(self.table_keys) - 1))
                     + '" options="header"]\n'
                 )
                 f.write("|===\n")
@@ -228,22 +476,18 @@ def export_asciidoc(self, filename, unit: str = None):
                         .replace("|", "\\|")
                         .title()
                         .replace("Stddev", "Standard Deviation")
-                        for i in self.snippets[0].keys()
+                        for i in self.table_keys
                     )
                     + "\n"
                 )
-                for snippet in self.snippets:
-                    f.write(
-                        "|"
-                        + "|".join(
-                            [
-                                choose_unit(x, unit=unit, asciimode=False) if isinstance(x, float) else str(x)
-                                for x in
-                                snippet.values()
-                            ]
-                        )
-                        + "\n"
+                f.writelines(
+                    "|"
+                    + "|".join(
+                        choose_unit(x, unit=unit, asciimode=False) if isinstance(x, float) else str(x) for x in row
                     )
+                    + "\n"
+                    for row in self.snippets.rows(self.table_keys)
+                )
                 f.write("|===\n")
             self.alt_console.print("[green] Success:[/] exported as AsciiDoc")
 
@@ -264,19 +508,22 @@ def export_html(self, filename, unit: str):
         with self.alt_console.status("Exporting HTML"):
             with open(filename, "w", encoding="utf-8") as f:
                 f.write("<table><thead><tr>\n")
-                for header_item in self.snippets[0].keys():
+                for header_item in self.table_keys:
                     formatted = escape(header_item.replace('_', ' ').title().replace('Stddev', 'Standard Deviation'))
                     f.write(
                         f"<th>{formatted}</th>\n"
                     )
                 f.write("</tr></thead>\n<tbody>")
-                for snippet in self.snippets:
+                for snippet_code, snippet_name, *values in self.snippets.rows(self.table_keys):
                     f.write("<tr>\n")
-                    f.write(f"<td>{snippet['snippet_code']}</td>\n<td>{snippet['snippet_name']}</td>\n")
+                    f.write(f"<td>{snippet_code}</td>\n<td>{snippet_name}</td>\n")
                     f.write(
                         "\n  ".join(
-                            f"<td>{escape(choose_unit(snippet['mean'], unit=unit, asciimode=False))}</td>\n"
-                            for value in snippet.values()[2:]
+                            "<td>"
+                            + escape(choose_unit(value, unit=unit, asciimode=False)
+                                     if isinstance(value, float) else str(value))
+                            + "</td>\n"
+                            for value in values
                         )
                     )
                     f.write("</tr>\n")
@@ -297,9 +544,162 @@ def export_svg(self, filename):
                 f.write(self.console.export_svg(title="Python Benchmark Output", clear=False))
             self.alt_console.print("[green] Success:[/] exported as SVG")
 
-    def export_image(self, filename, browser="chrome", add_watermark=True, background="random"):
+    def _get_console_lines(self):
+        """Get the recorded console output as a list of lines of segments, the same way ``export_svg`` does."""
+        from rich.segment import Segment
+        from rich.style import Style
+        from rich.text import Text
+
+        console = self.console
+        with console._record_buffer_lock:
+            segments = Segment.simplify(console._record_buffer)
+            segments = Segment.filter_control(segments)
+            parts = [(text, style or Style.null()) for text, style, _ in segments]
+        terminal_text = Text.assemble(*parts)
+        lines = terminal_text.wrap(console, width=console.width, overflow="fold")
+        segments = console.render(lines, options=console.options)
+        return list(Segment.split_and_crop_lines(segments, length=console.width, include_new_lines=False))
+
+    def _export_image_with_pillow(self, filename, add_watermark=True, background="random", font=None):
         """
-        Export results (console output) to a CSV file.
+        Draw the recorded console output straight to an image using Pillow.
+
+        Returns
+        -------
+        bool
+            False if the background isn't a color Pillow understands, True otherwise
+        """
+        import random
+
+        try:
+            from PIL import Image, ImageColor, ImageDraw, ImageFilter, ImageFont
+        except ImportError:
+            self.alt_console.print(
+                "[red b]Error:[/] The package [#bbbbbb on #222222]Pillow[/] is not installed. "
+                "Please install it in order to export images."
+            )
+            raise click.exceptions.Exit()
+        from rich.cells import cell_len
+
+        if background == "random":
+            gradient = tuple(ImageColor.getrgb(i) for i in random.choice(GRADIENT_COLORS))
+        else:
+            try:
+                gradient = (ImageColor.getrgb(background),) * 2
+            except ValueError:
+                return False
+
+        font_size = 20
+        fonts = [(font, font)] if font else MONOSPACE_FONTS
+        for regular_name, bold_name in fonts:
+            try:
+                regular_font = ImageFont.truetype(regular_name, font_size)
+            except OSError:
+                continue
+            try:
+                bold_font = ImageFont.truetype(bold_name, font_size)
+            except OSError:
+                bold_font = regular_font
+            break
+        else:
+            self.alt_console.print("[u yellow]Warning:[/] No monospace font found, using the default font")
+            regular_font = bold_font = ImageFont.load_default()
+
+        theme = CUSTOM_TERMINAL_THEME
+        foreground = tuple(theme.foreground_color)
+        terminal_background = tuple(theme.background_color)
+        lines = self._get_console_lines()
+        # Remove the trailing empty lines and columns
+        while lines and not "".join(segment.text for segment in lines[-1]).strip():
+            lines.pop()
+        columns = max((cell_len("".join(segment.text for segment in line).rstrip()) for line in lines), default=0)
+
+        char_width = regular_font.getlength("M")
+        line_height = round(font_size * 1.4)
+        margin_x, margin_y, header_height, padding = 130, 100, 64, 24
+        terminal_width = round(columns * char_width) + padding * 2
+        terminal_height = header_height + len(lines) * line_height + padding * 2
+        width, height = terminal_width + margin_x * 2, terminal_height + margin_y * 2
+
+        # Background
+        if gradient[0] == gradient[1]:
+            image = Image.new("RGB", (width, height), gradient[0])
+        else:
+            mask = Image.linear_gradient("L").rotate(90).resize((width, height))
+            image = Image.composite(Image.new("RGB", (width, height), gradient[0]),
+                                    Image.new("RGB", (width, height), gradient[1]), mask)
+        image = image.convert("RGBA")
+        box = (margin_x, margin_y, margin_x + terminal_width, margin_y + terminal_height)
+
+        # Shadow
+        shadow = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        ImageDraw.Draw(shadow).rounded_rectangle(
+            (box[0], box[1] + 8, box[2], box[3] + 8), radius=14, fill=(10, 10, 10, 128)
+        )
+        image = Image.alpha_composite(image, shadow.filter(ImageFilter.GaussianBlur(12)))
+
+        # Window
+        draw = ImageDraw.Draw(image)
+        draw.rounded_rectangle(box, radius=14, fill=terminal_background)
+        draw.rounded_rectangle((box[0], box[1], box[2], box[1] + header_height), radius=14, fill=(56, 55, 74))
+        draw.rectangle((box[0], box[1] + header_height - 14, box[2], box[1] + header_height), fill=(56, 55, 74))
+        for index, color in enumerate(("#ff6159", "#ffbd2e", "#28c941")):
+            center_x, center_y = box[0] + 34 + index * 24, box[1] + header_height // 2
+            draw.ellipse((center_x - 8, center_y - 8, center_x + 8, center_y + 8), fill=color)
+        title = "Python Benchmark Output"
+        title_width = bold_font.getlength(title)
+        draw.rounded_rectangle(
+            (box[0] + 124, box[1] + 14, box[0] + 124 + title_width + 56, box[1] + header_height + 8),
+            radius=8, fill=terminal_background,
+        )
+        draw.text((box[0] + 152, box[1] + 26), title, font=bold_font, fill=foreground)
+
+        # Console output
+        origin_x, origin_y = box[0] + padding, box[1] + header_height + padding
+        for line_number, line in enumerate(lines):
+            y = origin_y + line_number * line_height
+            column = 0
+            for text, style, _ in line:
+                color, bgcolor = foreground, None
+                text_font = regular_font
+                if style:
+                    if style.color is not None and not style.color.is_default:
+                        color = tuple(style.color.get_truecolor(theme, foreground=True))
+                    if style.bgcolor is not None and not style.bgcolor.is_default:
+                        bgcolor = tuple(style.bgcolor.get_truecolor(theme, foreground=False))
+                    if style.reverse:
+                        color, bgcolor = bgcolor or terminal_background, color
+                    if style.dim:
+                        color = tuple((a + b) // 2 for a, b in zip(color, bgcolor or terminal_background))
+                    if style.bold:
+                        text_font = bold_font
+                text_width = cell_len(text)
+                x = origin_x + column * char_width
+                if bgcolor:
+                    draw.rectangle((x, y, x + text_width * char_width, y + line_height), fill=bgcolor)
+                if style and style.underline:
+                    draw.line((x, y + line_height - 3, x + text_width * char_width, y + line_height - 3), fill=color)
+                # Draw character by character so that every character stays in its cell
+                for character in text:
+                    if not character.isspace():
+                        draw.text(
+                            (origin_x + column * char_width, y + (line_height - font_size) // 2),
+                            character, font=text_font, fill=color
+                        )
+                    column += cell_len(character)
+
+        if add_watermark:
+            watermark_font = bold_font.font_variant(size=26) if hasattr(bold_font, "font_variant") else bold_font
+            text_width = watermark_font.getlength("Fastero")
+            draw.text((width - text_width - 40, height - 50), "Fastero", font=watermark_font, fill=(255, 255, 255, 204))
+
+        image.convert("RGB").save(filename)
+        return True
+
+    def export_image(self, filename, browser="chrome", add_watermark=True, background="random", renderer="pillow",
+                     font=None):
+        """
+        Export results (console output) to an image file.
 
         Parameters
         ----------
@@ -308,89 +708,35 @@ def export_image(self, filename, browser="chrome", add_watermark=True, backgroun
         browser : str
             The name of the browser to use for the screenshot.
             Any of chrome, firefox, edge, opera, safari
+        add_watermark : bool
+            Whether to add a watermark to the bottom right corner
+        background : str
+            The background of the image, "random" for a random gradient
+        renderer : str
+            "pillow" to draw the image directly, or "browser" to screenshot the SVG output in a headless browser.
+            The pillow renderer only supports colors as the background, it falls back to the browser otherwise
+        font : str, optional
+            The font file used by the pillow renderer, by default the first monospace font found
         """
+        if renderer == "pillow":
+            with self.alt_console.status("Exporting Image"):
+                rendered = self._export_image_with_pillow(
+                    filename, add_watermark=add_watermark, background=background, font=font
+                )
+            if rendered:
+                self.alt_console.print("[green] Success:[/] exported as Image")
+                return
+            self.alt_console.print(
+                f"[cyan]Info:[/] The background [yellow]{background}[/] is not a color, "
+                "using a headless browser instead"
+            )
+
         import platform
         import os.path
         import tempfile
         import random
         from pathlib import Path
 
-        # For previews in my IDE and on the GitHub website (using extensions)
-        rgb = lambda r, g, b: (r, g, b)
-
-        ORIGINAL_TERMINAL_THEME = TerminalTheme(
-            rgb(12, 12, 12),
-            rgb(242, 242, 242),
-            [
-                rgb(12, 12, 12),
-                rgb(205, 49, 49),
-                rgb(13, 188, 121),
-                rgb(229, 229, 16),
-                rgb(36, 114, 200),
-                rgb(138, 115, 255),
-                rgb(17, 168, 205),
-                rgb(229, 229, 229),
-            ],
-            [
-                rgb(82, 82, 82),
-                rgb(241, 76, 76),
-                rgb(35, 209, 139),
-                rgb(245, 245, 67),
-                rgb(59, 142, 234),
-                rgb(214, 112, 214),
-                rgb(41, 184, 219),
-                rgb(229, 229, 229),
-            ],
-        )
-        DRACULA_TERMINAL_THEME = TerminalTheme(
-            rgb(40, 42, 54),
-            rgb(248, 248, 242),
-            [
-                rgb(40, 42, 54),
-                rgb(255, 85, 85),
-                rgb(80, 250, 123),
-                rgb(241, 250, 140),
-                rgb(189, 147, 249),
-                rgb(255, 121, 198),
-                rgb(139, 233, 253),
-                rgb(248, 248, 242),
-            ],
-            [
-                rgb(100, 113, 162),
-                rgb(251, 109, 113),
-                rgb(113, 255, 151),
-                rgb(254, 255, 169),
-                rgb(214, 171, 253),
-                rgb(253, 144, 222),
-                rgb(169, 255, 254),
-                rgb(255, 255, 255),
-            ],
-        )
-        CUSTOM_TERMINAL_THEME = TerminalTheme(
-            rgb(34, 33, 44),
-            rgb(248, 248, 242),
-            [
-                rgb(34, 33, 44),
-                rgb(251, 149, 132),
-                rgb(138, 255, 128),
-                rgb(255, 255, 128),
-                rgb(48, 184, 243),
-                rgb(149, 128, 255),  # magenta/purple
-                # rgb(255, 121, 198),  # pink
-                rgb(128, 255, 234),
-                rgb(248, 248, 242),
-            ],
-            [
-                rgb(121, 112, 169),
-                rgb(253, 202, 194),
-                rgb(167, 237, 209),
-                rgb(254, 255, 219),
-                rgb(211, 231, 245),
-                rgb(221, 208, 243),
-                rgb(219, 255, 249),
-                rgb(255, 255, 255),
-            ],
-        )
         gradients = [
         """\
         body {{
@@ -724,15 +1070,13 @@ def add_value_labels(ax, spacing=5):
             barWidth = 0.20
 
             labels = list(
-                label_format.format(
-                    snippet_name=i["snippet_name"], snippet_code=i["snippet_code"], runs=i["runs"]
-                )
-                for i in self.snippets
+                label_format.format(snippet_name=snippet_name, snippet_code=snippet_code, runs=runs)
+                for snippet_name, snippet_code, runs in self.snippets.rows(("snippet_name", "snippet_code", "runs"))
             )
-            means = list(i["mean"] for i in self.snippets)
-            # medians = list(i["median"] for i in self.snippets)
-            # mins = list(i["min"] for i in self.snippets)
-            # maxes = list(i["max"] for i in self.snippets)
+            means = self.snippets.column("mean").tolist()
+            # medians = self.snippets.column("median").tolist()
+            # mins = self.snippets.column("min").tolist()
+            # maxes = self.snippets.column("max").tolist()
 
             # Set position of bar on X axis
             br1 = np.arange(len(labels))
@@ -0,0 +1,138 @@
+"""Module for recording iteration times in a log-bucketed histogram, like HdrHistogram."""
+
+from array import array
+from math import ceil
+from typing import Iterable, List, Tuple
+
+# Values are integers below 2 ** 64, e.g. nanoseconds
+MAX_VALUE_BITS = 64
+DEFAULT_SIGNIFICANT_BITS = 8
+
+
+class LatencyHistogram:
+    """
+    A histogram of integer values with buckets that get wider as the values get bigger.
+
+    The values below ``2 ** significant_bits`` each get their own bucket. Above that,
+    every power of two is split into ``2 ** (significant_bits - 1)`` buckets of the
+    same width, so a value is only ever off by at most ``2 ** (1 - significant_bits)``
+    of itself (0.78% by default). The buckets are allocated once for every value below
+    ``2 ** 64``, so recording billions of values uses the same memory as recording one.
+
+    Histograms with the same ``significant_bits`` can be merged by adding their buckets,
+    so the histograms of batches, agents or runs can be combined without losing anything.
+    """
+
+    def __init__(self, significant_bits: int = DEFAULT_SIGNIFICANT_BITS):
+        if not 1 <= significant_bits <= 16:
+            raise ValueError("significant_bits must be between 1 and 16")
+        self.significant_bits = significant_bits
+        self.counts = array("q", bytes(8 * self.bucket_count(significant_bits)))
+        # The exact amount, sum and maximum of the values, the buckets only give them approximately
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def bucket_count(significant_bits: int) -> int:
+        """Get how many buckets are needed to hold every value below ``2 ** 64``."""
+        return (MAX_VALUE_BITS - significant_bits + 2) << (significant_bits - 1)
+
+    def bucket_index(self, value: int) -> int:
+        """Get the index of the bucket a value is counted in."""
+        shift = max(value.bit_length() - self.significant_bits, 0)
+        return (shift << (self.significant_bits - 1)) + (value >> shift)
+
+    def bucket_range(self, index: int) -> Tuple[int, int]:
+        """Get the lowest and the highest value counted in a bucket."""
+        half = 1 << (self.significant_bits - 1)
+        shift = max(index // half - 1, 0)
+        lowest = (index - (shift << (self.significant_bits - 1))) << shift
+        return lowest, lowest + (1 << shift) - 1
+
+    @property
+    def relative_error(self) -> float:
+        """The most a percentile can be off by, relative to its value."""
+        return 2.0 ** (1 - self.significant_bits)
+
+    def record(self, value: int, count: int = 1):
+        """Count a value ``count`` times."""
+        self.counts[self.bucket_index(value)] += count
+        self.count += count
+        self.total += value * count
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """
+        Add the values of another histogram to this one.
+
+        Raises
+        ------
+        ValueError
+            If the histograms don't have the same ``significant_bits``
+        """
+        if other.significant_bits != self.significant_bits:
+            raise ValueError(
+                f"Can not merge a histogram with {other.significant_bits} significant bits "
+                f"into one with {self.significant_bits}"
+            )
+        for index, count in other.nonzero():
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        return self
+
+    def nonzero(self) -> Iterable[Tuple[int, int]]:
+        """Go over the index and the count of every bucket with values in it."""
+        return ((index, count) for index, count in enumerate(self.counts) if count)
+
+    def percentile(self, percentile: float) -> int:
+        """
+        Get a percentile of the values, using the nearest-rank method.
+
+        This is the highest value of the bucket the percentile falls in, so it is never
+        lower than the exact percentile and at most :attr:`relative_error` higher. The
+        100th percentile is the exact maximum.
+        """
+        if not self.count:
+            return 0
+        if percentile >= 100:
+            return self.max
+        rank = max(ceil(percentile / 100 * self.count), 1)
+        seen = 0
+        for index, count in self.nonzero():
+            seen += count
+            if seen >= rank:
+                return min(self.bucket_range(index)[1], self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        """Convert the histogram to a dict that can be serialized, only the buckets with values are included."""
+        return {
+            "significant_bits": self.significant_bits,
+            "count": self.count,
+            "total": self.total,
+            "max": self.max,
+            "buckets": [[index, count] for index, count in self.nonzero()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        """Load a histogram from a dict made with :meth:`to_dict`."""
+        histogram = cls(data["significant_bits"])
+        for index, count in data["buckets"]:
+            histogram.counts[index] += count
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.max = data["max"]
+        return histogram
+
+
+def merge_histograms(histograms: List[dict]) -> LatencyHistogram:
+    """Merge histograms serialized with :meth:`LatencyHistogram.to_dict` into one."""
+    merged = LatencyHistogram.from_dict(histograms[0])
+    for histogram in histograms[1:]:
+        merged.merge(LatencyHistogram.from_dict(histogram))
+    return merged
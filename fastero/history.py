@@ -0,0 +1,266 @@
+"""Module for storing the results of every run in a local database."""
+
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import rich_click as click
+from rich import box
+from rich.table import Table
+
+from .utils import TIME_FORMAT_UNITS, choose_unit, compare_samples, mean_or_min
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    git_commit TEXT,
+    machine TEXT NOT NULL,
+    machine_description TEXT NOT NULL,
+    python_version TEXT NOT NULL,
+    setup TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    snippet_code TEXT NOT NULL,
+    snippet_name TEXT NOT NULL,
+    runs INTEGER NOT NULL,
+    mean REAL NOT NULL,
+    median REAL NOT NULL,
+    stddev REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    timings TEXT
+);
+CREATE INDEX IF NOT EXISTS results_snippet_name ON results(snippet_name);
+CREATE INDEX IF NOT EXISTS results_snippet_code ON results(snippet_code);
+"""
+
+
+def default_history_file() -> Path:
+    """Get the default location of the history database, this can be changed with FASTERO_HISTORY_FILE."""
+    if os.environ.get("FASTERO_HISTORY_FILE"):
+        return Path(os.environ["FASTERO_HISTORY_FILE"])
+    return Path(click.get_app_dir("fastero")) / "history.sqlite3"
+
+
+def get_git_commit() -> Optional[str]:
+    """Get the commit of the git repository in the current directory, if there is one."""
+    import subprocess
+
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "HEAD"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=5
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if output.returncode != 0:
+        return None
+    return output.stdout.decode().strip() or None
+
+
+def get_machine():
+    """
+    Get a fingerprint and a description of the current machine.
+
+    Returns
+    -------
+    Tuple[str, str]
+        A short hash identifying the machine and a human readable description of it
+    """
+    import hashlib
+    import platform
+
+    description = (
+        f"{platform.node()} ({platform.system()} {platform.machine()}, "
+        f"{platform.processor() or 'unknown processor'}, {os.cpu_count()} CPUs)"
+    )
+    return hashlib.sha1(description.encode()).hexdigest()[:12], description
+
+
+class HistoryStore:
+    """A SQLite database with the results of every recorded run."""
+
+    def __init__(self, filename=None):
+        """
+        Open (and create if needed) the history database.
+
+        Parameters
+        ----------
+        filename : Union[str, Path], optional
+            The location of the database, by default :func:`default_history_file`
+        """
+        self.filename = Path(filename) if filename else default_history_file()
+        self.filename.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.filename))
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database."""
+        self.connection.close()
+
+    def record_run(self, results: List[dict], setup: str = None) -> int:
+        """
+        Record the results of a run.
+
+        Parameters
+        ----------
+        results : List[dict]
+            The results, in the same format as :attr:`Exporter.snippets`
+        setup : str, optional
+            The setup code used for the run
+
+        Returns
+        -------
+        int
+            The id of the recorded run
+        """
+        import platform
+
+        machine, machine_description = get_machine()
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (timestamp, git_commit, machine, machine_description, python_version, setup) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (time.time(), get_git_commit(), machine, machine_description,
+                 f"{platform.python_implementation()} {platform.python_version()}", setup),
+            )
+            run_id = cursor.lastrowid
+            self.connection.executemany(
+                "INSERT INTO results "
+                "(run_id, snippet_code, snippet_name, runs, mean, median, stddev, min, max, timings) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (run_id, i["snippet_code"], i["snippet_name"], i["runs"], i["mean"], i["median"], i["stddev"],
+                     i["min"], i["max"], json.dumps(list(i["timings"])) if i.get("timings") is not None else None)
+                    for i in results
+                ],
+            )
+        return run_id
+
+    def snippet_history(self, name: str, machine: str = None, limit: int = None) -> List[dict]:
+        """
+        Get the results of a snippet from all the recorded runs, oldest first.
+
+        Parameters
+        ----------
+        name : str
+            The name of the snippet, or its code if no snippet has this name
+        machine : str, optional
+            Only get the results from the machine with this fingerprint, by default all machines
+        limit : int, optional
+            Only get this many of the most recent results, by default all of them
+
+        Returns
+        -------
+        List[dict]
+            The results with the run information (``timestamp``, ``git_commit``,
+            ``machine``, ``machine_description`` and ``python_version``)
+        """
+        query = (
+            "SELECT results.*, runs.timestamp, runs.git_commit, runs.machine, runs.machine_description, "
+            "runs.python_version FROM results JOIN runs ON results.run_id = runs.id WHERE {column} = ?"
+        )
+        parameters = [name]
+        if machine:
+            query += " AND runs.machine = ?"
+            parameters.append(machine)
+        query += " ORDER BY runs.timestamp DESC"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+
+        rows = self.connection.execute(query.format(column="results.snippet_name"), parameters).fetchall()
+        if not rows:
+            rows = self.connection.execute(query.format(column="results.snippet_code"), parameters).fetchall()
+        history = []
+        for row in reversed(rows):
+            result = dict(row)
+            result["timings"] = json.loads(result["timings"]) if result["timings"] else None
+            history.append(result)
+        return history
+
+
+def detect_steps(history: List[dict], threshold: float = 0.05, confidence: float = 0.95):
+    """
+    Find the runs where the performance changed significantly compared to the run before it.
+
+    Returns
+    -------
+    List[Optional[Tuple[float, float, float]]]
+        For each result, None if it didn't change significantly (or is the first one),
+        otherwise the relative change and its confidence interval
+    """
+    steps = [None]
+    for previous, result in zip(history, history[1:]):
+        previous_samples = previous["timings"] or [mean_or_min(previous)]
+        samples = result["timings"] or [mean_or_min(result)]
+        change, low, high = compare_samples(previous_samples, samples, confidence=confidence)
+        significant = (change > threshold and low > 0) or (change < -threshold and high < 0)
+        steps.append((change, low, high) if significant else None)
+    return steps
+
+
+@click.command()
+@click.argument("NAME")
+@click.option("--history-file", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True), default=None, help="The history database to use, by default the one in the fastero app directory or FASTERO_HISTORY_FILE") # noqa
+@click.option("--all-machines", is_flag=True, default=False, help="Show the results from all machines instead of only the current one") # noqa
+@click.option("--limit", "-l", metavar="NUM", type=click.IntRange(min=1), default=None, help="Only show the NUM most recent runs") # noqa
+@click.option("--threshold", "-t", metavar="PERCENT", default=5.0, show_default=True, type=click.FloatRange(min=0), help="Only report step changes bigger than PERCENT percent") # noqa
+@click.option("--time-unit", "-u", metavar="UNIT", default="dynamic", show_default=True, type=click.Choice(TIME_FORMAT_UNITS, case_sensitive=False), help="Set the time unit to be used. Possible values: ns, us, ms, s, dynamic") # noqa
+@click.help_option('-h', '--help')
+def history(name, history_file, all_machines, limit, threshold, time_unit):
+    """
+    Show the trend of the snippet **NAME** across all the runs recorded with ``--history``.
+
+    NAME can also be the code of the snippet. Significant changes between consecutive runs are marked as step changes.
+    """
+    from datetime import datetime
+
+    from .core import console
+
+    store = HistoryStore(history_file)
+    machine = None if all_machines else get_machine()[0]
+    results = store.snippet_history(name, machine=machine, limit=limit)
+    store.close()
+    if not results:
+        console.print(f"[u yellow]Warning:[/] No recorded results found for [cyan]{name}[/]")
+        raise click.exceptions.Exit(1)
+
+    table = Table(
+        "Date", "Commit", "Python", "Time (mean ± σ)", "Min", "Runs", "Step",
+        box=box.SIMPLE_HEAD,
+        title=f"History of {name}",
+    )
+    if all_machines:
+        table.add_column("Machine")
+    steps = detect_steps(results, threshold=threshold / 100)
+    for result, step in zip(results, steps):
+        if step is None:
+            step_text = ""
+        else:
+            change, low, high = step
+            style = "red b" if change > 0 else "green b"
+            step_text = f"[{style}]{'▲' if change > 0 else '▼'} {change:+.2%}[/] [dim]({low:+.1%} … {high:+.1%})[/]"
+        row = [
+            datetime.fromtimestamp(result["timestamp"]).strftime("%Y-%m-%d %H:%M"),
+            (result["git_commit"] or "-")[:8],
+            result["python_version"],
+            # Results with only one batch don't have a mean and a standard deviation
+            f"{choose_unit(result['mean'], unit=time_unit) if result['mean'] != -1 else '?'} ± "
+            f"{choose_unit(result['stddev'], unit=time_unit) if result['stddev'] != -1 else '?'}",
+            choose_unit(result["min"], unit=time_unit),
+            f"{result['runs']:,}",
+            step_text,
+        ]
+        if all_machines:
+            row.append(result["machine_description"])
+        table.add_row(*row)
+    console.print(table)
+    step_count = sum(step is not None for step in steps)
+    if step_count:
+        console.print(f"[yellow]{step_count}[/] step change(s) bigger than {threshold:g}% detected")
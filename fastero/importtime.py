@@ -0,0 +1,241 @@
+"""Module for measuring how long importing modules takes in fresh interpreters."""
+
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+import rich_click as click
+from rich import box
+from rich.table import Table
+
+from .utils import TIME_FORMAT_UNITS, choose_unit, compute_statistics
+
+# Written to stderr right before the import, so the imports done while the interpreter starts are ignored
+START_MARKER = "fastero-import-start"
+# The line written to stderr by -X importtime for every module, the times are in microseconds
+IMPORTTIME_REGEX = re.compile(r"import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(.+)")
+
+# The code ran in a fresh interpreter to time importing a module, it only uses built-in modules
+# so that the target module and its dependencies are never imported before being timed
+IMPORT_CODE = """\
+import sys
+from time import perf_counter
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+start = perf_counter()
+import {module}
+end = perf_counter()
+sys.stdout.write(repr(end - start))
+"""
+
+# The code of the fork worker, it reads a module name per line and replies with a line containing
+# the exit status and the output of a forked child importing the module. Forking skips starting the
+# interpreter for every run and the -X importtime flag is inherited by the children
+FORK_WORKER_CODE = """\
+import os
+import sys
+while True:
+    module = sys.stdin.readline().strip()
+    if not module:
+        break
+    stderr_read, stderr_write = os.pipe()
+    stdout_read, stdout_write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(stderr_read)
+        os.close(stdout_read)
+        os.dup2(stderr_write, 2)
+        os.dup2(stdout_write, 1)
+        sys.stderr = open(2, "w", closefd=False)
+        sys.stdout = open(1, "w", closefd=False)
+        try:
+            exec(sys.argv[1].replace("MODULE", module))
+        except BaseException as e:
+            sys.stderr.write(repr(e))
+            sys.stderr.flush()
+            os._exit(1)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(0)
+    os.close(stderr_write)
+    os.close(stdout_write)
+    with open(stdout_read, "rb") as f:
+        stdout = f.read().decode()
+    with open(stderr_read, "rb") as f:
+        stderr = f.read().decode()
+    _, status = os.waitpid(pid, 0)
+    sys.stdout.write(repr((status, stdout, stderr)) + "\\n")
+    sys.stdout.flush()
+"""
+
+
+class ImportFailed(Exception):
+    """Importing the module failed in the fresh interpreter."""
+
+
+def parse_importtime(stderr: str) -> Tuple[List[Tuple[str, int, int, int]], str]:
+    """
+    Parse the output of ``-X importtime`` after the start marker.
+
+    Returns
+    -------
+    Tuple[List[Tuple[str, int, int, int]], str]
+        The imported modules as (name, self time, cumulative time, nesting level),
+        with the times in seconds, and the rest of the output that isn't from ``-X importtime``
+    """
+    modules = []
+    other = []
+    _, _, stderr = stderr.partition(START_MARKER + "\n")
+    for line in stderr.splitlines():
+        match = IMPORTTIME_REGEX.match(line)
+        if match:
+            self_time, cumulative_time, indentation, name = match.groups()
+            modules.append((name.strip(), int(self_time) / 1e6, int(cumulative_time) / 1e6, len(indentation) // 2))
+        else:
+            other.append(line)
+    return modules, "\n".join(other)
+
+
+class ForkWorker:
+    """A fresh interpreter that forks a child for every import, so the interpreter only starts once."""
+
+    def __init__(self, module: str):
+        code = IMPORT_CODE.format(marker=START_MARKER, module="MODULE")
+        self.process = subprocess.Popen(
+            [sys.executable, "-X", "importtime", "-c", FORK_WORKER_CODE, code],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+        )
+        self.module = module
+
+    def run(self) -> Tuple[int, str, str]:
+        """Import the module in a forked child and get its exit status, stdout and stderr."""
+        from ast import literal_eval
+
+        self.process.stdin.write(self.module + "\n")
+        self.process.stdin.flush()
+        return literal_eval(self.process.stdout.readline())
+
+    def close(self):
+        """Stop the worker."""
+        self.process.stdin.close()
+        self.process.wait()
+
+
+def time_import(module: str, worker: ForkWorker = None):
+    """
+    Import a module in a fresh interpreter (or a forked child of the worker) and time it.
+
+    Returns
+    -------
+    Tuple[float, List[Tuple[str, int, int, int]]]
+        The time the import took in seconds and the modules imported, as returned by :func:`parse_importtime`
+    """
+    if worker is None:
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", IMPORT_CODE.format(marker=START_MARKER, module=module)],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+        )
+        status, stdout, stderr = process.returncode, process.stdout, process.stderr
+    else:
+        status, stdout, stderr = worker.run()
+    modules, other = parse_importtime(stderr)
+    if status != 0:
+        raise ImportFailed(other.strip())
+    # The module may print something while being imported, the time is written last
+    return float(stdout.splitlines()[-1]), modules
+
+
+def summarize_modules(runs: List[List[Tuple[str, int, int, int]]]) -> List[Dict]:
+    """
+    Get the mean self and cumulative time of each module imported in any of the runs.
+
+    Returns
+    -------
+    List[dict]
+        The modules with the keys ``module``, ``self_time``, ``cumulative_time``
+        and ``level``, sorted by cumulative time
+    """
+    totals = {}
+    for modules in runs:
+        for name, self_time, cumulative_time, level in modules:
+            total = totals.setdefault(name, {"module": name, "self_time": 0, "cumulative_time": 0, "level": level})
+            total["self_time"] += self_time / len(runs)
+            total["cumulative_time"] += cumulative_time / len(runs)
+    return sorted(totals.values(), key=lambda x: x["cumulative_time"], reverse=True)
+
+
+def make_modules_table(modules: List[Dict], top: int, time_unit: str = "dynamic") -> Table:
+    """Generate a table of the slowest modules to import to display in the terminal."""
+    total = modules[0]["cumulative_time"] if modules else 0
+    table = Table(
+        "Module", "Self", "Cumulative", "%",
+        box=box.SIMPLE_HEAD,
+        title="Slowest modules (mean of -X importtime)",
+        title_justify="left",
+        title_style="b",
+    )
+    for module in modules[:top]:
+        table.add_row(
+            f"[cyan]{module['module']}[/]",
+            choose_unit(module["self_time"], unit=time_unit),
+            f"[green]{choose_unit(module['cumulative_time'], unit=time_unit)}[/]",
+            f"{module['cumulative_time'] / total:.0%}" if total else "-",
+        )
+    return table
+
+
+@click.command()
+@click.argument("MODULES", nargs=-1, required=True)
+@click.option("--runs", "-r", metavar="NUM", default=10, show_default=True, type=click.IntRange(min=2), help="Import each module NUM times, each in a fresh interpreter") # noqa
+@click.option("--warmup", "-w", metavar="NUM", default=1, show_default=True, type=click.IntRange(min=0), help="Import each module NUM times before timing it, so the files are in the disk cache") # noqa
+@click.option("--fork", is_flag=True, default=False, help="Start one interpreter per module and fork it for every run instead of starting a new interpreter every time. This is faster, but only available where os.fork is") # noqa
+@click.option("--top", "-T", metavar="NUM", default=10, show_default=True, type=click.IntRange(min=1), help="Show the NUM slowest submodules of each module") # noqa
+@click.option("--time-unit", "-u", metavar="UNIT", default="dynamic", show_default=True, type=click.Choice(TIME_FORMAT_UNITS, case_sensitive=False), help="Set the time unit to be used. Possible values: ns, us, ms, s, dynamic") # noqa
+@click.option("--export-json", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Export the timing summary statistics as JSON to the given FILE") # noqa
+@click.help_option('-h', '--help')
+def import_time(modules, runs, warmup, fork, top, time_unit, export_json):
+    """
+    Measure how long importing each module in **MODULES** takes.
+
+    Every import happens in a fresh interpreter, since importing a module that is already in `sys.modules` costs
+    nothing. The slowest submodules are found using `-X importtime`.
+    """
+    from .core import console, alt_console, print_snippet_header, print_statistics, print_summary
+
+    if fork and not hasattr(__import__("os"), "fork"):
+        alt_console.print("[u yellow]Warning:[/] os.fork is not available on this platform, not using --fork")
+        fork = False
+
+    for module in modules:
+        worker = ForkWorker(module) if fork else None
+        timings = []
+        imported = []
+        try:
+            with alt_console.status(f"Importing {module}") as status:
+                for run in range(warmup + runs):
+                    status.update(f"Importing {module} ({run + 1}/{warmup + runs})")
+                    timing, modules_imported = time_import(module, worker)
+                    if run >= warmup:
+                        timings.append(timing)
+                        imported.append(modules_imported)
+        except ImportFailed as e:
+            alt_console.print(f"[red b]Error:[/] Importing [cyan]{module}[/] failed:\n{e}")
+            raise click.exceptions.Exit(1)
+        finally:
+            if worker is not None:
+                worker.close()
+
+        stats = compute_statistics(timings)
+        console.exporter.add_result(
+            f"import {module}", module, runs,
+            stats["mean"], stats["median"], stats["stddev"], stats["min"], stats["max"], timings
+        )
+        print_snippet_header(module, f"import {module}", "one-dark")
+        print_statistics(console.exporter.snippets[-1], time_unit)
+        console.print(make_modules_table(summarize_modules(imported), top, time_unit=time_unit))
+
+    if len(modules) > 1:
+        print_summary(console.exporter.snippets, "one-dark")
+    if export_json:
+        console.exporter.export_json(export_json)
@@ -0,0 +1,70 @@
+"""Module for reusing the results of snippets that haven't changed since the last run."""
+
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_INCREMENTAL_FILE = ".fastero_incremental.json"
+
+
+class IncrementalCache:
+    """A file with the results of previous runs, keyed by a hash of everything that affects them."""
+
+    def __init__(self, filename=None):
+        """
+        Load the cache file if it exists.
+
+        Parameters
+        ----------
+        filename : Union[str, Path], optional
+            The location of the cache file, by default ``.fastero_incremental.json`` in the current directory
+        """
+        self.filename = Path(filename or DEFAULT_INCREMENTAL_FILE)
+        self.results = {}
+        if self.filename.exists():
+            try:
+                with open(self.filename, "r", encoding="utf-8") as f:
+                    self.results = json.load(f).get("results", {})
+            except (ValueError, OSError):
+                # A corrupted cache is the same as no cache
+                self.results = {}
+
+    @staticmethod
+    def key(benchmark: dict) -> str:
+        """
+        Hash everything that affects the results of a benchmark.
+
+        This includes the snippet code, the setup, the contents of the files referenced
+        with ``file:``, the interpreter, the timing options and how the snippet is run
+        (e.g. ``--shell``, ``--latency``, ``--cache`` and ``--cpu``), but not the snippet name.
+        """
+        files = {}
+        for path in benchmark.get("files", ()):
+            try:
+                files[str(path)] = hashlib.sha256(Path(path).read_bytes()).hexdigest()
+            except OSError:
+                files[str(path)] = None
+        data = {
+            "snippet_code": benchmark["snippet_code"],
+            "setup": benchmark["setup"],
+            "files": files,
+            "interpreter": [sys.executable, sys.version],
+            "options": benchmark.get("options", {}),
+            "mode": benchmark.get("mode", {}),
+        }
+        return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Get the stored result for a key, or None if the benchmark changed."""
+        return self.results.get(key)
+
+    def set(self, key: str, result: dict):
+        """Store the result for a key."""
+        self.results[key] = result
+
+    def save(self):
+        """Write the cache to the cache file."""
+        with open(self.filename, "w", encoding="utf-8") as f:
+            json.dump({"results": self.results}, f)
@@ -0,0 +1,148 @@
+"""Module for timing every iteration of a snippet on its own, used by ``--latency``."""
+
+import timeit
+from time import perf_counter_ns
+from typing import Dict
+
+from .histogram import LatencyHistogram
+from .results import LATENCY_FIELDS
+
+# The percentiles reported for every snippet, as (field, percentile)
+PERCENTILES = (("p50", 50), ("p90", 90), ("p99", 99), ("p999", 99.9))
+
+# Like the template of timeit, but the time of every iteration in nanoseconds is counted in the buckets
+# of a LatencyHistogram, inlined to keep the gap between iterations short. Counting happens after
+# reading the clock, so it is not part of the measurement. Returns the sum and maximum of the times
+# and the sum of the times with the timer overhead subtracted from each of them
+TEMPLATE = """
+def inner(_it, _timer, _counts, _bits, _overhead{init}):
+    {setup}
+    _total = _max = _corrected = 0
+    for _i in _it:
+        _t0 = _timer()
+        {stmt}
+        _t1 = _timer()
+        _t = _t1 - _t0
+        _shift = _t.bit_length() - _bits
+        if _shift < 0:
+            _shift = 0
+        _counts[(_shift << (_bits - 1)) + (_t >> _shift)] += 1
+        _total += _t
+        if _t > _overhead:
+            _corrected += _t - _overhead
+        if _t > _max:
+            _max = _t
+    return _total, _max, _corrected
+"""
+
+# The timer overhead in nanoseconds, only measured once
+_timer_overhead = None
+
+
+class LatencyTimer:
+    """A timer that times every iteration with :func:`time.perf_counter_ns` and counts it in a histogram."""
+
+    def __init__(self, stmt="pass", setup="pass"):
+        """
+        Compile the timing loop.
+
+        Parameters
+        ----------
+        stmt : Union[str, Callable], optional
+            The code to time, or a callable to call, by default "pass"
+        setup : str, optional
+            The code executed once before every batch, by default "pass"
+        """
+        local_ns = {}
+        global_ns = {}
+        init = ""
+        if callable(stmt):
+            local_ns["_stmt"] = stmt
+            init = ", _stmt=_stmt"
+            stmt = "_stmt()"
+        self.src = TEMPLATE.format(
+            stmt=timeit.reindent(stmt, 8), setup=timeit.reindent(setup, 4), init=init
+        )
+        exec(compile(self.src, timeit.dummy_src_name, "exec"), global_ns, local_ns)
+        self.inner = local_ns["inner"]
+        # How long the last batch took including counting the iterations, used to keep the total time of a benchmark
+        self.last_batch_time = 0.0
+
+    def timeit(self, number: int, histogram: LatencyHistogram = None, overhead: int = 0) -> float:
+        """
+        Run the snippet ``number`` times and record the time of every iteration in ``histogram``.
+
+        This can be used in place of :meth:`timeit.Timer.timeit`, e.g. by :func:`~fastero.utils.autorange`,
+        the iterations are then recorded in a histogram that is thrown away. The histogram gets the
+        times as they were measured, the timer overhead is subtracted from them by :func:`percentiles`.
+
+        Parameters
+        ----------
+        overhead : int, optional
+            The timer overhead in nanoseconds, subtracted from the time of every iteration (without
+            going below 0) the same way as from the percentiles, by default 0
+
+        Returns
+        -------
+        float
+            The time all the iterations took in seconds, without the time between them and the overhead
+        """
+        if histogram is None:
+            histogram = LatencyHistogram()
+        start = perf_counter_ns()
+        total, maximum, corrected = self.inner(
+            range(number), perf_counter_ns, histogram.counts, histogram.significant_bits, overhead
+        )
+        self.last_batch_time = (perf_counter_ns() - start) / 1e9
+        histogram.count += number
+        histogram.total += total
+        histogram.max = max(histogram.max, maximum)
+        return corrected / 1e9
+
+    def print_exc(self, file=None):
+        """Print the traceback of an exception raised by the snippet, see :meth:`timeit.Timer.print_exc`."""
+        timeit.Timer.print_exc(self, file)
+
+
+def timer_overhead(runs: int = 100_000) -> int:
+    """
+    Measure the time the timing loop itself takes for an iteration, in nanoseconds.
+
+    This is the median time of an iteration of an empty statement, which is mostly the
+    time it takes to read the clock. It is measured once and subtracted from the samples.
+    """
+    global _timer_overhead
+
+    if _timer_overhead is None:
+        # The overhead is far below 2 ** 8 ns, where every value has its own bucket
+        histogram = LatencyHistogram()
+        LatencyTimer().timeit(runs, histogram)
+        _timer_overhead = histogram.percentile(50)
+    return _timer_overhead
+
+
+def percentiles(histogram: LatencyHistogram, overhead: int = 0) -> Dict[str, float]:
+    """
+    Get the percentiles of the iteration times from a histogram.
+
+    Parameters
+    ----------
+    histogram : LatencyHistogram
+        The histogram the time of every iteration was recorded in, in nanoseconds
+    overhead : int, optional
+        The timer overhead in nanoseconds, subtracted from the percentiles, by default 0
+
+    Returns
+    -------
+    Dict[str, float]
+        The fields in :data:`~fastero.results.LATENCY_FIELDS`, in seconds
+    """
+    values = [histogram.percentile(percentile) for _, percentile in PERCENTILES]
+    values.append(histogram.max)
+    # Subtracting the overhead from the percentiles is the same as subtracting it from every iteration
+    return {field: max(value - overhead, 0) / 1e9 for field, value in zip(LATENCY_FIELDS, values)}
+
+
+def latency_fields(histogram: LatencyHistogram, overhead: int) -> Dict:
+    """Get the latency fields of a result, the percentiles and the serialized histogram with the timer overhead."""
+    return dict(percentiles(histogram, overhead), latency_histogram=dict(histogram.to_dict(), timer_overhead=overhead))
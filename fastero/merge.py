@@ -0,0 +1,174 @@
+"""Module for merging the results of several runs into one."""
+
+import statistics
+from array import array
+from typing import Dict, List
+
+import rich_click as click
+from rich import box
+from rich.table import Table
+
+from .compare import is_default_name
+from .histogram import merge_histograms
+from .latency import latency_fields
+from .utils import TIME_FORMAT_UNITS, choose_unit, compute_statistics, mean_or_min
+
+
+def _group_key(result: dict) -> str:
+    """
+    Get the key the results of the same snippet in different runs share.
+
+    Snippets are matched by name, except the ones with the default name (``Benchmark N``)
+    which are matched by their code instead, the same as ``fastero compare``.
+    """
+    name = result["snippet_name"]
+    if name and not is_default_name(name):
+        return f"name:{name}"
+    return f"code:{result['snippet_code']}"
+
+
+def group_results(runs: List[List[dict]]) -> List[List[dict]]:
+    """
+    Group the results of the same snippet in every run.
+
+    Returns
+    -------
+    List[List[dict]]
+        The results of every snippet, in the order the snippets first appear in
+    """
+    groups: Dict[str, List[dict]] = {}
+    for results in runs:
+        for result in results:
+            groups.setdefault(_group_key(result), []).append(result)
+    return list(groups.values())
+
+
+def merge_results(results: List[dict]) -> dict:
+    """
+    Merge the results of a snippet from several runs.
+
+    The raw samples of all the runs are pooled when every run has them, otherwise the
+    mean of each run is used as a sample. The latency histograms are merged and the
+    percentiles calculated from the merged histogram when every run has one. The
+    variance is split into the variance within the runs (the mean of the variance of
+    the samples of each run) and the variance between the runs (the variance of the
+    means of the runs), since a change smaller than the difference between runs can't
+    be told apart from noise.
+
+    Returns
+    -------
+    dict
+        The merged result with the keys of :class:`Result` and the ``variance``, a dict
+        with the keys ``runs``, ``within_run_stddev`` and ``between_run_stddev``, which
+        is None when there aren't enough runs or samples to calculate it
+    """
+    means = [mean_or_min(result) for result in results]
+    if all(result.get("timings") for result in results):
+        samples = array("d")
+        for result in results:
+            samples.extend(result["timings"])
+    else:
+        samples = means
+    stats = compute_statistics(samples)
+    histograms = [result.get("latency_histogram") for result in results]
+    latency = {}
+    if all(histograms):
+        # The runs may have measured a different timer overhead, the lowest one never makes a percentile too low
+        latency = latency_fields(
+            merge_histograms(histograms), min(histogram.get("timer_overhead", 0) for histogram in histograms)
+        )
+    # Runs without enough data to calculate the standard deviation are left out
+    variances = [result["stddev"] ** 2 for result in results if result["stddev"] != -1]
+    within_run = statistics.mean(variances) ** 0.5 if variances else None
+    between_run = statistics.stdev(means) if len(means) > 1 else None
+    return {
+        "snippet_code": results[0]["snippet_code"],
+        "snippet_name": results[0]["snippet_name"],
+        "runs": sum(result["runs"] for result in results),
+        **stats,
+        "timings": samples,
+        **latency,
+        "variance": {"runs": len(results), "within_run_stddev": within_run, "between_run_stddev": between_run},
+    }
+
+
+def make_variance_table(merged: List[dict], time_unit: str = "dynamic") -> Table:
+    """Generate a table with the variance within and between the runs of every snippet."""
+    table = Table(
+        "Snippet", "Runs", "Mean", "σ within runs", "σ between runs", "Between runs",
+        box=box.SIMPLE_HEAD,
+        title="Run-to-run variation",
+        title_justify="left",
+        title_style="b",
+    )
+    for result in merged:
+        variance = result["variance"]
+        within, between = variance["within_run_stddev"], variance["between_run_stddev"]
+        mean = mean_or_min(result)
+        table.add_row(
+            f"[cyan]{result['snippet_name']}[/]",
+            str(variance["runs"]),
+            f"[green]{choose_unit(mean, unit=time_unit)}[/]",
+            choose_unit(within, unit=time_unit) if within is not None else "-",
+            choose_unit(between, unit=time_unit) if between is not None else "-",
+            # The change between runs that is just noise, as a percentage of the mean
+            f"[yellow]±{between / mean:.2%}[/]" if between is not None and mean > 0 else "-",
+        )
+    return table
+
+
+@click.command()
+@click.argument("FILES", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False, resolve_path=True, readable=True)) # noqa
+@click.option("--time-unit", "-u", metavar="UNIT", default="dynamic", show_default=True, type=click.Choice(TIME_FORMAT_UNITS, case_sensitive=False), help="Set the time unit to be used. Possible values: ns, us, ms, s, dynamic") # noqa
+@click.option("--code-theme", "-c", default="one-dark", show_default=True, metavar="THEME_NAME", help="Theme for the code in the output") # noqa
+@click.option("--export-json", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Export the merged results as JSON to the given FILE") # noqa
+@click.option("--npy-samples", is_flag=True, default=False, help="With ``--export-json``, write the pooled raw samples to a binary .npy file next to the JSON file instead of into it") # noqa
+@click.option("--export-csv", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Export the merged results as CSV to the given FILE") # noqa
+@click.option("--export-yaml", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Export the merged results as YAML to the given FILE") # noqa
+@click.option("--export-markdown", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Export the merged results as a Markdown table to the given FILE") # noqa
+@click.option("--export-asciidoc", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Export the merged results as an AsciiDoc table to the given FILE") # noqa
+@click.option("--export-html", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Export the merged results as an HTML table to the given FILE") # noqa
+@click.option("--export-svg", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Export the output as SVG to the given FILE") # noqa
+@click.option("--export-plot", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Export a bar plot of the merged results to the given FILE") # noqa
+@click.help_option('-h', '--help')
+def merge(
+    files, time_unit, code_theme, export_json, npy_samples, export_csv, export_yaml, export_markdown,
+    export_asciidoc, export_html, export_svg, export_plot,
+):
+    """
+    Merge the results in **FILES**, JSON files exported by fastero, into one.
+
+    The files can be repeated runs of the same benchmarks or runs on different machines. The results of the same
+    snippet are merged, pooling the raw samples, and the variation between the runs is shown separately from the
+    variation within them.
+    """
+    from .core import alt_console, console, export_results, print_snippet_header, print_statistics, print_summary
+    from .samples import load_export
+
+    runs = []
+    for filename in files:
+        try:
+            runs.append(load_export(filename)["results"])
+        except (ValueError, KeyError, OSError) as e:
+            alt_console.print(f"[red b]Error:[/] [yellow]{filename}[/] is not a JSON file exported by fastero: {e}")
+            raise click.exceptions.Exit(1)
+
+    merged = [merge_results(results) for results in group_results(runs)]
+    for result in merged:
+        variance = result.pop("variance")
+        console.exporter.add_result(**result)
+        console.exporter.run_variance[result["snippet_name"]] = variance
+        result["variance"] = variance
+        print_snippet_header(result["snippet_name"], result["snippet_code"], code_theme)
+        print_statistics(console.exporter.snippets[-1], time_unit)
+    console.print(make_variance_table(merged, time_unit=time_unit))
+    if len(merged) > 1:
+        print_summary(console.exporter.snippets, code_theme)
+
+    export_results(
+        export_json=export_json, export_csv=export_csv, export_yaml=export_yaml, export_markdown=export_markdown,
+        export_svg=export_svg, export_image=None, export_asciidoc=export_asciidoc, export_plot=export_plot,
+        export_html=export_html, time_unit=time_unit, label_format="{snippet_name}\n{snippet_code}",
+        dark_background=False, bar_color="#99bc5a", selenium_browser="chrome", watermark=True, background="random",
+        image_renderer="pillow", image_font=None, npy_samples=npy_samples,
+    )
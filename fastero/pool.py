@@ -0,0 +1,87 @@
+"""Module for timing snippets that use up their input with a pool of inputs made before timing, used by ``--input``."""
+
+import timeit
+from typing import Tuple
+
+import rich_click as click
+
+# Like the template of timeit, but the inputs for the whole batch are made before reading the clock
+# and the loop goes over them instead of a range, so getting the next input costs the same as the
+# loop of timeit does and making them isn't timed
+TEMPLATE = """
+def inner(_it, _timer{init}):
+    {setup}
+    _pool = []
+    for _ in _it:
+        _pool.append({expression})
+    _t0 = _timer()
+    for {name} in _pool:
+        {stmt}
+    _t1 = _timer()
+    return _t1 - _t0
+"""
+
+
+def parse_input(text: str) -> Tuple[str, str]:
+    """
+    Parse an input in the format ``NAME=EXPRESSION``.
+
+    Raises
+    ------
+    click.BadParameter
+        If the name isn't a valid Python name or the expression is empty
+    """
+    name, _, expression = text.partition("=")
+    name, expression = name.strip(), expression.strip()
+    if not name.isidentifier() or not expression:
+        raise click.BadParameter(f"{text!r} is not in the format NAME=EXPRESSION", param_hint="--input")
+    return name, expression
+
+
+class PoolTimer(timeit.Timer):
+    """
+    A timer that makes a new input for every run of the snippet before timing the batch.
+
+    The setup runs once per batch, then ``expression`` is evaluated once for each run
+    and the snippet runs once with each result assigned to ``name``. Since every run
+    gets its own input, snippets like ``heapq.heappop(h)`` or ``next(it)`` never run
+    out of data or time a different input than the first run did.
+    """
+
+    def __init__(self, stmt="pass", setup="pass", input: str = "_=None"):
+        """
+        Compile the timing loop.
+
+        Parameters
+        ----------
+        stmt : Union[str, Callable], optional
+            The code to time, or a callable to call, by default "pass"
+        setup : str, optional
+            The code executed once before every batch, by default "pass"
+        input : str, optional
+            The input of each run in the format ``NAME=EXPRESSION``, see :func:`parse_input`
+        """
+        self.timer = timeit.default_timer
+        name, expression = parse_input(input)
+        local_ns = {}
+        global_ns = {}
+        init = ""
+        if callable(stmt):
+            local_ns["_stmt"] = stmt
+            init = ", _stmt=_stmt"
+            stmt = "_stmt()"
+        self.src = TEMPLATE.format(
+            stmt=timeit.reindent(stmt, 8), setup=timeit.reindent(setup, 4), init=init,
+            name=name, expression=expression,
+        )
+        exec(compile(self.src, timeit.dummy_src_name, "exec"), global_ns, local_ns)
+        self.inner = local_ns["inner"]
+        # How long the last batch took including making its inputs, used to keep the total time of a benchmark
+        self.last_batch_time = 0.0
+
+    def timeit(self, number=timeit.default_number):
+        """Time ``number`` runs of the snippet, each with its own input, not including the time making them took."""
+        start = self.timer()
+        time_taken = super().timeit(number)
+        self.last_batch_time = self.timer() - start
+        return time_taken
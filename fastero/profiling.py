@@ -0,0 +1,255 @@
+"""Module for profiling snippets to explain where the time goes."""
+
+import cProfile
+import itertools
+import os
+from time import perf_counter
+
+from rich import box
+from rich.syntax import Syntax
+from rich.table import Table
+
+from .utils import _Timer as Timer, choose_unit
+
+# Functions that belong to the profiler and the timing loop and not to the snippet, these are left out of the profile
+PROFILER_FUNCTIONS = {"<built-in method time.perf_counter>", "<method 'disable' of '_lsprof.Profiler' objects>"}
+# The filename the snippets are compiled with for line profiling, only the lines in it are traced
+LINE_PROFILE_FILENAME = "<fastero-snippet>"
+
+
+def _function_name(filename: str, line: int, name: str) -> str:
+    """Format a function from the profiler stats, e.g. ``sorted`` or ``foo (bar.py:10)``."""
+    if filename == "~":
+        # Built-in functions don't have a file
+        return name
+    try:
+        relative = os.path.relpath(filename)
+    except ValueError:
+        # On Windows, paths on different drives can't be relative
+        relative = filename
+    # Show files outside the current directory (e.g. the standard library) by their name only
+    filename = os.path.basename(filename) if relative.startswith("..") else relative
+    return f"{name} ({filename}:{line})"
+
+
+def profile_snippet(code: str, setup: str = "pass", number: int = 1000, top: int = 10) -> dict:
+    """
+    Run a snippet under cProfile and get the functions that took the most time.
+
+    Parameters
+    ----------
+    code : str
+        The code to profile
+    setup : str, optional
+        The setup code, executed once before the runs and not profiled, by default
+        "pass". Functions defined in it are profiled when the snippet calls them
+    number : int, optional
+        How many times to run the snippet, by default 1000
+    top : int, optional
+        How many functions to return, by default 10
+
+    Returns
+    -------
+    dict
+        A dict with the keys ``number``, ``total_time`` (the time one run took while
+        being profiled) and ``functions``, which is a list of the functions sorted
+        by cumulative time, each with the keys ``function``, ``calls``, ``own_time``
+        and ``cumulative_time``. The times are per run of the snippet and ``calls``
+        is the total amount of calls in all the runs
+    """
+    # Compile the timing loop before profiling, so only running it is profiled
+    timer = Timer(stmt=code, setup=setup)
+    profiler = cProfile.Profile()
+
+    profiling = False
+
+    def toggle_profiler():
+        # The timing loop reads the clock right after running the setup and right after the
+        # last run, so the profiler is on for exactly the runs and not for the setup
+        nonlocal profiling
+        if not profiling:
+            profiling = True
+            profiler.enable()
+            return perf_counter()
+        now = perf_counter()
+        profiler.disable()
+        return now
+
+    total_time = timer.inner(itertools.repeat(None, number), toggle_profiler) / number
+
+    functions = []
+    # The entries are told apart by their code object and not by their file, since the
+    # functions defined in the setup are compiled in the same file as the timing loop
+    for entry in profiler.getstats():
+        if entry.code is toggle_profiler.__code__:
+            # Called once to turn the profiler off after the last run
+            continue
+        if isinstance(entry.code, str):
+            # Built-in functions only have a description instead of a code object
+            if entry.code in PROFILER_FUNCTIONS:
+                continue
+            function = _function_name("~", 0, entry.code)
+        else:
+            function = _function_name(entry.code.co_filename, entry.code.co_firstlineno, entry.code.co_name)
+        functions.append(
+            {
+                "function": function,
+                "calls": entry.callcount,
+                "own_time": entry.inlinetime / number,
+                "cumulative_time": entry.totaltime / number,
+            }
+        )
+    functions.sort(key=lambda x: x["cumulative_time"], reverse=True)
+    return {"number": number, "total_time": total_time, "functions": functions[:top]}
+
+
+def make_profile_table(profile: dict, time_unit: str = "dynamic") -> Table:
+    """
+    Generate a table of the profiled functions to display in the terminal.
+
+    Parameters
+    ----------
+    profile : dict
+        The profile, as returned by :func:`profile_snippet`
+    time_unit : str, optional
+        The time unit to be used, by default "dynamic"
+    """
+    total = profile["total_time"]
+    table = Table(
+        "Function", "Calls", "Own time", "Cumulative", "%",
+        box=box.SIMPLE_HEAD,
+        title=f"Profile ({profile['number']:,} runs, times per run)",
+        title_justify="left",
+        title_style="b",
+    )
+    for function in profile["functions"]:
+        table.add_row(
+            f"[cyan]{function['function']}[/]",
+            f"{function['calls']:,}",
+            choose_unit(function["own_time"], unit=time_unit),
+            f"[green]{choose_unit(function['cumulative_time'], unit=time_unit)}[/]",
+            f"{function['cumulative_time'] / total:.0%}" if total > 0 else "-",
+        )
+    return table
+
+
+def profile_lines(code: str, setup: str = "pass", number: int = 1000, first_line: int = 1) -> dict:
+    """
+    Run a snippet with a line tracer and get how much time each of its lines took.
+
+    The time of a line includes the time of the functions it called. Tracing makes
+    the code a lot slower, so the times are higher than the timing results and the
+    percentages are more meaningful than the absolute times.
+
+    Parameters
+    ----------
+    code : str
+        The code to profile
+    setup : str, optional
+        The setup code, executed once before the runs and not traced, by default "pass"
+    number : int, optional
+        How many times to run the snippet, by default 1000
+    first_line : int, optional
+        The line number of the first line of the code, for code read from a part of a file, by default 1
+
+    Returns
+    -------
+    dict
+        A dict with the keys ``number``, ``total_time`` (the time one run took while
+        being traced) and ``lines``, which is a list with the keys ``line``, ``hits``
+        (the total amount of times the line ran in all the runs), ``time`` (per run)
+        and ``code`` for every non-empty line
+    """
+    import sys
+    from time import perf_counter
+
+    compiled = compile(code, LINE_PROFILE_FILENAME, "exec")
+    namespace = {}
+    exec(setup, namespace)
+
+    hits = {}
+    times = {}
+    # The line each frame is currently at and when it started
+    current = {}
+    total_time = 0
+
+    def trace_lines(frame, event, arg):
+        nonlocal total_time
+        now = perf_counter()
+        if frame in current:
+            line, started = current[frame]
+            times[line] = times.get(line, 0) + now - started
+            if frame.f_code is compiled:
+                total_time += now - started
+        if event == "line":
+            hits[frame.f_lineno] = hits.get(frame.f_lineno, 0) + 1
+            current[frame] = (frame.f_lineno, perf_counter())
+        elif event == "return":
+            current.pop(frame, None)
+        return trace_lines
+
+    def trace_calls(frame, event, arg):
+        # Only trace the lines of the snippet, not of the functions it calls
+        if frame.f_code.co_filename == LINE_PROFILE_FILENAME:
+            return trace_lines
+        return None
+
+    old_trace = sys.gettrace()
+    sys.settrace(trace_calls)
+    try:
+        for _ in range(number):
+            exec(compiled, namespace)
+    finally:
+        sys.settrace(old_trace)
+
+    lines = []
+    for line_number, line in enumerate(code.splitlines(), start=1):
+        if not line.strip():
+            continue
+        lines.append(
+            {
+                "line": line_number + first_line - 1,
+                "hits": hits.get(line_number, 0),
+                "time": times.get(line_number, 0) / number,
+                "code": line,
+            }
+        )
+    return {"number": number, "total_time": total_time / number, "lines": lines}
+
+
+def make_line_profile_table(profile: dict, time_unit: str = "dynamic", code_theme: str = "one-dark") -> Table:
+    """
+    Generate a table of the time taken by each line to display in the terminal.
+
+    Parameters
+    ----------
+    profile : dict
+        The line profile, as returned by :func:`profile_lines`
+    time_unit : str, optional
+        The time unit to be used, by default "dynamic"
+    code_theme : str, optional
+        The theme used to highlight the code, by default "one-dark"
+    """
+    total = profile["total_time"]
+    syntax = Syntax("", "python", theme=code_theme)
+    table = Table(
+        "Line", "Hits", "Time", "%", "Code",
+        box=box.SIMPLE_HEAD,
+        title=f"Line profile ({profile['number']:,} runs, times per run)",
+        title_justify="left",
+        title_style="b",
+    )
+    largest_time = max((line["time"] for line in profile["lines"]), default=0)
+    for line in profile["lines"]:
+        # Highlight the lines that dominate
+        style = "red b" if largest_time and line["time"] == largest_time else "green"
+        code = syntax.highlight(line["code"])
+        code.rstrip()
+        table.add_row(
+            str(line["line"]),
+            f"{line['hits']:,}" if line["hits"] else "",
+            f"[{style}]{choose_unit(line['time'], unit=time_unit)}[/]" if line["hits"] else "",
+            f"{line['time'] / total:.0%}" if line["hits"] and total > 0 else "",
+            code,
+        )
+    return table
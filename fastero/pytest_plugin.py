@@ -0,0 +1,178 @@
+"""Pytest plugin for writing benchmarks alongside tests."""
+
+import pytest
+from rich.console import Console
+
+from .exporter import Exporter
+from .results import Result
+from .utils import (_Timer as Timer, autorange, calculate_batches, compute_statistics, convert_time,
+                    choose_unit)
+
+INFINITY = float('inf')
+
+
+def pytest_addoption(parser):
+    """Add the fastero options to pytest."""
+    group = parser.getgroup("fastero", "benchmarking with fastero")
+    group.addoption("--benchmark-only", action="store_true", default=False, help="Only run tests that use the fastero fixture") # noqa
+    group.addoption("--benchmark-skip", action="store_true", default=False, help="Skip tests that use the fastero fixture") # noqa
+    group.addoption("--fastero-total-time", metavar="TIME", default="3s", help="How long to test each snippet for, specifying --fastero-runs overrides this. (default: 3s)") # noqa
+    group.addoption("--fastero-time-per-batch", metavar="TIME", default="200ms", help="How long each test batch will last for. (default: 200ms)") # noqa
+    group.addoption("--fastero-runs", metavar="NUM", type=int, default=None, help="Perform exactly NUM runs for each snippet") # noqa
+    group.addoption("--fastero-min-runs", metavar="NUM", type=int, default=2, help="Perform at least NUM runs for each snippet. (default: 2)") # noqa
+    group.addoption("--fastero-max-runs", metavar="NUM", type=int, default=None, help="Perform at most NUM runs for each snippet") # noqa
+    group.addoption("--fastero-warmup", metavar="NUM", type=int, default=None, help="Perform NUM warmup runs before each benchmark") # noqa
+    group.addoption("--fastero-time-unit", metavar="UNIT", default="dynamic", help="The time unit used in the summary and the exported tables. (default: dynamic)") # noqa
+    for export_format in ("json", "csv", "yaml", "markdown", "asciidoc", "html"):
+        group.addoption(f"--fastero-export-{export_format}", metavar="FILE", default=None, help=f"Export the results of the session as {export_format} to FILE") # noqa
+
+
+def pytest_configure(config):
+    """Create the exporter that collects the results of the whole session."""
+    config.addinivalue_line("markers", "fastero(**options): override the fastero options for a benchmark")
+    config._fastero_exporter = Exporter(alt_console=Console(highlight=False, stderr=True))
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip tests according to ``--benchmark-only`` and ``--benchmark-skip``."""
+    benchmark_only = config.getoption("--benchmark-only")
+    benchmark_skip = config.getoption("--benchmark-skip")
+    if not (benchmark_only or benchmark_skip):
+        return
+    for item in items:
+        uses_fastero = "fastero" in getattr(item, "fixturenames", ())
+        if benchmark_only and not uses_fastero:
+            item.add_marker(pytest.mark.skip(reason="Skipping non-benchmark (--benchmark-only active)"))
+        elif benchmark_skip and uses_fastero:
+            item.add_marker(pytest.mark.skip(reason="Skipping benchmark (--benchmark-skip active)"))
+
+
+class BenchmarkFixture:
+    """The object given by the ``fastero`` fixture, call it to benchmark a snippet."""
+
+    def __init__(self, node_name: str, exporter: Exporter, options: dict):
+        """
+        Initialize the fixture.
+
+        Parameters
+        ----------
+        node_name : str
+            The name of the test, used as the default snippet name
+        exporter : Exporter
+            The exporter that collects the results of the session
+        options : dict
+            The options used for the timing, the keys are the same as the suite options
+        """
+        self.node_name = node_name
+        self.exporter = exporter
+        self.options = options
+        self.results = []
+
+    def __call__(self, stmt, setup="pass", name: str = None, globals: dict = None, **options) -> Result:
+        """
+        Benchmark a snippet the same way the fastero command does.
+
+        Parameters
+        ----------
+        stmt : Union[str, Callable[[], Any]]
+            The code or the callable to benchmark
+        setup : Union[str, Callable[[], Any]], optional
+            The code or the callable to execute once in each batch, by default "pass"
+        name : str, optional
+            The name for the snippet, by default the name of the test
+        globals : dict, optional
+            The namespace to run the code in, by default None
+        **options
+            Override the timing options (warmup, runs, min_runs, max_runs, total_time, time_per_batch)
+
+        Returns
+        -------
+        Result
+            The result as added to the exporter
+        """
+        options = {**self.options, **options}
+        for key in ("total_time", "time_per_batch"):
+            options[key] = convert_time(options[key], None)
+        timer = Timer(stmt=stmt, setup=setup, globals=globals)
+
+        if options["warmup"]:
+            for _ in range(options["warmup"]):
+                timer.timeit(number=1)
+        num_in_one_batch, time_taken = autorange(
+            timer, options["time_per_batch"], max_number=options["runs"] or INFINITY
+        )
+        num_of_batches, num_in_one_batch = calculate_batches(
+            num_in_one_batch, time_taken, options["total_time"], runs=options["runs"],
+            min_runs=options["min_runs"], max_runs=options["max_runs"]
+        )
+        timings = [timer.timeit(num_in_one_batch) / num_in_one_batch for _ in range(num_of_batches)]
+        stats = compute_statistics(timings)
+
+        if name is None:
+            name = self.node_name if not self.results else f"{self.node_name} ({len(self.results)+1})"
+        code = stmt if isinstance(stmt, str) else f"{getattr(stmt, '__qualname__', repr(stmt))}()"
+        self.exporter.add_result(
+            code, name, num_of_batches * num_in_one_batch,
+            stats["mean"], stats["median"], stats["stddev"], stats["min"], stats["max"], timings
+        )
+        self.results.append(self.exporter.snippets[-1])
+        return self.results[-1]
+
+
+@pytest.fixture
+def fastero(request):
+    """Benchmark code using the same calibration and statistics as the fastero command."""
+    config = request.config
+    options = dict(
+        warmup=config.getoption("--fastero-warmup"),
+        runs=config.getoption("--fastero-runs"),
+        min_runs=config.getoption("--fastero-min-runs"),
+        max_runs=config.getoption("--fastero-max-runs"),
+        total_time=config.getoption("--fastero-total-time"),
+        time_per_batch=config.getoption("--fastero-time-per-batch"),
+    )
+    marker = request.node.get_closest_marker("fastero")
+    if marker is not None:
+        options.update(marker.kwargs)
+    return BenchmarkFixture(request.node.name, config._fastero_exporter, options)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Show the results of all the benchmarks at the end of the session."""
+    exporter = getattr(config, "_fastero_exporter", None)
+    if not exporter or not exporter.snippets:
+        return
+    unit = config.getoption("--fastero-time-unit")
+    terminalreporter.write_sep("-", "fastero benchmarks")
+    name_width = max(map(len, exporter.snippets.column("snippet_name")))
+    for snippet in exporter.snippets:
+        # The mean and the standard deviation are -1 if there weren't enough batches to calculate them
+        mean = choose_unit(snippet['mean'], unit=unit) if snippet['mean'] != -1 else "?"
+        stddev = choose_unit(snippet['stddev'], unit=unit) if snippet['stddev'] != -1 else "?"
+        terminalreporter.write_line(
+            f"{snippet['snippet_name'].ljust(name_width)}  "
+            f"{mean} ± {stddev}  "
+            f"({choose_unit(snippet['min'], unit=unit)} … {choose_unit(snippet['max'], unit=unit)})  "
+            f"[runs: {snippet['runs']:,}]"
+        )
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Export the results of the session."""
+    config = session.config
+    exporter = getattr(config, "_fastero_exporter", None)
+    if not exporter or not exporter.snippets:
+        return
+    unit = config.getoption("--fastero-time-unit")
+    if config.getoption("--fastero-export-json"):
+        exporter.export_json(config.getoption("--fastero-export-json"))
+    if config.getoption("--fastero-export-csv"):
+        exporter.export_csv(config.getoption("--fastero-export-csv"))
+    if config.getoption("--fastero-export-yaml"):
+        exporter.export_yaml(config.getoption("--fastero-export-yaml"))
+    if config.getoption("--fastero-export-markdown"):
+        exporter.export_markdown(config.getoption("--fastero-export-markdown"), unit=unit)
+    if config.getoption("--fastero-export-asciidoc"):
+        exporter.export_asciidoc(config.getoption("--fastero-export-asciidoc"), unit=unit)
+    if config.getoption("--fastero-export-html"):
+        exporter.export_html(config.getoption("--fastero-export-html"), unit=unit)
@@ -0,0 +1,137 @@
+"""Module for the compact records used to store the results."""
+
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Iterable, Iterator, List
+
+# The percentiles of the iteration times and the slowest iteration, only measured with --latency
+LATENCY_FIELDS = ("p50", "p90", "p99", "p999", "max_latency")
+# The fields of a result, in the order they are exported
+RESULT_FIELDS = ("snippet_code", "snippet_name", "runs", "mean", "median", "min", "max", "stddev", "timings",
+                 *LATENCY_FIELDS, "latency_histogram")
+# The typecode of the array used for each numeric column, the rest of the columns are lists
+COLUMN_TYPECODES = {"runs": "q", "mean": "d", "median": "d", "min": "d", "max": "d", "stddev": "d"}
+
+
+def _as_array(timings):
+    """
+    Convert the raw samples to an array of doubles, without copying if they already are one.
+
+    Views of doubles, e.g. of the samples memory-mapped from a ``.npy`` file, are kept as they are.
+    """
+    if timings is None or isinstance(timings, array) or (isinstance(timings, memoryview) and timings.format == "d"):
+        return timings
+    return array("d", timings)
+
+
+class Result(Mapping):
+    """
+    The result of a single snippet.
+
+    The fields can be accessed as attributes or with ``result["mean"]`` like the dicts
+    that were used before, the raw samples are stored in an :class:`array.array` of
+    doubles instead of a list of floats.
+    """
+
+    __slots__ = RESULT_FIELDS
+
+    def __init__(
+        self,
+        snippet_code: str,
+        snippet_name: str,
+        runs: int,
+        mean: float,
+        median: float,
+        min: float,
+        max: float,
+        stddev: float,
+        timings: Iterable[float] = None,
+        p50: float = None,
+        p90: float = None,
+        p99: float = None,
+        p999: float = None,
+        max_latency: float = None,
+        latency_histogram: dict = None,
+    ):
+        self.snippet_code = snippet_code
+        self.snippet_name = snippet_name
+        # Stored in an array of integers, other tools may write the amount of runs as a float, e.g. 1000.0
+        self.runs = int(runs)
+        self.mean = mean
+        self.median = median
+        self.min = min
+        self.max = max
+        self.stddev = stddev
+        self.timings = _as_array(timings)
+        self.p50 = p50
+        self.p90 = p90
+        self.p99 = p99
+        self.p999 = p999
+        self.max_latency = max_latency
+        # The histogram of the iteration times in nanoseconds, as made by LatencyHistogram.to_dict
+        self.latency_histogram = latency_histogram
+
+    def __getitem__(self, key):
+        if key not in RESULT_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(RESULT_FIELDS)
+
+    def __len__(self) -> int:
+        return len(RESULT_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"Result(snippet_name={self.snippet_name!r}, runs={self.runs!r}, mean={self.mean!r})"
+
+    def to_dict(self) -> dict:
+        """Convert the result to a dict that can be serialized, the raw samples become a list."""
+        data = {key: getattr(self, key) for key in RESULT_FIELDS}
+        if self.timings is not None:
+            data["timings"] = self.timings.tolist()
+        return data
+
+
+class ResultCollection(Sequence):
+    """
+    A list of results stored column by column.
+
+    Each numeric field is kept in a single typed array and the raw samples of every
+    result in an array of doubles, so suites with thousands of results stay small in
+    memory. Indexing gives a :class:`Result` built from the columns and exporters can
+    use :meth:`rows` to go over only the fields they need in a single pass.
+    """
+
+    def __init__(self, results: Iterable[Result] = ()):
+        self.columns = {key: array(COLUMN_TYPECODES[key]) if key in COLUMN_TYPECODES else [] for key in RESULT_FIELDS}
+        for result in results:
+            self.append(result)
+
+    def append(self, result: Result):
+        """Add a result to the end of the collection."""
+        for key in RESULT_FIELDS:
+            self.columns[key].append(getattr(result, key))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return Result(*(self.columns[key][index] for key in RESULT_FIELDS))
+
+    def __len__(self) -> int:
+        return len(self.columns["snippet_code"])
+
+    def __repr__(self) -> str:
+        return f"ResultCollection({list(self)!r})"
+
+    def column(self, key: str):
+        """Get all the values of a field, as an array for the numeric fields and a list for the rest."""
+        return self.columns[key]
+
+    def rows(self, keys: Iterable[str]) -> Iterator[tuple]:
+        """Go over the values of the given fields for every result, without building any :class:`Result`."""
+        return zip(*(self.columns[key] for key in keys))
+
+    def to_dicts(self) -> List[dict]:
+        """Convert all the results to dicts that can be serialized."""
+        return [result.to_dict() for result in self]
@@ -0,0 +1,270 @@
+"""Module for comparing the speed of snippets between two git revisions."""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from math import ceil
+from typing import List, Optional, Tuple
+
+import rich_click as click
+from rich import box
+from rich.table import Table
+
+from .utils import TIME_FORMAT_UNITS, Time, choose_unit, compare_samples, compute_statistics
+
+# The code of the workers, one per revision. It reads a JSON request per line and replies with
+# the time a batch took, it only uses built-in modules so nothing is imported from the revision
+# before the snippet imports it. The paths of the revision are given as arguments
+WORKER_CODE = """\
+import json
+import sys
+import timeit
+import traceback
+sys.path[:0] = sys.argv[1:]
+timers = {}
+for line in sys.stdin:
+    request = json.loads(line)
+    try:
+        key = (request["code"], request["setup"])
+        if key not in timers:
+            timers[key] = timeit.Timer(request["code"], request["setup"])
+        if request["number"]:
+            reply = {"time": timers[key].timeit(request["number"])}
+        else:
+            number, time_taken = timers[key].autorange()
+            reply = {"number": number, "time": time_taken}
+    except BaseException:
+        reply = {"error": traceback.format_exc()}
+    sys.stdout.write(json.dumps(reply) + "\\n")
+    sys.stdout.flush()
+"""
+
+
+class RevisionError(Exception):
+    """A git command failed or a worker couldn't time a snippet."""
+
+
+def git(*arguments: str, cwd: Optional[str] = None) -> str:
+    """Run a git command and get its output."""
+    try:
+        process = subprocess.run(["git", *arguments], cwd=cwd, capture_output=True, text=True)
+    except OSError as e:
+        raise RevisionError(f"Could not run git: {e}") from None
+    if process.returncode != 0:
+        raise RevisionError(process.stderr.strip() or f"git {arguments[0]} exited with {process.returncode}")
+    return process.stdout.strip()
+
+
+class Worktree:
+    """A revision checked out into a temporary git worktree, removed when closed."""
+
+    def __init__(self, revision: str, repository: str, directory: str):
+        self.revision = revision
+        self.commit = git("rev-parse", "--verify", f"{revision}^{{commit}}", cwd=repository)
+        self.repository = repository
+        self.path = os.path.join(directory, self.commit[:12])
+        if not os.path.exists(self.path):
+            git("worktree", "add", "--detach", self.path, self.commit, cwd=repository)
+
+    def close(self):
+        """Remove the worktree."""
+        if os.path.exists(self.path):
+            try:
+                git("worktree", "remove", "--force", self.path, cwd=self.repository)
+            except RevisionError:
+                shutil.rmtree(self.path, ignore_errors=True)
+                git("worktree", "prune", cwd=self.repository)
+
+
+class Worker:
+    """An interpreter with a revision on its ``sys.path`` that times the snippets sent to it."""
+
+    def __init__(self, worktree: Worktree, paths: List[str]):
+        self.worktree = worktree
+        self.process = subprocess.Popen(
+            [sys.executable, "-c", WORKER_CODE, *(os.path.join(worktree.path, path) for path in paths)],
+            cwd=worktree.path, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+
+    def time(self, code: str, setup: str, number: int) -> Tuple[int, float]:
+        """
+        Time a batch of runs of a snippet.
+
+        Parameters
+        ----------
+        number : int
+            How many times to run the snippet, 0 to find a good number with :meth:`timeit.Timer.autorange`
+
+        Returns
+        -------
+        Tuple[int, float]
+            The number of runs and the time all of them took
+        """
+        self.process.stdin.write(json.dumps({"code": code, "setup": setup, "number": number}) + "\n")
+        self.process.stdin.flush()
+        line = self.process.stdout.readline()
+        if not line:
+            raise RevisionError(f"The worker of {self.worktree.revision} exited")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise RevisionError(f"The snippet failed on {self.worktree.revision}:\n{reply['error']}")
+        return reply.get("number", number), reply["time"]
+
+    def close(self):
+        """Stop the worker."""
+        self.process.stdin.close()
+        self.process.wait()
+
+
+def interleaved_benchmark(
+    workers: List[Worker], code: str, setup: str, rounds: int, time_per_batch: float, warmup: int = 1,
+    callback=None,
+) -> Tuple[int, List[List[float]]]:
+    """
+    Time a snippet on every worker, alternating between them.
+
+    Every round times a batch on each worker, in the reverse order every other round,
+    so slow changes of the machine (e.g. its temperature) affect all the revisions the
+    same. The same number of runs per batch is used for every revision.
+
+    Returns
+    -------
+    Tuple[int, List[List[float]]]
+        The number of runs in each batch and the time of a single run in each batch, for every worker
+    """
+    # Find how many runs fill a batch on the first revision
+    number, time_taken = workers[0].time(code, setup, 0)
+    number = max(1, ceil(number * time_per_batch / time_taken)) if time_taken > 0 else number
+    for worker in workers:
+        for _ in range(warmup):
+            worker.time(code, setup, number)
+
+    timings = [[] for _ in workers]
+    for round_number in range(rounds):
+        order = list(enumerate(workers))
+        if round_number % 2:
+            order.reverse()
+        for index, worker in order:
+            timings[index].append(worker.time(code, setup, number)[1] / number)
+        if callback is not None:
+            callback(round_number + 1)
+    return number, timings
+
+
+def make_speedup_table(comparisons: List[dict], revisions: List[str], time_unit: str, confidence: float) -> Table:
+    """
+    Generate a table of the speedup of the second revision over the first for every snippet.
+
+    A speedup above 1 means the second revision is faster, it is only shown as faster or
+    slower if the whole confidence interval is above or below 1.
+    """
+    table = Table(
+        "Snippet", revisions[0], revisions[1], "Speedup", f"{confidence:.0%} CI", "",
+        box=box.SIMPLE_HEAD,
+        title=f"{revisions[1]} compared to {revisions[0]}",
+        title_justify="left",
+        title_style="b",
+    )
+    for comparison in comparisons:
+        speedup, low, high = comparison["speedup"], comparison["low"], comparison["high"]
+        if low > 1:
+            verdict = "[green b]faster[/]"
+        elif high < 1:
+            verdict = "[red b]slower[/]"
+        else:
+            verdict = "[dim]unchanged[/]"
+        table.add_row(
+            f"[cyan]{comparison['name']}[/]",
+            choose_unit(comparison["means"][0], unit=time_unit),
+            choose_unit(comparison["means"][1], unit=time_unit),
+            f"{speedup:.2f}x",
+            f"{low:.2f}x … {high:.2f}x",
+            verdict,
+        )
+    return table
+
+
+@click.command()
+@click.argument("BASE")
+@click.argument("HEAD")
+@click.argument("CODE_SNIPPETS", nargs=-1, required=True)
+@click.option("--snippet-name", "-n", metavar="NAME", multiple=True, help="Give a meaningful name to a snippet. This can be specified multiple times if several snippets are benchmarked.") # noqa
+@click.option("--setup", "-s", metavar="STMT", default="pass", show_default=True, help="Code to be executed once in each batch, e.g. to import the code being benchmarked. Its execution time is not timed") # noqa
+@click.option("--path", "-p", "paths", metavar="DIR", multiple=True, default=(".",), show_default=True, help="The directory of the checked out revision added to sys.path, e.g. src for projects with a src layout. This can be specified multiple times") # noqa
+@click.option("--rounds", "-r", metavar="NUM", default=20, show_default=True, type=click.IntRange(min=2), help="How many batches to time for each revision, the revisions are alternated after every batch") # noqa
+@click.option("--warmup", "-w", metavar="NUM", default=1, show_default=True, type=click.IntRange(min=0), help="How many batches to run on each revision before timing") # noqa
+@click.option("--time-per-batch", "-b", metavar="TIME", default="100ms", show_default=True, type=Time(), help="How long each batch will last for") # noqa
+@click.option("--confidence", metavar="LEVEL", default=0.95, show_default=True, type=click.FloatRange(min=0, max=1, min_open=True, max_open=True), help="The confidence level used for the confidence intervals") # noqa
+@click.option("--time-unit", "-u", metavar="UNIT", default="dynamic", show_default=True, type=click.Choice(TIME_FORMAT_UNITS, case_sensitive=False), help="Set the time unit to be used. Possible values: ns, us, ms, s, dynamic") # noqa
+@click.option("--code-theme", "-c", default="one-dark", show_default=True, metavar="THEME_NAME", help="Theme for the code output") # noqa
+@click.option("--export-json", metavar="FILE", type=click.Path(dir_okay=False, resolve_path=True, readable=False, writable=True), help="Export the results of both revisions as JSON to the given FILE") # noqa
+@click.help_option('-h', '--help')
+def revisions(
+    base, head, code_snippets, snippet_name, setup, paths, rounds, warmup, time_per_batch, confidence, time_unit,
+    code_theme, export_json,
+):
+    """
+    Compare the speed of **CODE_SNIPPETS** on the git revisions **BASE** and **HEAD**,
+    e.g. `fastero revisions HEAD~1 HEAD -- "mod.func()"`.
+
+    Each revision is checked out into a temporary git worktree, so the working copy isn't touched, and the
+    snippets run in a separate interpreter for each revision with its worktree on `sys.path`. The batches of
+    both revisions are interleaved, so changes of the machine over time affect both the same.
+    """
+    from .core import alt_console, console, print_snippet_header, print_statistics
+
+    try:
+        repository = git("rev-parse", "--show-toplevel")
+    except RevisionError as e:
+        alt_console.print(f"[red b]Error:[/] Not in a git repository: {e}")
+        raise click.exceptions.Exit(1)
+
+    directory = tempfile.mkdtemp(prefix="fastero-revisions-")
+    worktrees, workers = [], []
+    comparisons = []
+    try:
+        with alt_console.status("Checking out the revisions"):
+            for revision in (base, head):
+                worktrees.append(Worktree(revision, repository, directory))
+        for worktree in worktrees:
+            alt_console.print(f"[cyan]Info:[/] {worktree.revision} is [yellow]{worktree.commit[:12]}[/]")
+            workers.append(Worker(worktree, paths))
+
+        for index, code in enumerate(code_snippets):
+            name = snippet_name[index] if index < len(snippet_name) else f"Benchmark {index + 1}"
+            print_snippet_header(name, code, code_theme)
+            with alt_console.status(f"Timing {name}") as status:
+                number, timings = interleaved_benchmark(
+                    workers, code, setup, rounds, time_per_batch, warmup,
+                    callback=lambda done: status.update(f"Timing {name} (round {done}/{rounds})"),
+                )
+            for worktree, samples in zip(worktrees, timings):
+                stats = compute_statistics(samples)
+                console.exporter.add_result(
+                    code, f"{name} @ {worktree.revision}", number * len(samples),
+                    stats["mean"], stats["median"], stats["stddev"], stats["min"], stats["max"], samples
+                )
+                console.print(f"  [b]{worktree.revision}[/]")
+                print_statistics(console.exporter.snippets[-1], time_unit)
+            # Comparing the base to the head gives the speedup of the head minus 1, e.g. 0.1 is 1.1x as fast
+            speedup, low, high = compare_samples(timings[1], timings[0], confidence=confidence)
+            comparisons.append({
+                "name": name, "means": [sum(i) / len(i) for i in timings],
+                "speedup": 1 + speedup, "low": 1 + low, "high": 1 + high,
+            })
+    except RevisionError as e:
+        alt_console.print(f"[red b]Error:[/] {e}")
+        raise click.exceptions.Exit(1)
+    finally:
+        for worker in workers:
+            worker.close()
+        for worktree in worktrees:
+            worktree.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    console.print(make_speedup_table(comparisons, [base, head], time_unit, confidence))
+    if export_json:
+        console.exporter.export_json(export_json)
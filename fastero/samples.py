@@ -0,0 +1,132 @@
+"""Module for storing the raw samples in a binary ``.npy`` file next to the JSON exports."""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from ast import literal_eval
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+NPY_MAGIC = b"\x93NUMPY"
+# Little-endian doubles, the same as the arrays the samples are kept in on most machines
+NPY_DTYPE = "<f8"
+
+
+def npy_filename(json_filename) -> Path:
+    """Get the file the samples of a JSON export are written to, e.g. ``results.samples.npy`` for ``results.json``."""
+    return Path(json_filename).with_suffix(".samples.npy")
+
+
+def _as_little_endian(samples: Sequence[float]):
+    """Get the samples as a buffer of little-endian doubles, without copying them if they already are one."""
+    if sys.byteorder == "little" and (
+        (isinstance(samples, array) and samples.typecode == "d")
+        or (isinstance(samples, memoryview) and samples.format == "d")
+    ):
+        return samples
+    samples = array("d", samples)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples
+
+
+def write_npy(filename, samples: Iterable[Optional[Sequence[float]]]) -> List[Optional[Tuple[int, int]]]:
+    """
+    Write the samples of every result one after the other to a single one-dimensional ``.npy`` file.
+
+    The file can be read with :func:`read_npy` or ``numpy.load(filename, mmap_mode="r")``.
+
+    Returns
+    -------
+    List[Optional[Tuple[int, int]]]
+        The offset and the amount of samples of every result in the file, None for the
+        results without samples
+    """
+    samples = list(samples)
+    total = sum(len(i) for i in samples if i is not None)
+    header = f"{{'descr': '{NPY_DTYPE}', 'fortran_order': False, 'shape': ({total},), }}"
+    # The header is padded so the data is aligned to 64 bytes, the same as NumPy does
+    header += " " * (-(len(NPY_MAGIC) + 4 + len(header) + 1) % 64) + "\n"
+
+    locations = []
+    offset = 0
+    # The samples may be views of the file being replaced, memory-mapped by read_npy, so the file is
+    # written next to it and moved over it once complete instead of being truncated while they're read
+    fd, temporary = tempfile.mkstemp(dir=Path(filename).resolve().parent, prefix=".fastero-", suffix=".npy.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(NPY_MAGIC + b"\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1"))
+            for timings in samples:
+                if timings is None:
+                    locations.append(None)
+                    continue
+                f.write(_as_little_endian(timings))
+                locations.append((offset, len(timings)))
+                offset += len(timings)
+        os.replace(temporary, filename)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    return locations
+
+
+def read_npy(filename) -> memoryview:
+    """
+    Read a one-dimensional ``.npy`` file of doubles written by :func:`write_npy` or NumPy.
+
+    The file is memory-mapped, so the samples are only read from the disk when they are
+    used and slicing the returned view doesn't copy them.
+
+    Raises
+    ------
+    ValueError
+        If the file isn't a ``.npy`` file with a one-dimensional array of little-endian doubles
+    """
+    with open(filename, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:len(NPY_MAGIC)] != NPY_MAGIC:
+        raise ValueError(f"{filename} is not a .npy file")
+    major = mapped[len(NPY_MAGIC)]
+    # Version 1 has a 2 byte header length, versions 2 and 3 have a 4 byte one
+    length_format = "<H" if major == 1 else "<I"
+    start = len(NPY_MAGIC) + 2
+    header_length, = struct.unpack_from(length_format, mapped, start)
+    start += struct.calcsize(length_format)
+    header = literal_eval(mapped[start:start + header_length].decode("latin1"))
+    if header["descr"] != NPY_DTYPE or header["fortran_order"] or len(header["shape"]) != 1:
+        raise ValueError(f"{filename} does not contain a one-dimensional array of {NPY_DTYPE}")
+    start += header_length
+    data = memoryview(mapped)[start:start + header["shape"][0] * 8].cast("d")
+    if sys.byteorder == "big":
+        data = array("d", data.tobytes())
+        data.byteswap()
+        return memoryview(data)
+    return data
+
+
+def attach_samples(data: dict, json_filename) -> dict:
+    """
+    Replace the references to the samples in the ``.npy`` file of a JSON export with the samples.
+
+    The samples are views of the memory-mapped file, so they aren't copied.
+    """
+    sidecar = data.get("samples")
+    if not sidecar:
+        return data
+    values = read_npy(Path(json_filename).parent / sidecar["file"])
+    for result in data["results"]:
+        location = result.get("timings")
+        if isinstance(location, dict):
+            result["timings"] = values[location["offset"]:location["offset"] + location["count"]]
+    return data
+
+
+def load_export(filename) -> dict:
+    """Load a JSON file exported by fastero, with the samples from its ``.npy`` file if it has one."""
+    with open(filename, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return attach_samples(data, filename)
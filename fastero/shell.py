@@ -0,0 +1,107 @@
+"""Module for timing external commands, used by the ``--shell`` mode."""
+
+import os
+import subprocess
+from time import perf_counter
+from typing import List, Optional
+
+import click
+
+
+class CommandFailed(Exception):
+    """A command exited with a non-zero exit code."""
+
+    def __init__(self, command: str, returncode: int, stderr: bytes = b""):
+        self.command = command
+        self.returncode = returncode
+        self.stderr = stderr.decode(errors="replace")
+        super().__init__(f"{command!r} exited with the exit code {returncode}")
+
+
+def default_shell() -> List[str]:
+    """Get the shell used to run the commands, as the arguments to run a command with."""
+    if os.name == "nt":
+        return [os.environ.get("COMSPEC", "cmd.exe"), "/C"]
+    return ["/bin/sh", "-c"]
+
+
+def shell_arguments(shell: Optional[str]) -> Optional[List[str]]:
+    """
+    Get the arguments to run a command with a shell.
+
+    Parameters
+    ----------
+    shell : str, optional
+        The shell, e.g. ``bash`` or ``"bash -e"``. "default" for the default shell
+        of the platform and "none" to run commands directly without a shell
+
+    Returns
+    -------
+    Optional[List[str]]
+        The arguments that come before the command, None if there is no shell
+    """
+    import shlex
+
+    if shell is None or shell.lower() == "default":
+        return default_shell()
+    if shell.lower() == "none":
+        return None
+    arguments = shlex.split(shell)
+    # Most shells, including cmd.exe and powershell with /C and -Command, take the command after -c
+    if len(arguments) == 1:
+        arguments.append("/C" if os.path.basename(arguments[0]).lower() in ("cmd", "cmd.exe") else "-c")
+    return arguments
+
+
+def run_command(command: str, shell: Optional[List[str]]) -> float:
+    """
+    Run a command once and get how long it took.
+
+    Parameters
+    ----------
+    command : str
+        The command to run
+    shell : Optional[List[str]]
+        The shell arguments as returned by :func:`shell_arguments`, None to run the command without a shell
+
+    Returns
+    -------
+    float
+        The wall time the command took, including starting the shell
+    """
+    import shlex
+
+    arguments = [*shell, command] if shell is not None else shlex.split(command)
+    # Not closing the file descriptors lets subprocess use posix_spawn where it can, which starts faster
+    start = perf_counter()
+    process = subprocess.run(
+        arguments, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, close_fds=False
+    )
+    end = perf_counter()
+    if process.returncode != 0:
+        raise CommandFailed(command, process.returncode, process.stderr)
+    return end - start
+
+
+def measure_shell_overhead(shell: Optional[List[str]], runs: int = 50) -> float:
+    """
+    Measure how long starting the shell with an empty command takes.
+
+    This is subtracted from the times of the commands, so only the time taken by the
+    command itself is shown. There is no overhead to measure when there is no shell.
+    """
+    if shell is None:
+        return 0.0
+    timings = sorted(run_command("", shell) for _ in range(runs))
+    # The median is less affected by the occasional slow spawn than the mean
+    return timings[len(timings) // 2]
+
+
+def run_prepare(command: Optional[str], shell: Optional[List[str]]):
+    """Run the prepare command before a run of the benchmarked command, its time isn't counted."""
+    if not command:
+        return
+    try:
+        run_command(command, shell)
+    except CommandFailed as e:
+        raise click.ClickException(f"The prepare command {e.command!r} exited with the exit code {e.returncode}")
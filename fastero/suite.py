@@ -0,0 +1,173 @@
+"""Module for loading benchmark suite files."""
+
+import json
+import re
+from pathlib import Path
+
+import click
+
+from .utils import convert_time, is_file_directive, parse_file_directive, select_lines
+
+# The options that can be set for a whole suite, a group or a single benchmark
+SUITE_OPTIONS = ("warmup", "runs", "min_runs", "max_runs", "total_time", "time_per_batch", "input", "input_pool")
+KEYWORD_OPERATORS = ("and", "or", "not", "(", ")")
+
+
+def _read_suite_file(filename):
+    """Read a suite file and return the parsed data, the format is guessed from the extension."""
+    path = Path(filename)
+    extension = path.suffix.lower()
+    if extension == ".toml":
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise click.ClickException(
+                    "The package tomli is not installed. Please install it in order to use TOML suite files."
+                )
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    elif extension in (".yaml", ".yml"):
+        try:
+            from yaml import safe_load
+        except ImportError:
+            raise click.ClickException(
+                "The package PyYAML is not installed. Please install it in order to use YAML suite files."
+            )
+        with open(path, "r", encoding="utf-8") as f:
+            return safe_load(f)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _merge_options(options, new_options, where):
+    """Return a copy of options updated with new_options, after validating new_options."""
+    options = dict(options)
+    for key, value in (new_options or {}).items():
+        key = key.replace("-", "_")
+        if key not in SUITE_OPTIONS:
+            raise click.BadParameter(
+                f"Unknown option {key!r} in {where}. Valid options are: {', '.join(SUITE_OPTIONS)}",
+                param_hint="--suite"
+            )
+        if key in ("total_time", "time_per_batch"):
+            value = convert_time(value, None)
+        options[key] = value
+    return options
+
+
+def _resolve_file(code, directory, files):
+    """If code uses the ``file:`` directive, read the file (or some of it) relative to directory and add it to files."""
+    if code is None or not is_file_directive(code):
+        return code
+    filename, start, end = parse_file_directive(code)
+    path = (directory / filename).resolve()
+    if not path.is_file():
+        raise click.BadParameter(f"The file {str(path)!r} referenced in the suite does not exist", param_hint="--suite")
+    files.append(str(path))
+    return select_lines(path.read_text(encoding="utf-8"), start, end, filename)
+
+
+def _join_setup(*setups):
+    """Join multiple setups into one, ignoring the empty ones."""
+    setups = [i for i in setups if i and i.strip() != "pass"]
+    return "\n".join(setups) or "pass"
+
+
+def load_suite(filename, defaults):
+    """
+    Load a benchmark suite file.
+
+    A suite file is a TOML, YAML or JSON file that has multiple groups each
+    with their own setup, options, tags and benchmarks. A file in the format
+    used by ``--from-json`` is treated as a suite with a single group.
+
+    Parameters
+    ----------
+    filename : Union[str, Path]
+        The path of the suite file
+    defaults : dict
+        The default values for the options, usually the ones passed in the command line
+
+    Returns
+    -------
+    Tuple[str, List[dict]]
+        The setup shared by all the groups and a list of benchmarks, each benchmark
+        is a dictionary with the keys ``snippet_code``, ``snippet_name``, ``group``,
+        ``setup``, ``tags``, ``options``, ``files`` (the files read with ``file:``)
+        and ``first_line`` (the line of the file the code starts at)
+    """
+    data = _read_suite_file(filename)
+    directory = Path(filename).parent
+    if not isinstance(data, dict):
+        raise click.BadParameter("The suite file must contain a mapping at the top level", param_hint="--suite")
+
+    suite_files = []
+    suite_setup = _resolve_file(data.get("setup"), directory, suite_files) or "pass"
+    suite_options = _merge_options(defaults, data.get("options"), "the suite options")
+    suite_tags = list(data.get("tags", []))
+    groups = data.get("groups")
+    if groups is None:
+        groups = [{"name": None, "benchmarks": data.get("results", [])}]
+
+    benchmarks = []
+    for group_index, group in enumerate(groups):
+        group_name = group.get("name", f"Group {group_index+1}")
+        group_files = list(suite_files)
+        group_setup = _join_setup(suite_setup, _resolve_file(group.get("setup"), directory, group_files))
+        group_options = _merge_options(suite_options, group.get("options"), f"the options of group {group_name!r}")
+        group_tags = suite_tags + list(group.get("tags", []))
+        for index, benchmark in enumerate(group.get("benchmarks", [])):
+            if isinstance(benchmark, str):
+                benchmark = {"snippet_code": benchmark}
+            files = list(group_files)
+            code = benchmark.get("snippet_code", benchmark.get("code"))
+            first_line = (parse_file_directive(code)[1] or 1) if code and is_file_directive(code) else 1
+            code = _resolve_file(code, directory, files)
+            if code is None:
+                raise click.BadParameter(
+                    f"Benchmark {index+1} of group {group_name!r} does not have any code", param_hint="--suite"
+                )
+            name = benchmark.get("snippet_name", benchmark.get("name", f"Benchmark {index+1}"))
+            benchmarks.append(
+                {
+                    "snippet_code": code,
+                    "snippet_name": f"{group_name}/{name}" if group_name else name,
+                    "group": group_name,
+                    "setup": _join_setup(group_setup, _resolve_file(benchmark.get("setup"), directory, files)),
+                    "tags": group_tags + list(benchmark.get("tags", [])),
+                    "options": _merge_options(
+                        group_options, benchmark.get("options"), f"the options of benchmark {name!r}"
+                    ),
+                    "files": files,
+                    "first_line": first_line,
+                }
+            )
+    return suite_setup, benchmarks
+
+
+def matches_keyword(expression, benchmark):
+    """
+    Check whether a benchmark matches a ``-k`` style keyword expression.
+
+    Every word in the expression matches if it is a case-insensitive substring of the
+    snippet name or any of the tags, the words can be combined with ``and``, ``or``,
+    ``not`` and parentheses, similar to pytest's ``-k`` option.
+    """
+    haystack = [benchmark["snippet_name"].lower(), *(tag.lower() for tag in benchmark.get("tags", []))]
+    tokens = re.findall(r"\(|\)|[^\s()]+", expression)
+    python_expression = " ".join(
+        token if token in KEYWORD_OPERATORS else repr(any(token.lower() in i for i in haystack))
+        for token in tokens
+    )
+    try:
+        return bool(eval(python_expression or "True", {"__builtins__": {}}, {}))
+    except SyntaxError:
+        raise click.BadParameter(f"Invalid keyword expression: {expression!r}", param_hint="-k")
+
+
+def filter_benchmarks(benchmarks, expression):
+    """Return only the benchmarks matching the ``-k`` style keyword expression."""
+    return [benchmark for benchmark in benchmarks if matches_keyword(expression, benchmark)]
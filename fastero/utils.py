@@ -1,8 +1,11 @@
 """Utilities to be used for fastero."""
 import sys
 import re
+import statistics
 import timeit
 
+from math import ceil, exp, lgamma, log
+
 import click
 from rich import box
 from rich.progress import ProgressColumn
@@ -11,14 +14,24 @@
 from rich.panel import Panel
 from rich.syntax import Syntax
 
+# Matches the file: directive, e.g. "file: foo.py", "file: foo.py:10" or "file: foo.py:10-40"
+file_directive_regex = re.compile(r"file: ?(.+?)(?::(\d+)(?:-(\d*))?)?\s*$")
 time_regex = re.compile(r"(\d{1,5}(?:[.,]?\d{1,5})?)((?:ns|us|ms|s|m|h|d)?)")
 time_dict = {"ns": 1e-09, "us": 1e-06, "ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400}
 TIME_FORMAT_UNITS = ["ns", "us", "ms", "s", "dynamic"]
+INFINITY = float('inf')
+# Characters used for the histograms, from the lowest to the highest bar
+HISTOGRAM_CHARS = "▁▂▃▄▅▆▇█"
+ASCII_HISTOGRAM_CHARS = ".:-=+*#@"
+# Histograms aren't meaningful with less samples than this
+MIN_HISTOGRAM_SAMPLES = 5
 
 
 def convert_time(argument, param):
     """Convert a time argument to a string representing seconds."""
-
+    if param is None:
+        # Called outside of click (e.g. for values read from a suite file)
+        param = click.Option(["--time"])
 
     if isinstance(argument, (float, int)):
         return argument
@@ -47,6 +60,71 @@ def convert_time(argument, param):
     return time
 
 
+def is_file_directive(code: str) -> bool:
+    """Check whether code uses the ``file:`` directive, 2 spaces after the ``:`` escape it."""
+    return code.startswith("file:") and not code.startswith("file:  ")
+
+
+def parse_file_directive(directive: str):
+    """
+    Parse a ``file:`` directive.
+
+    Returns
+    -------
+    Tuple[str, Optional[int], Optional[int]]
+        The filename and the first and last line to read (1-based, inclusive). The first
+        line is None to read the whole file and the last line is None to read until the end
+    """
+    match = file_directive_regex.match(directive.strip())
+    if not match:
+        raise click.BadParameter(f"Invalid file directive: {directive!r}")
+    filename, start, end = match.groups()
+    start = int(start) if start else None
+    if end is None:
+        end = start
+    else:
+        end = int(end) if end else None
+    return filename.strip(), start, end
+
+
+def select_lines(code: str, start: int = None, end: int = None, filename: str = "the file") -> str:
+    """Get only the lines from start to end (1-based, inclusive) of code, removing their common indentation."""
+    if start is None:
+        return code
+    import textwrap
+
+    lines = code.splitlines(keepends=True)
+    if not 1 <= start <= len(lines) or (end is not None and end < start):
+        raise click.BadParameter(
+            f"Invalid line range {start}-{end or ''} for {filename}, which has {len(lines)} lines"
+        )
+    return textwrap.dedent("".join(lines[start - 1:end]))
+
+
+def read_file_directive(directive: str):
+    """
+    Read the code for a ``file:`` directive, optionally only some of the lines.
+
+    The filename can be ``stdin`` to read from the standard input.
+
+    Returns
+    -------
+    Tuple[str, Optional[str], int]
+        The code, the path of the file that was read (None for stdin) and the
+        line number of the first line of the code in the file
+    """
+    filename, start, end = parse_file_directive(directive)
+    if filename == "stdin":
+        return select_lines(sys.stdin.read(), start, end, filename), None, start or 1
+    path = click.Path(
+        exists=True, file_okay=True, dir_okay=False, writable=False,
+        readable=True, resolve_path=True, allow_dash=True
+    ).convert(filename, None, None)
+    with open(path, "rt", encoding="utf-8") as f:
+        code = f.read()
+    return select_lines(code, start, end, filename), path, start or 1
+
+
 def prompt_continuation(width, line_number, wrap_count):
     """Display line numbers and '->' before soft wraps."""
 
@@ -198,6 +276,244 @@ def factors(n):
     )
 
 
+def autorange(timer, time_per_batch, callback=None, max_number=INFINITY):
+    """
+    Determine how many times to run the snippet in one batch.
+
+    This is a custom :py:meth:`timeit.Timer.autorange` implementation that stops as soon as
+    a batch takes at least ``time_per_batch`` seconds, this makes the progress bar smoother.
+    It does have one drawback where it makes it slower if there is a long setup
+
+    Parameters
+    ----------
+    timer : timeit.Timer
+        The timer to calibrate
+    time_per_batch : float
+        How long each batch should last for, in seconds
+    callback : Callable[[int, float], None], optional
+        Called with the number tried and the time it took after each try, by default None
+    max_number : int, optional
+        Never try more than this many runs, by default infinity
+
+    Returns
+    -------
+    Tuple[int, float]
+        The number of runs in one batch and the time that batch took
+    """
+    i = 1
+    while True:
+        for j in 1, 2, 5, 8:
+            if i * j > max_number:
+                # The last number tried, which is the one time_taken is for
+                return number, time_taken
+            number = i * j
+            time_taken = timer.timeit(number)
+            if callback:
+                callback(number, time_taken)
+            if time_taken >= time_per_batch:
+                return (number, time_taken)
+        i *= 10
+
+
+def calculate_batches(num_in_one_batch, time_taken, total_time, runs=None, min_runs=2, max_runs=None):
+    """
+    Calculate the amount of batches and the amount of runs in each batch.
+
+    Parameters
+    ----------
+    num_in_one_batch : int
+        The number of runs in one batch as determined by :func:`autorange`
+    time_taken : float
+        The time it took to run that batch
+    total_time : float
+        How long to test the snippet for, ignored if ``runs`` is specified
+    runs : int, optional
+        The exact amount of runs to perform, by default None
+    min_runs : int, optional
+        Perform at least this many runs, by default 2
+    max_runs : int, optional
+        Perform at most this many runs, by default None
+
+    Returns
+    -------
+    Tuple[int, int]
+        The number of batches and the number of runs in one batch
+    """
+    if not runs:
+        num_of_batches = int(total_time / time_taken)
+        total_runs_based_on_time = num_of_batches * num_in_one_batch
+        if (total_runs_based_on_time) < min_runs:
+            num_of_batches = min_runs // num_in_one_batch
+        if max_runs and (total_runs_based_on_time) > max_runs:
+            num_of_batches = max_runs // num_in_one_batch
+    elif runs > num_in_one_batch:
+        num_of_batches = runs // num_in_one_batch
+    elif runs < 3:
+        # If there are less than 3 runs then we can probably do it in one batch
+        num_of_batches = 1
+        num_in_one_batch = 1
+    else:
+        # Otherwise, we try to do it in 3 batches
+        num_of_batches = 3
+        num_in_one_batch = ceil(runs / 3)
+        # If it's not divisible by 3 then we try 2
+        if (num_of_batches * num_in_one_batch) != runs:
+            num_of_batches = 2
+            num_in_one_batch = ceil(runs / 2)
+    # Always run at least one batch, even if the total time is less than the time of a batch
+    return max(num_of_batches, 1), num_in_one_batch
+
+
+def compute_statistics(timings):
+    """
+    Calculate the statistics for the time each run in every batch took.
+
+    If there aren't enough data then mean, median and stddev are set to -1
+
+    Parameters
+    ----------
+    timings : List[float]
+        The time a single run took for each batch
+
+    Returns
+    -------
+    dict
+        A dictionary with the keys mean, median, stddev, min and max
+    """
+    if len(timings) < 2:
+        # In an ideal world I would like to use "?" but
+        # it would probably mess something else up now.
+        mean = median = standard_deviation = -1
+    else:
+        mean = statistics.mean(timings)
+        median = statistics.median(timings)
+        standard_deviation = statistics.stdev(timings)
+    return {
+        "mean": mean,
+        "median": median,
+        "stddev": standard_deviation,
+        "min": min(timings),
+        "max": max(timings),
+    }
+
+
+def mean_or_min(result) -> float:
+    """Get the mean of a result, or its fastest run if there wasn't enough data to calculate the mean."""
+    return result["mean"] if result["mean"] != -1 else result["min"]
+
+
+def _beta_fraction(x, a, b):
+    """Evaluate the continued fraction of the regularized incomplete beta function with Lentz's method."""
+    tiny = 1e-300
+    c = 1.0
+    d = 1 - (a + b) * x / (a + 1)
+    d = 1 / (d if abs(d) > tiny else tiny)
+    fraction = d
+    for m in range(1, 300):
+        # Every step adds an even and an odd term of the fraction
+        for numerator in (
+            m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+            -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)),
+        ):
+            d = 1 + numerator * d
+            d = 1 / (d if abs(d) > tiny else tiny)
+            c = 1 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            fraction *= c * d
+        if abs(c * d - 1) < 1e-15:
+            break
+    return fraction
+
+
+def regularized_incomplete_beta(x, a, b):
+    """Calculate the regularized incomplete beta function I_x(a, b), for 0 <= x <= 1 and a, b > 0."""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    front = exp(lgamma(a + b) - lgamma(a) - lgamma(b) + a * log(x) + b * log(1 - x))
+    # The continued fraction converges quickly on this side, use the symmetry I_x(a, b) = 1 - I_1-x(b, a) otherwise
+    if x < (a + 1) / (a + b + 2):
+        return front * _beta_fraction(x, a, b) / a
+    return 1 - front * _beta_fraction(1 - x, b, a) / b
+
+
+def t_cdf(t, degrees_of_freedom):
+    """Calculate the cumulative distribution function of Student's t-distribution."""
+    if degrees_of_freedom == INFINITY:
+        return statistics.NormalDist().cdf(t)
+    tail = regularized_incomplete_beta(
+        degrees_of_freedom / (degrees_of_freedom + t * t), degrees_of_freedom / 2, 0.5
+    ) / 2
+    return 1 - tail if t > 0 else tail
+
+
+def t_quantile(probability, degrees_of_freedom):
+    """
+    Calculate the quantile function of Student's t-distribution.
+
+    This inverts :func:`t_cdf` by bisection, which is accurate to about 1e-12 for any
+    degrees of freedom (including the fractional ones of Welch's t-test) without
+    depending on scipy.
+    """
+    if degrees_of_freedom == INFINITY:
+        return statistics.NormalDist().inv_cdf(probability)
+    if probability < 0.5:
+        return -t_quantile(1 - probability, degrees_of_freedom)
+    low, high = 0.0, 1.0
+    while t_cdf(high, degrees_of_freedom) < probability:
+        low, high = high, high * 2
+    while high - low > 1e-12 * high:
+        middle = (low + high) / 2
+        if t_cdf(middle, degrees_of_freedom) < probability:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def compare_samples(baseline, current, confidence=0.95):
+    """
+    Calculate the relative change of the mean between two sets of samples.
+
+    The confidence interval is calculated with Welch's t-test, which does not
+    assume the variance of both sets of samples to be equal.
+
+    Parameters
+    ----------
+    baseline : List[float]
+        The samples (time of a single run in each batch) of the baseline
+    current : List[float]
+        The samples of the current results
+    confidence : float, optional
+        The confidence level of the interval, by default 0.95
+
+    Returns
+    -------
+    Tuple[float, float, float]
+        The relative change and the lower and upper bound of its confidence interval,
+        e.g. 0.1 means the current results are 10% slower than the baseline.
+        If there are less than 2 samples in any of them, the bounds are equal to the change.
+    """
+    baseline_mean = statistics.mean(baseline)
+    current_mean = statistics.mean(current)
+    change = current_mean / baseline_mean - 1
+    if len(baseline) < 2 or len(current) < 2:
+        return change, change, change
+    baseline_error = statistics.variance(baseline) / len(baseline)
+    current_error = statistics.variance(current) / len(current)
+    standard_error = (baseline_error + current_error) ** 0.5
+    if standard_error == 0:
+        return change, change, change
+    # Welch–Satterthwaite equation
+    degrees_of_freedom = (baseline_error + current_error) ** 2 / (
+        baseline_error ** 2 / (len(baseline) - 1) + current_error ** 2 / (len(current) - 1)
+    )
+    margin = t_quantile(1 - (1 - confidence) / 2, degrees_of_freedom) * standard_error
+    difference = current_mean - baseline_mean
+    return change, (difference - margin) / baseline_mean, (difference + margin) / baseline_mean
+
+
 class Time(click.ParamType):
     """Time parameter."""
 
@@ -359,10 +675,114 @@ def make_bar_plot(labels, amounts, ascii_only = False) -> Panel:
         table.add_row(
             label,
             Text(f"[{str(amount_formatted)}]:", style='cyan on default'),
-            Text(char * round((amount / largest_amount) * 50), style=COLORS[i % 7])
+            # Snippets faster than the timer resolution can take 0 seconds
+            Text(char * (round((amount / largest_amount) * 50) if largest_amount > 0 else 0), style=COLORS[i % 7])
         )
     return Panel(table, title="Bar Chart", subtitle="(lower is better)", expand=False, box=box.HEAVY, border_style="dim")
 
+
+def histogram_counts(timings, bins: int, low: float = None, high: float = None):
+    """
+    Count how many timings fall in each of ``bins`` equal width bins between low and high.
+
+    Parameters
+    ----------
+    timings : List[float]
+        The raw samples
+    bins : int
+        The amount of bins
+    low : float, optional
+        The start of the first bin, by default the smallest timing
+    high : float, optional
+        The end of the last bin, by default the largest timing
+    """
+    low = min(timings) if low is None else low
+    high = max(timings) if high is None else high
+    counts = [0] * bins
+    width = (high - low) / bins
+    for timing in timings:
+        index = int((timing - low) / width) if width else 0
+        counts[max(0, min(index, bins - 1))] += 1
+    return counts
+
+
+def make_sparkline(timings, bins: int = 40, low: float = None, high: float = None, ascii_only: bool = False,
+                   style: str = "green") -> Text:
+    """
+    Generate a histogram of the timings as a single line of text to display in the terminal.
+
+    Each character is a bin, its height shows how many timings are in that bin and
+    empty bins are left blank, so gaps between the clusters of a bimodal distribution
+    are visible.
+
+    Parameters
+    ----------
+    timings : List[float]
+        The raw samples
+    bins : int
+        The amount of bins (characters), by default 40
+    low : float, optional
+        The start of the first bin, by default the smallest timing
+    high : float, optional
+        The end of the last bin, by default the largest timing
+    ascii_only : bool
+        Whether to only use ascii characters, by default False
+    style : str
+        The style of the bars, by default "green"
+    """
+    chars = ASCII_HISTOGRAM_CHARS if ascii_only else HISTOGRAM_CHARS
+    counts = histogram_counts(timings, bins, low=low, high=high)
+    largest_count = max(counts)
+    return Text(
+        "".join(chars[ceil(count / largest_count * len(chars)) - 1] if count else " " for count in counts),
+        style=f"{style} on default",
+    )
+
+
+def make_histogram_plot(labels, timings, ascii_only=False) -> Panel:
+    """
+    Generate a histogram of the timings of multiple snippets on the same scale to display in the terminal.
+
+    Parameters
+    ----------
+    labels : List[Text]
+        The labels
+    timings : List[List[float]]
+        The raw samples of each snippet
+    ascii_only : bool
+        Whether to only use ascii characters, by default False
+    """
+    COLORS = [
+        "red",
+        "green",
+        "yellow",
+        "blue",
+        "magenta",
+        "cyan",
+        "white"
+    ]
+    low = min(min(i) for i in timings)
+    high = max(max(i) for i in timings)
+
+    table = Table(
+        "Name", "Histogram",
+        show_header=False,
+        show_edge=False,
+        box=box.SIMPLE_HEAD,
+        padding=(0, 0)
+    )
+    for i, (label, samples) in enumerate(zip(labels, timings)):
+        label.style = "default on default"
+        label.rstrip()
+        label.append(": ")
+        table.add_row(label, make_sparkline(samples, bins=50, low=low, high=high, ascii_only=ascii_only,
+                                            style=COLORS[i % 7]))
+    return Panel(
+        table, title="Distribution", subtitle=f"({choose_unit(low)} … {choose_unit(high)})",
+        expand=False, box=box.HEAVY, border_style="dim"
+    )
+
+
 class _Timer(timeit.Timer):
     def __init__(self, *args, **kwargs):
         self.stmt = kwargs.get('stmt')
@@ -409,8 +829,8 @@ def _extract_globals_and_assignments(self, code):
     
     def timeit(self, number=timeit.default_number):
         """Enhanced timeit that handles global variables properly."""
-        # Check if we have a global/assignment conflict
-        if self.stmt:
+        # Check if we have a global/assignment conflict, callables can't have any
+        if isinstance(self.stmt, str):
             globals_vars, assignments = self._extract_globals_and_assignments(self.stmt)
             conflicting_vars = globals_vars & assignments.keys()
             
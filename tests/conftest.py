@@ -0,0 +1,23 @@
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def run_fastero(tmp_path):
+    """Run fastero in a new interpreter, since the results are collected in module level state."""
+    def run(*args):
+        return subprocess.run(
+            [sys.executable, "-m", "fastero", *args], cwd=tmp_path, capture_output=True, text=True, timeout=120
+        )
+    return run
+
+
+@pytest.fixture
+def make_result():
+    """Make a result as exported by fastero from its raw samples."""
+    def make(name, code, timings):
+        return {"snippet_name": name, "snippet_code": code, "runs": len(timings), "mean": sum(timings) / len(timings),
+                "median": timings[0], "stddev": 0, "min": min(timings), "max": max(timings), "timings": timings}
+    return make
@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+from fastero.affinity import affinity_supported, choose_cpus
+
+pytestmark = pytest.mark.skipif(not affinity_supported(), reason="the CPU affinity can only be set on Linux")
+
+
+def test_choose_last_cpu():
+    available = os.sched_getaffinity(0)
+    cpus, others = choose_cpus(None)
+    assert cpus == {max(available)}
+    assert others == available - cpus
+
+
+def test_choose_given_cpus():
+    cpu = min(os.sched_getaffinity(0))
+    cpus, others = choose_cpus(str(cpu))
+    assert cpus == {cpu} and cpu not in others
+
+
+@pytest.mark.parametrize("cpu, message", [
+    ("first", "not a valid list"),
+    (",", "not a valid list"),
+    ("100000", "can't run on the CPUs 100000"),
+])
+def test_choose_invalid_cpus(cpu, message):
+    with pytest.raises(ValueError, match=message):
+        choose_cpus(cpu)
+
+
+def test_cpu_option(run_fastero):
+    process = run_fastero("--no-check-system", "--runs", "3", "--cpu", "100000", "1 + 1")
+    assert process.returncode == 2
+    assert "can't run on the CPUs 100000" in process.stdout
@@ -0,0 +1,75 @@
+import sys
+import threading
+
+import click
+import pytest
+
+from fastero.agent import (
+    DEFAULT_PORT, AgentServer, job_arguments, machine_labels, parse_address, run_on_agents,
+)
+
+
+@pytest.mark.parametrize("address, parsed", [
+    ("localhost", ("localhost", DEFAULT_PORT)),
+    ("localhost:9000", ("localhost", 9000)),
+    ("10.0.0.2:9000", ("10.0.0.2", 9000)),
+    ("::1", ("::1", DEFAULT_PORT)),
+    ("fe80::1:2", ("fe80::1:2", DEFAULT_PORT)),
+    ("[::1]", ("::1", DEFAULT_PORT)),
+    ("[::1]:9000", ("::1", 9000)),
+])
+def test_parse_address(address, parsed):
+    assert parse_address(address) == parsed
+
+
+@pytest.mark.parametrize("address", ["localhost:port", "[::1]9000", "[::1]:port"])
+def test_parse_invalid_address(address):
+    with pytest.raises(click.BadParameter):
+        parse_address(address)
+
+
+def test_job_arguments():
+    job = {
+        "benchmark": {"snippet_name": "sum", "snippet_code": "-1", "setup": "pass",
+                      "options": {"runs": 10, "total_time": 3.0, "warmup": None, "color": "red"}},
+        "shell": True, "shell_program": None, "prepare": "make", "cpu": "3", "latency": True,
+    }
+    assert job_arguments(job) == [
+        sys.executable, "-m", "fastero", "--json", "--no-check-system", "--snippet-name", "sum", "--setup", "pass",
+        "--runs", "10", "--total-time", "3.0s", "--shell", "--shell-program", "default", "--prepare", "make",
+        "--cpu", "3", "--latency", "--", "-1",
+    ]
+
+
+def test_machine_labels():
+    machines = {"a:1": {"name": "box"}, "b:1": {"name": "box"}, "c:1": {"name": "other"}}
+    assert machine_labels(machines) == {"a:1": "box (a:1)", "b:1": "box (b:1)", "c:1": "other"}
+
+
+@pytest.fixture
+def agent_address():
+    server = AgentServer(("127.0.0.1", 0), "test-agent", token="secret", log=lambda message: None)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_run_on_agents(agent_address):
+    benchmarks = [{"snippet_name": "add", "snippet_code": "1 + 1", "setup": "pass", "options": {"runs": 10}}]
+    finished = []
+    machines = run_on_agents(
+        benchmarks, [agent_address], {}, token="secret", callback=lambda address, result: finished.append(address)
+    )
+    machine = machines[agent_address]
+    assert machine["error"] is None
+    assert machine["name"] == "test-agent" and machine["environment"]["cpu_count"]
+    result, = machine["results"]
+    assert result["snippet_name"] == "add" and result["runs"] == 10
+    assert finished == [agent_address]
+
+
+def test_run_on_agents_invalid_token(agent_address):
+    machines = run_on_agents([], [agent_address], {}, token="wrong")
+    assert "Invalid token" in machines[agent_address]["error"]
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+from rich.console import Console
+
+from fastero.cache import ColdTimer, default_buffer_size, make_cache_table
+
+
+def make_result(name, mean, minimum):
+    return {"snippet_name": name, "mean": mean, "min": minimum}
+
+
+def test_time_runs():
+    timer = ColdTimer("x.append(1)", "x = []", buffer_size=1024)
+    times = timer.time_runs(5)
+    assert len(times) == 5
+    assert all(isinstance(i, int) and i >= 0 for i in times)
+
+
+def test_callable_snippet():
+    called = []
+    ColdTimer(lambda: called.append(1), buffer_size=1024).time_runs(3)
+    assert len(called) == 3
+
+
+def test_default_buffer_size():
+    assert default_buffer_size() > 0
+
+
+@pytest.mark.parametrize("hot, cold, ratio", [
+    (make_result("a", 1e-6, 1e-6), make_result("a", 3e-6, 2e-6), "3.00x"),
+    # Without a mean the fastest run is used
+    (make_result("a", -1, 1e-6), make_result("a", -1, 2e-6), "2.00x"),
+    (make_result("a", 0, 0), make_result("a", 1e-6, 1e-6), "-"),
+])
+def test_cache_table(hot, cold, ratio):
+    console = Console(width=200, record=True)
+    console.print(make_cache_table([(hot, cold)]))
+    row = console.export_text().splitlines()[-2]
+    assert row.split()[-1] == ratio
+
+
+def test_cache_option(run_fastero):
+    process = run_fastero("--no-check-system", "--json", "--runs", "5", "--cache", "cold", "[1] * 100")
+    assert process.returncode == 0, process.stderr
+    hot, cold = json.loads(process.stdout)["results"]
+    assert hot["snippet_name"] == "Benchmark 1"
+    assert cold["snippet_name"] == "Benchmark 1 (cold cache)"
+    # Every run is timed on its own with cold caches
+    assert cold["runs"] == len(cold["timings"]) == 5
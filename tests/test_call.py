@@ -0,0 +1,47 @@
+import functools
+import json
+import os.path
+
+import click
+import pytest
+
+from fastero.call import bind_call, make_arguments, resolve_import_path
+
+
+def test_resolve_import_path():
+    assert resolve_import_path("os.path:join") is os.path.join
+    assert resolve_import_path("json:JSONDecoder.decode") is json.JSONDecoder.decode
+
+
+@pytest.mark.parametrize("import_path", ["os.path", "os.path:missing", "missing_module_for_fastero:f"])
+def test_resolve_invalid_import_path(import_path):
+    with pytest.raises(click.BadParameter):
+        resolve_import_path(import_path)
+
+
+@pytest.mark.parametrize("arguments, expected", [
+    ((1, 2), ((1, 2), {})),
+    (((1,), {"key": "value"}), ((1,), {"key": "value"})),
+    ([1, 2], (([1, 2],), {})),
+])
+def test_make_arguments(arguments, expected):
+    assert make_arguments(lambda: arguments) == expected
+    assert make_arguments() == ((), {})
+
+
+def test_bind_call():
+    assert bind_call(len) is len
+    bound = bind_call(sorted, ([3, 1, 2],), {"reverse": True})
+    assert isinstance(bound, functools.partial)
+    assert bound() == [3, 2, 1]
+    assert bind_call(max, (1, 5, 3))() == 5
+
+
+def test_call_command(run_fastero, tmp_path):
+    (tmp_path / "codec.py").write_text("def encode(data):\n    return data.encode()\n\ndef data():\n    return 'abc'\n")
+    process = run_fastero(
+        "call", "codec:encode", "--args-from", "codec:data", "--runs", "10", "--export-json", "out.json"
+    )
+    assert process.returncode == 0, process.stderr
+    result, = json.loads((tmp_path / "out.json").read_text())["results"]
+    assert result["snippet_name"] == "codec:encode" and result["runs"] == 10
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from fastero.checkpoint import Checkpoint
+
+
+@pytest.fixture
+def benchmark():
+    return {"snippet_code": "sum(l)", "snippet_name": "sum", "setup": "l = [1, 2]", "files": [],
+            "options": {"runs": None, "total_time": 3.0}}
+
+
+def test_key_includes_name(benchmark):
+    assert Checkpoint.key(benchmark) != Checkpoint.key({**benchmark, "snippet_name": "renamed"})
+    assert Checkpoint.key(benchmark) == Checkpoint.key(dict(benchmark))
+
+
+def test_resume(tmp_path, benchmark):
+    path = tmp_path / "checkpoint.jsonl"
+    checkpoint = Checkpoint(path)
+    key = checkpoint.key(benchmark)
+    checkpoint.add(key, {"snippet_name": "sum", "runs": 10})
+    checkpoint.close()
+    # The line of a snippet that was running when fastero was killed
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "abc", "res')
+
+    resumed = Checkpoint(path, resume=True)
+    resumed.close()
+    assert resumed.results == {key: {"snippet_name": "sum", "runs": 10}}
+    assert resumed.get("abc") is None
+
+
+def test_new_checkpoint_overwrites(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    path.write_text(json.dumps({"key": "abc", "result": {}}) + "\n")
+    checkpoint = Checkpoint(path)
+    checkpoint.close()
+    assert checkpoint.results == {}
+    assert path.read_text() == ""
+
+
+def test_resume_option(run_fastero):
+    arguments = ("--no-check-system", "--runs", "3", "-n", "first", "-n", "second", "1 + 1", "1 + 1")
+    assert run_fastero("--checkpoint", "run.jsonl", *arguments).returncode == 0
+    process = run_fastero("--resume", "run.jsonl", *arguments)
+    assert process.returncode == 0
+    assert "2 of 2 snippets already finished" in process.stderr
+    assert process.stderr.count("reused the result from the checkpoint") == 2
@@ -0,0 +1,65 @@
+import json
+import math
+
+import pytest
+
+from fastero.compare import compare_results, is_default_name, match_results
+from fastero.utils import compare_samples, t_cdf, t_quantile
+
+
+@pytest.mark.parametrize("probability", [0.9, 0.975, 0.995])
+def test_t_quantile_exact(probability):
+    # The quantile function has a closed form for 1 and 2 degrees of freedom
+    assert t_quantile(probability, 1) == pytest.approx(math.tan(math.pi * (probability - 0.5)), rel=1e-9)
+    assert t_quantile(probability, 2) == pytest.approx(
+        (2 * probability - 1) / math.sqrt(2 * probability * (1 - probability)), rel=1e-9
+    )
+
+
+@pytest.mark.parametrize("degrees_of_freedom, expected", [(3, 3.182446305), (4, 2.776445105), (30, 2.042272456)])
+def test_t_quantile_table(degrees_of_freedom, expected):
+    assert t_quantile(0.975, degrees_of_freedom) == pytest.approx(expected, rel=1e-8)
+    assert t_quantile(0.025, degrees_of_freedom) == pytest.approx(-expected, rel=1e-8)
+    assert t_cdf(expected, degrees_of_freedom) == pytest.approx(0.975, rel=1e-9)
+
+
+def test_t_quantile_infinite_degrees_of_freedom():
+    assert t_quantile(0.975, float("inf")) == pytest.approx(1.959963985, rel=1e-8)
+
+
+def test_compare_samples():
+    change, low, high = compare_samples([1.0, 1.1, 0.9, 1.0], [2.0, 2.1, 1.9, 2.0])
+    assert change == pytest.approx(1)
+    assert 0 < low < change < high
+    assert compare_samples([1.0], [1.5]) == (0.5, 0.5, 0.5)
+
+
+def test_is_default_name():
+    assert is_default_name("Benchmark 1")
+    assert is_default_name("Benchmark 12")
+    assert not is_default_name("BenchmarkParser")
+    assert not is_default_name("Benchmark 1 copy")
+
+
+def test_match_results(make_result):
+    baseline = [make_result("Benchmark 1", "a", [1]), make_result("parse", "b", [1]),
+                make_result("BenchmarkParser", "c", [1])]
+    current = [make_result("Benchmark 2", "a", [1]), make_result("parse", "changed", [1]),
+               make_result("BenchmarkParser", "changed too", [1]), make_result("Benchmark 4", "new", [1])]
+    assert [base and base["snippet_code"] for base, _ in match_results(baseline, current)] == ["a", "b", "c", None]
+
+
+def test_compare_results_status(make_result):
+    baseline = [make_result("slower", "a", [1.0, 1.01, 0.99]), make_result("faster", "b", [1.0, 1.01, 0.99]),
+                make_result("same", "c", [1.0, 1.01, 0.99])]
+    current = [make_result("slower", "a", [2.0, 2.01, 1.99]), make_result("faster", "b", [0.5, 0.51, 0.49]),
+               make_result("same", "c", [1.0, 1.02, 0.98]), make_result("new", "d", [1.0])]
+    statuses = [i["status"] for i in compare_results(baseline, current)]
+    assert statuses == ["regression", "improvement", "unchanged", "new"]
+
+
+@pytest.mark.parametrize("timings, returncode", [([2.0, 2.01, 1.99], 1), ([1.0, 1.01, 0.99], 0)])
+def test_compare_exit_status(run_fastero, make_result, tmp_path, timings, returncode):
+    (tmp_path / "baseline.json").write_text(json.dumps({"results": [make_result("x", "x", [1.0, 1.01, 0.99])]}))
+    (tmp_path / "current.json").write_text(json.dumps({"results": [make_result("x", "x", timings)]}))
+    assert run_fastero("compare", "baseline.json", "current.json").returncode == returncode
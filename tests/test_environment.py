@@ -0,0 +1,71 @@
+import pytest
+
+from fastero import environment
+from fastero.environment import LoadMonitor, check_environment, check_load, parse_cpu_list
+
+QUIET = {"governors": ["performance"], "turbo": False, "load_average": [0.0, 0.0, 0.0], "cpu_count": 4,
+         "isolated_cpus": None, "aslr": 2}
+
+
+@pytest.mark.parametrize("cpu_list, cpus", [
+    ("", []),
+    ("3", [3]),
+    ("0-3", [0, 1, 2, 3]),
+    ("0-1,8,10-11", [0, 1, 8, 10, 11]),
+    (" 2 , ", [2]),
+])
+def test_parse_cpu_list(cpu_list, cpus):
+    assert parse_cpu_list(cpu_list) == cpus
+
+
+def test_collect_environment():
+    collected = environment.collect_environment()
+    assert set(QUIET) <= set(collected)
+    assert collected["python"] and collected["cpu_count"]
+
+
+def test_check_environment_quiet():
+    assert check_environment(QUIET) == []
+
+
+def test_check_environment_ignores_aslr():
+    assert check_environment({**QUIET, "aslr": 0}) == []
+
+
+@pytest.mark.parametrize("changes, text", [
+    ({"governors": ["powersave"]}, "powersave"),
+    ({"turbo": True}, "Turbo boost"),
+    ({"load_average": [3.0, 1.0, 1.0]}, "busy"),
+])
+def test_check_environment_warnings(changes, text):
+    warnings = check_environment({**QUIET, **changes})
+    assert len(warnings) == 1 and text in warnings[0]
+
+
+def test_load_monitor(monkeypatch):
+    times = iter([(100, 80), (200, 130), (300, 230), (300, 230)])
+    monkeypatch.setattr(environment, "_cpu_times", lambda: next(times))
+    monitor = LoadMonitor().start()
+    monitor.sample()
+    monitor.sample()
+    # No time passed, so there is nothing to sample
+    monitor.sample()
+    assert monitor.samples == [0.5, 0.0]
+    assert monitor.stop() == {"mean": 0.25, "max": 0.5, "samples": 2}
+
+
+def test_load_monitor_without_proc(monkeypatch):
+    monkeypatch.setattr(environment, "_cpu_times", lambda: None)
+    monitor = LoadMonitor().start()
+    monitor.sample()
+    assert monitor.stop() is None
+
+
+@pytest.mark.parametrize("load, cpu_count, warned", [
+    (None, 4, False),
+    ({"mean": 0.25, "max": 0.25, "samples": 1}, 4, False),
+    ({"mean": 0.5, "max": 0.75, "samples": 2}, 4, True),
+    ({"mean": 1.0, "max": 1.0, "samples": 1}, 1, False),
+])
+def test_check_load(load, cpu_count, warned):
+    assert bool(check_load(load, cpu_count)) == warned
@@ -0,0 +1,87 @@
+import random
+
+import pytest
+from rich.console import Console
+from rich.text import Text
+
+from fastero.histogram import LatencyHistogram, merge_histograms
+from fastero.utils import make_bar_plot
+
+
+@pytest.mark.parametrize("significant_bits", [1, 4, 8])
+def test_buckets(significant_bits):
+    histogram = LatencyHistogram(significant_bits)
+    for value in [0, 1, 255, 256, 257, 1000, 10 ** 6, 2 ** 40 + 12345, 2 ** 64 - 1]:
+        index = histogram.bucket_index(value)
+        assert index < len(histogram.counts)
+        lowest, highest = histogram.bucket_range(index)
+        assert lowest <= value <= highest
+        assert highest - lowest <= max(value * histogram.relative_error, 1)
+
+
+def test_small_values_are_exact():
+    histogram = LatencyHistogram(8)
+    assert [histogram.bucket_range(histogram.bucket_index(value)) for value in (0, 100, 255)] == [
+        (0, 0), (100, 100), (255, 255),
+    ]
+
+
+def test_invalid_significant_bits():
+    with pytest.raises(ValueError):
+        LatencyHistogram(0)
+
+
+def test_percentile_error():
+    rng = random.Random(1)
+    values = sorted(rng.randrange(1, 10 ** 9) for _ in range(10000))
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    for percentile in (50, 90, 99, 99.9):
+        exact = values[int(percentile / 100 * len(values)) - 1]
+        assert exact <= histogram.percentile(percentile) <= exact * (1 + histogram.relative_error)
+    assert histogram.percentile(100) == values[-1]
+    assert histogram.total == sum(values) and histogram.count == len(values)
+
+
+def test_empty_percentile():
+    assert LatencyHistogram().percentile(99) == 0
+
+
+def test_merge():
+    first, second = LatencyHistogram(), LatencyHistogram()
+    first.record(10, count=3)
+    second.record(10_000)
+    first.merge(second)
+    assert (first.count, first.total, first.max) == (4, 10_030, 10_000)
+    assert first.percentile(75) == 10
+    with pytest.raises(ValueError):
+        first.merge(LatencyHistogram(4))
+
+
+def test_dict_round_trip():
+    histogram = LatencyHistogram()
+    histogram.record(5, count=2)
+    histogram.record(12345)
+    data = histogram.to_dict()
+    assert data["buckets"] == [[histogram.bucket_index(5), 2], [histogram.bucket_index(12345), 1]]
+    loaded = LatencyHistogram.from_dict(data)
+    assert loaded.to_dict() == data
+    assert list(loaded.counts) == list(histogram.counts)
+
+
+def test_merge_histograms():
+    histograms = []
+    for value in (1, 2, 3):
+        histogram = LatencyHistogram()
+        histogram.record(value)
+        histograms.append(histogram.to_dict())
+    merged = merge_histograms(histograms)
+    assert (merged.count, merged.total, merged.max) == (3, 6, 3)
+
+
+def test_bar_plot_with_zero_times():
+    console = Console(width=100, record=True)
+    # Snippets faster than the timer resolution take 0 seconds
+    console.print(make_bar_plot([Text("a"), Text("b")], [0, 0]))
+    assert "▆" not in console.export_text()
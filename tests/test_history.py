@@ -0,0 +1,42 @@
+import pytest
+
+from fastero.history import HistoryStore, detect_steps, get_machine
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(tmp_path / "history.db")
+    yield store
+    store.close()
+
+
+def test_record_and_read_back(store, make_result):
+    store.record_run([make_result("sum", "sum(l)", [1.0, 1.1])], setup="l = [1]")
+    store.record_run([make_result("sum", "sum(l)", [2.0, 2.1]), make_result("Benchmark 2", "len(l)", [3.0])])
+    history = store.snippet_history("sum")
+    assert [i["timings"] for i in history] == [[1.0, 1.1], [2.0, 2.1]]
+    assert history[0]["machine"] == get_machine()[0]
+    # Snippets without a name are found by their code
+    assert [i["snippet_name"] for i in store.snippet_history("len(l)")] == ["Benchmark 2"]
+    assert len(store.snippet_history("sum", limit=1)) == 1
+    assert store.snippet_history("sum", machine="another machine") == []
+
+
+def test_detect_steps(make_result):
+    history = [make_result("x", "x", timings) for timings in (
+        [1.0, 1.01, 0.99], [1.0, 1.02, 0.98], [2.0, 2.01, 1.99], [2.0, 2.01, 1.99], [1.0, 1.01, 0.99]
+    )]
+    steps = detect_steps(history)
+    assert steps[:2] == [None, None] and steps[3] is None
+    assert steps[2][0] == pytest.approx(1, rel=0.01)
+    assert steps[4][0] == pytest.approx(-0.5, rel=0.01)
+
+
+def test_history_command_single_batch(run_fastero, make_result, tmp_path):
+    store = HistoryStore(tmp_path / "history.db")
+    # A result with only one batch has no mean and standard deviation
+    store.record_run([{**make_result("sum", "sum(l)", [1e-6]), "mean": -1, "stddev": -1}])
+    store.close()
+    process = run_fastero("history", "sum", "--history-file", "history.db")
+    assert process.returncode == 0, process.stderr
+    assert "? ± ?" in process.stdout
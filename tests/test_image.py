@@ -0,0 +1,25 @@
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+
+@pytest.mark.parametrize("background, corner", [("#102030", (16, 32, 48)), ("red", (255, 0, 0))])
+def test_export_image(run_fastero, tmp_path, background, corner):
+    process = run_fastero(
+        "--no-check-system", "--runs", "10", "--export-image", "out.png", "--background", background, "1 + 1"
+    )
+    assert process.returncode == 0, process.stderr
+    assert "exported as Image" in process.stderr
+    with Image.open(tmp_path / "out.png") as image:
+        assert image.format == "PNG"
+        assert image.getpixel((0, 0)) == corner
+        # The terminal window is drawn in the middle
+        assert image.getpixel((image.width // 2, image.height // 2)) != corner
+
+
+def test_export_image_random_background(run_fastero, tmp_path):
+    process = run_fastero("--no-check-system", "--runs", "10", "--export-image", "out.png", "1 + 1")
+    assert process.returncode == 0, process.stderr
+    with Image.open(tmp_path / "out.png") as image:
+        # The gradient goes from one side to the other
+        assert image.getpixel((0, 0)) != image.getpixel((image.width - 1, 0))
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from fastero.importtime import (START_MARKER, ForkWorker, ImportFailed, parse_importtime, summarize_modules,
+                                time_import)
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time:       100 |        100 | site\n"
+        f"{START_MARKER}\n"
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       200 |        200 |   json.decoder\n"
+        "import time:       300 |        500 | json\n"
+        "a warning\n"
+    )
+    modules, other = parse_importtime(stderr)
+    # The imports before the marker (of the interpreter itself) aren't included
+    assert modules == [("json.decoder", 0.0002, 0.0002, 1), ("json", 0.0003, 0.0005, 0)]
+    assert other == "import time: self [us] | cumulative | imported package\na warning"
+
+
+def test_summarize_modules():
+    runs = [[("json", 0.1, 0.3, 0), ("json.decoder", 0.2, 0.2, 1)], [("json", 0.3, 0.5, 0)]]
+    assert summarize_modules(runs) == [
+        {"module": "json", "self_time": pytest.approx(0.2), "cumulative_time": pytest.approx(0.4), "level": 0},
+        {"module": "json.decoder", "self_time": pytest.approx(0.1), "cumulative_time": pytest.approx(0.1), "level": 1},
+    ]
+
+
+def test_time_import():
+    time_taken, modules = time_import("json")
+    assert time_taken > 0
+    assert "json" in [name for name, *_ in modules]
+    with pytest.raises(ImportFailed):
+        time_import("missing_module_for_fastero")
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not available")
+def test_time_import_forked():
+    worker = ForkWorker("json")
+    try:
+        assert "json" in [name for name, *_ in time_import("json", worker)[1]]
+        # Every import happens in a new child, so the module is imported again
+        assert "json" in [name for name, *_ in time_import("json", worker)[1]]
+    finally:
+        worker.close()
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from fastero.incremental import IncrementalCache
+
+
+@pytest.fixture
+def benchmark(tmp_path):
+    helper = tmp_path / "helper.py"
+    helper.write_text("x = 1\n")
+    return {"snippet_code": "sum(l)", "snippet_name": "sum", "setup": "l = [1, 2]", "files": [helper],
+            "options": {"runs": None, "total_time": 3.0}}
+
+
+@pytest.mark.parametrize("change", [
+    {"snippet_code": "sum(l) + 1"},
+    {"setup": "l = [1, 2, 3]"},
+    {"options": {"runs": 10, "total_time": 3.0}},
+])
+def test_key_changes(benchmark, change):
+    assert IncrementalCache.key(benchmark) != IncrementalCache.key({**benchmark, **change})
+
+
+@pytest.mark.parametrize("mode", [
+    {"shell": "bash"},
+    {"shell": "bash", "prepare": "make clean"},
+    {"latency": True},
+    {"cache": "cold"},
+    {"cpu": "3"},
+])
+def test_key_follows_mode(benchmark, mode):
+    key = IncrementalCache.key({**benchmark, "mode": {"shell": None, "prepare": None}})
+    assert IncrementalCache.key({**benchmark, "mode": {"shell": None, "prepare": None, **mode}}) != key
+
+
+def test_key_ignores_name(benchmark):
+    assert IncrementalCache.key(benchmark) == IncrementalCache.key({**benchmark, "snippet_name": "renamed"})
+
+
+def test_key_follows_file_contents(benchmark):
+    key = IncrementalCache.key(benchmark)
+    benchmark["files"][0].write_text("x = 2\n")
+    assert IncrementalCache.key(benchmark) != key
+
+
+def test_save_and_load(tmp_path):
+    cache = IncrementalCache(tmp_path / "cache.json")
+    cache.set("key", {"mean": 1.0})
+    cache.save()
+    assert IncrementalCache(tmp_path / "cache.json").get("key") == {"mean": 1.0}
+    assert IncrementalCache(tmp_path / "cache.json").get("other key") is None
+
+
+def test_corrupted_file(tmp_path):
+    (tmp_path / "cache.json").write_text("{not json")
+    assert IncrementalCache(tmp_path / "cache.json").results == {}
+
+
+def test_incremental_option(run_fastero):
+    arguments = ("--no-check-system", "--runs", "10", "--incremental", "x = 1")
+    assert "reused" not in run_fastero(*arguments).stderr
+    assert "reused" in run_fastero(*arguments).stderr
+    assert "reused" not in run_fastero("--setup", "y = 2", *arguments).stderr
+
+
+@pytest.mark.skipif(os.name == "nt", reason="uses a POSIX shell")
+def test_incremental_shell_options(run_fastero):
+    arguments = ("--no-check-system", "--runs", "3", "--incremental", "--shell", "true")
+    assert "reused" not in run_fastero(*arguments).stderr
+    assert "reused" in run_fastero(*arguments).stderr
+    assert "reused" not in run_fastero("--prepare", "true", *arguments).stderr
+    assert "reused" not in run_fastero("--shell-program", "sh", *arguments).stderr
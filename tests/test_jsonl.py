@@ -0,0 +1,30 @@
+import json
+
+from rich.console import Console
+
+from fastero.exporter import Exporter
+
+
+def test_stream_to_file(tmp_path):
+    exporter = Exporter(alt_console=Console(quiet=True))
+    exporter.setup = "l = [1]"
+    exporter.open_jsonl_stream(tmp_path / "results.jsonl")
+    exporter.add_result("sum(l)", "sum", 10, 1.0, 1.0, 0.0, 1.0, 1.0, [1.0, 1.0])
+    # Every record is written as soon as it is made, before the stream is closed
+    lines = (tmp_path / "results.jsonl").read_text().splitlines()
+    assert [json.loads(line)["type"] for line in lines] == ["start", "result"]
+    exporter.close_jsonl_streams()
+    records = [json.loads(line) for line in (tmp_path / "results.jsonl").read_text().splitlines()]
+    assert records[0] == {"type": "start", "setup": "l = [1]"}
+    assert records[1]["snippet_name"] == "sum" and records[1]["timings"] == [1.0, 1.0]
+    assert records[2] == {"type": "end", "count": 1}
+
+
+def test_jsonl_option(run_fastero):
+    process = run_fastero("--no-check-system", "--jsonl", "--jsonl-batches", "--runs", "10", "x = 1", "x = 2")
+    assert process.returncode == 0
+    records = [json.loads(line) for line in process.stdout.splitlines()]
+    types = [record["type"] for record in records]
+    assert types[0] == "start" and types[-1] == "end"
+    assert types.count("result") == 2
+    assert "batch" in types
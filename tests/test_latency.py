@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from fastero.histogram import LatencyHistogram
+from fastero.latency import LatencyTimer, latency_fields, percentiles
+from fastero.results import LATENCY_FIELDS
+
+
+@pytest.fixture
+def histogram():
+    histogram = LatencyHistogram()
+    for value in range(1, 101):
+        histogram.record(value)
+    return histogram
+
+
+def test_percentiles(histogram):
+    assert percentiles(histogram) == {"p50": 50e-9, "p90": 90e-9, "p99": 99e-9, "p999": 100e-9, "max_latency": 100e-9}
+
+
+def test_percentiles_subtract_overhead(histogram):
+    assert percentiles(histogram, overhead=60) == {
+        "p50": 0.0, "p90": 30e-9, "p99": 39e-9, "p999": 40e-9, "max_latency": 40e-9,
+    }
+
+
+def test_latency_fields(histogram):
+    fields = latency_fields(histogram, 10)
+    assert set(fields) == {*LATENCY_FIELDS, "latency_histogram"}
+    assert fields["latency_histogram"]["timer_overhead"] == 10
+    assert LatencyHistogram.from_dict(fields["latency_histogram"]).count == 100
+
+
+def test_latency_timer():
+    histogram = LatencyHistogram()
+    timer = LatencyTimer("x.append(1)", "x = []")
+    total = timer.timeit(1000, histogram)
+    assert histogram.count == 1000
+    assert sum(count for _, count in histogram.nonzero()) == 1000
+    assert total == pytest.approx(histogram.total / 1e9)
+    assert timer.last_batch_time >= total
+
+
+def test_latency_timer_overhead():
+    histogram = LatencyHistogram()
+    timer = LatencyTimer("sum(range(10))")
+    assert timer.timeit(100, histogram, overhead=1) == pytest.approx(histogram.total / 1e9 - 100e-9)
+    # Iterations faster than the overhead count as 0, the same as in the percentiles
+    assert timer.timeit(100, histogram, overhead=10 ** 12) == 0
+    assert histogram.count == 200
+
+
+def test_latency_mean_without_overhead(run_fastero):
+    process = run_fastero("--no-check-system", "--json", "--latency", "--runs", "1000", "sum(range(100))")
+    assert process.returncode == 0, process.stderr
+    result, = json.loads(process.stdout)["results"]
+    histogram = result["latency_histogram"]
+    # The iterations are far slower than reading the clock, so none of them is cut off at 0
+    expected = (histogram["total"] / histogram["count"] - histogram["timer_overhead"]) / 1e9
+    assert result["mean"] == pytest.approx(expected, rel=1e-9)
+
+
+def test_latency_option(run_fastero):
+    process = run_fastero("--no-check-system", "--json", "--latency", "--total-time", "50ms", "1 + 1")
+    assert process.returncode == 0, process.stderr
+    result, = json.loads(process.stdout)["results"]
+    # Short runs are still split into enough batches to calculate the mean
+    assert len(result["timings"]) >= 2 and result["mean"] != -1
+    assert result["p50"] <= result["p99"] <= result["max_latency"]
+    assert result["latency_histogram"]["count"] == result["runs"]
+
+
+def test_single_batch_summary(run_fastero):
+    process = run_fastero("--no-check-system", "--runs", "1", "1 + 1", "2 + 2")
+    assert process.returncode == 0, process.stderr
+    assert process.stderr.count("only one batch") == 2
+    assert "faster than" in process.stdout
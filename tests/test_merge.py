@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from fastero.merge import group_results, merge_results
+
+
+def make_result(name, code, timings):
+    mean = sum(timings) / len(timings)
+    stddev = (sum((i - mean) ** 2 for i in timings) / (len(timings) - 1)) ** 0.5 if len(timings) > 1 else -1
+    return {"snippet_name": name, "snippet_code": code, "runs": 10 * len(timings), "mean": mean if stddev != -1 else -1,
+            "median": mean, "stddev": stddev, "min": min(timings), "max": max(timings), "timings": timings}
+
+
+def test_group_results():
+    first = [make_result("Benchmark 1", "a()", [1.0]), make_result("parse", "b()", [1.0])]
+    # The default names follow the code, the other names are matched even if the code changed
+    second = [make_result("parse", "c()", [2.0]), make_result("Benchmark 2", "a()", [2.0])]
+    groups = group_results([first, second])
+    assert [[i["snippet_code"] for i in group] for group in groups] == [["a()", "a()"], ["b()", "c()"]]
+
+
+def test_group_results_with_default_like_names():
+    runs = [[make_result("BenchmarkParser", "a()", [1.0])], [make_result("BenchmarkParser", "b()", [1.0])]]
+    assert len(group_results(runs)) == 1
+
+
+def test_merge_pools_samples():
+    merged = merge_results([make_result("add", "1 + 1", [1.0, 3.0]), make_result("add", "1 + 1", [5.0, 7.0])])
+    assert list(merged["timings"]) == [1.0, 3.0, 5.0, 7.0]
+    assert merged["runs"] == 40
+    assert merged["mean"] == pytest.approx(4.0)
+    variance = merged["variance"]
+    assert variance["runs"] == 2
+    assert variance["within_run_stddev"] == pytest.approx(2 ** 0.5)
+    assert variance["between_run_stddev"] == pytest.approx(8 ** 0.5)
+
+
+def test_merge_without_samples():
+    results = [make_result("add", "1 + 1", [1.0]), {**make_result("add", "1 + 1", [3.0]), "timings": None}]
+    merged = merge_results(results)
+    assert list(merged["timings"]) == [1.0, 3.0]
+    assert merged["variance"]["within_run_stddev"] is None
+
+
+def test_merge_command(run_fastero, tmp_path):
+    for filename, timings in (("first.json", [1.0, 3.0]), ("second.json", [5.0, 7.0])):
+        (tmp_path / filename).write_text(json.dumps({"results": [make_result("add", "1 + 1", timings)]}))
+    process = run_fastero("merge", "first.json", "second.json", "--export-json", "merged.json")
+    assert process.returncode == 0, process.stderr
+    result, = json.loads((tmp_path / "merged.json").read_text())["results"]
+    assert result["timings"] == [1.0, 3.0, 5.0, 7.0]
+
+
+def test_merge_invalid_file(run_fastero, tmp_path):
+    (tmp_path / "invalid.json").write_text("[")
+    process = run_fastero("merge", "invalid.json")
+    assert process.returncode == 1
+    assert "not a JSON file exported by fastero" in process.stderr
@@ -0,0 +1,53 @@
+import click
+import pytest
+
+from fastero.pool import PoolTimer, parse_input
+
+
+@pytest.mark.parametrize("text, parsed", [
+    ("h=[3, 1, 2]", ("h", "[3, 1, 2]")),
+    (" it = iter(range(10)) ", ("it", "iter(range(10))")),
+    ("x=a == b", ("x", "a == b")),
+])
+def test_parse_input(text, parsed):
+    assert parse_input(text) == parsed
+
+
+@pytest.mark.parametrize("text", ["h", "h=", "=[1]", "1h=[1]", "a.b=[1]"])
+def test_parse_invalid_input(text):
+    with pytest.raises(click.BadParameter):
+        parse_input(text)
+
+
+def test_every_run_gets_its_own_input():
+    # The list only has one item, so a shared input would raise an IndexError on the second run
+    timer = PoolTimer("heapq.heappop(h)", "import heapq", input="h=[1]")
+    assert timer.timeit(1000) > 0
+    assert timer.last_batch_time >= 0
+
+
+def test_inputs_are_not_timed():
+    timer = PoolTimer("pass", input="x=sum(range(10000))")
+    timer.timeit(100)
+    assert timer.last_batch_time > timer.timeit(100) * 2
+
+
+def test_callable_snippet():
+    popped = []
+    timer = PoolTimer(lambda: popped.append(1), input="_=None")
+    timer.timeit(10)
+    assert len(popped) == 10
+
+
+def test_input_option(run_fastero):
+    process = run_fastero(
+        "--no-check-system", "--runs", "10", "--setup", "import heapq", "--input", "h=[3, 1, 2]", "heapq.heappop(h)"
+    )
+    assert process.returncode == 0, process.stderr
+
+
+@pytest.mark.parametrize("option", ["--profile", "--line-profile"])
+def test_input_with_profiling(run_fastero, option):
+    process = run_fastero("--no-check-system", "--input", "h=[1]", option, "h.pop()")
+    assert process.returncode == 2
+    assert "--input can not be used alongside" in process.stdout
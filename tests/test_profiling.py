@@ -0,0 +1,33 @@
+from fastero.profiling import make_line_profile_table, make_profile_table, profile_lines, profile_snippet
+
+
+def test_profile_snippet():
+    profile = profile_snippet("f(50)", "def f(n):\n    return sorted(range(n))", number=100)
+    functions = {i["function"].split(" (")[0]: i for i in profile["functions"]}
+    # Functions defined in the setup are part of the profile, the timing loop and the clock aren't
+    assert set(functions) == {"f", "<built-in method builtins.sorted>"}
+    assert functions["f"]["calls"] == 100
+    assert functions["f"]["cumulative_time"] >= functions["<built-in method builtins.sorted>"]["cumulative_time"]
+    assert profile["total_time"] >= functions["f"]["cumulative_time"]
+    assert profile["number"] == 100
+    assert make_profile_table(profile).row_count == 2
+
+
+def test_profile_snippet_without_setup():
+    setup = "def key(x):\n    return -x\nd = sorted(range(10 ** 5), key=key)"
+    profile = profile_snippet("len(d)", setup, number=100)
+    # Only the runs are profiled, the setup runs once before them and isn't part of the cost of a run
+    assert [i["function"] for i in profile["functions"]] == ["<built-in method builtins.len>"]
+    assert profile["functions"][0]["calls"] == 100
+
+
+def test_profile_snippet_top():
+    profile = profile_snippet("sorted(range(10)); list(range(10)); len('abc')", number=10, top=2)
+    assert len(profile["functions"]) == 2
+
+
+def test_profile_lines():
+    profile = profile_lines("x = 1\n\nfor i in range(3):\n    x += i", number=10, first_line=5)
+    assert [(i["line"], i["hits"]) for i in profile["lines"]] == [(5, 10), (7, 40), (8, 30)]
+    assert profile["total_time"] > 0
+    assert make_line_profile_table(profile).row_count == 3
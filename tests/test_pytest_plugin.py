@@ -0,0 +1,57 @@
+import json
+
+pytest_plugins = ["pytester"]
+
+
+def test_fixture_and_export(pytester, tmp_path):
+    pytester.makepyfile(
+        """
+        import pytest
+
+        def test_sum(fastero):
+            result = fastero("sum(range(100))", runs=20)
+            assert result["runs"] == 20
+            assert result["min"] <= result["mean"] <= result["max"]
+
+        @pytest.mark.fastero(runs=10)
+        def test_marker(fastero):
+            fastero(lambda: None)
+            fastero(lambda: None, name="named")
+
+        def test_plain():
+            pass
+        """
+    )
+    export = tmp_path / "results.json"
+    result = pytester.runpytest(f"--fastero-export-json={export}")
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines(["*fastero benchmarks*", "test_sum *", "test_marker *", "named *"])
+    names = [i["snippet_name"] for i in json.loads(export.read_text())["results"]]
+    assert names == ["test_sum", "test_marker", "named"]
+
+
+def test_benchmark_only_and_skip(pytester):
+    pytester.makepyfile(
+        """
+        def test_benchmark(fastero):
+            fastero("pass", runs=5)
+
+        def test_plain():
+            pass
+        """
+    )
+    pytester.runpytest("--benchmark-only").assert_outcomes(passed=1, skipped=1)
+    pytester.runpytest("--benchmark-skip").assert_outcomes(passed=1, skipped=1)
+
+
+def test_summary_without_enough_batches(pytester):
+    pytester.makepyfile(
+        """
+        def test_once(fastero):
+            fastero("pass", runs=1)
+        """
+    )
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["test_once  ? ± ?  (*"])
+    result.stdout.no_fnmatch_line("*-1000000000*")
@@ -0,0 +1,73 @@
+import json
+from array import array
+
+import pytest
+from rich.console import Console
+
+from fastero.exporter import Exporter
+from fastero.results import RESULT_FIELDS, Result, ResultCollection
+
+
+def make_result(name="sum", timings=(1.0, 2.0, 3.0), **latency):
+    return Result("sum(l)", name, 30, 2.0, 2.0, 1.0, 3.0, 1.0, timings, **latency)
+
+
+def test_result_mapping():
+    result = make_result()
+    assert result["mean"] == result.mean == 2.0
+    assert list(result) == list(RESULT_FIELDS)
+    assert isinstance(result.timings, array)
+    assert result.to_dict()["timings"] == [1.0, 2.0, 3.0]
+    with pytest.raises(KeyError):
+        result["unknown"]
+
+
+def test_collection_columns():
+    results = ResultCollection([make_result("a"), make_result("b", timings=None, p50=1e-9)])
+    assert len(results) == 2
+    assert results.column("snippet_name") == ["a", "b"]
+    assert results.column("runs").typecode == "q"
+    assert list(results.rows(["snippet_name", "p50"])) == [("a", None), ("b", 1e-9)]
+    assert results[1].to_dict() == make_result("b", timings=None, p50=1e-9).to_dict()
+    assert [i.snippet_name for i in results[::-1]] == ["b", "a"]
+
+
+def test_float_runs():
+    result = Result("sum(l)", "sum", 1000.0, 2.0, 2.0, 1.0, 3.0, 1.0)
+    assert result.runs == 1000 and isinstance(result.runs, int)
+    assert list(ResultCollection([result]).column("runs")) == [1000]
+
+
+@pytest.mark.parametrize("arguments", [("--from-json", "results.json", "--only-export"), ("merge", "results.json")])
+def test_load_float_runs(run_fastero, tmp_path, arguments):
+    result = make_result().to_dict()
+    (tmp_path / "results.json").write_text(json.dumps({"results": [{**result, "runs": 1000.0}]}))
+    process = run_fastero(*arguments, "--export-json", "out.json")
+    assert process.returncode == 0, process.stderr
+    assert json.loads((tmp_path / "out.json").read_text())["results"][0]["runs"] == 1000
+
+
+@pytest.fixture
+def exporter():
+    exporter = Exporter(alt_console=Console(quiet=True))
+    exporter.add_result("sum(l)", "sum", 30, 2.0, 2.0, 1.0, 1.0, 3.0, [1.0, 2.0, 3.0])
+    exporter.add_result("len(l)", "len", 30, 1.0, 1.0, 0.5, 0.5, 1.5)
+    return exporter
+
+
+def test_export_json_same_keys_with_npy_samples(exporter, tmp_path):
+    exporter.export_json(tmp_path / "plain.json")
+    exporter.export_json(tmp_path / "npy.json", npy_samples=True)
+    plain = json.loads((tmp_path / "plain.json").read_text())["results"]
+    npy = json.loads((tmp_path / "npy.json").read_text())["results"]
+    assert [list(i) for i in plain] == [list(i) for i in npy] == [list(RESULT_FIELDS)] * 2
+    assert npy[0]["timings"] == {"offset": 0, "count": 3}
+    assert npy[1]["timings"] is None
+
+
+def test_export_csv(exporter, tmp_path):
+    exporter.export_csv(tmp_path / "results.csv")
+    header, *rows = (tmp_path / "results.csv").read_text().splitlines()
+    # The raw samples and the latency columns (without --latency) aren't exported to tables
+    assert header == "Snippet Code,Snippet Name,Runs,Mean,Median,Min,Max,Standard Deviation"
+    assert rows[0] == "sum(l),sum,30,2.0,2.0,1.0,3.0,1.0"
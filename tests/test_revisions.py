@@ -0,0 +1,73 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+from rich.console import Console
+
+from fastero.revisions import interleaved_benchmark, make_speedup_table
+
+
+class FakeWorker:
+    def __init__(self, name, calls):
+        self.name = name
+        self.calls = calls
+
+    def time(self, code, setup, number):
+        self.calls.append((self.name, number))
+        if not number:
+            return 1000, 0.01
+        return number, number * 1e-6
+
+
+def test_interleaved_benchmark():
+    calls = []
+    workers = [FakeWorker("base", calls), FakeWorker("head", calls)]
+    rounds = []
+    number, timings = interleaved_benchmark(workers, "pass", "pass", 3, 0.1, warmup=1, callback=rounds.append)
+    # The batch is scaled from the 1000 runs in 10ms found by autorange to fill 100ms
+    assert number == 10000
+    assert [name for name, _ in calls] == ["base", "base", "head", "base", "head", "head", "base", "base", "head"]
+    assert timings == [[pytest.approx(1e-6)] * 3] * 2
+    assert rounds == [1, 2, 3]
+
+
+@pytest.mark.parametrize("low, high, verdict", [(1.1, 1.3, "faster"), (0.7, 0.9, "slower"), (0.9, 1.1, "unchanged")])
+def test_speedup_table(low, high, verdict):
+    comparison = {"name": "parse", "means": [2e-6, 1e-6], "speedup": (low + high) / 2, "low": low, "high": high}
+    console = Console(width=200, record=True)
+    console.print(make_speedup_table([comparison], ["main", "feature"], "dynamic", 0.95))
+    assert verdict in console.export_text()
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_revisions_command(run_fastero, tmp_path):
+    def git(*arguments):
+        subprocess.run(
+            ["git", "-c", "user.name=fastero", "-c", "user.email=fastero@example.com", *arguments],
+            cwd=tmp_path, check=True, capture_output=True,
+        )
+
+    git("init", "-q")
+    for value in (1, 2):
+        (tmp_path / "mod.py").write_text(f"def value():\n    return {value}\n")
+        git("add", "mod.py")
+        git("commit", "-q", "-m", f"Return {value}")
+
+    process = run_fastero(
+        "revisions", "HEAD~1", "HEAD", "--rounds", "2", "--warmup", "0", "--time-per-batch", "10ms",
+        "--setup", "import mod", "--export-json", "out.json", "-n", "value", "--", "mod.value()",
+    )
+    assert process.returncode == 0, process.stderr
+    names = [result["snippet_name"] for result in json.loads((tmp_path / "out.json").read_text())["results"]]
+    assert names == ["value @ HEAD~1", "value @ HEAD"]
+    # The worktrees are removed afterwards
+    assert "fastero-revisions" not in subprocess.run(
+        ["git", "worktree", "list"], cwd=tmp_path, capture_output=True, text=True
+    ).stdout
+
+
+def test_revisions_outside_repository(run_fastero, tmp_path):
+    process = run_fastero("revisions", "HEAD~1", "HEAD", "--", "1 + 1")
+    assert process.returncode == 1
+    assert "Not in a git repository" in process.stderr
@@ -0,0 +1,86 @@
+import json
+import struct
+from array import array
+
+import pytest
+
+from fastero.samples import load_export, npy_filename, read_npy, write_npy
+
+INTEGER_HEADER = b"{'descr': '<i8', 'fortran_order': False, 'shape': (0,), }".ljust(70)
+
+
+def test_npy_filename():
+    assert npy_filename("out/results.json").as_posix() == "out/results.samples.npy"
+
+
+@pytest.mark.parametrize("samples", [
+    [array("d", [1.0, 2.0]), None, [3.5]],
+    [[0.25] * 1000],
+    [None],
+])
+def test_npy_round_trip(tmp_path, samples):
+    path = tmp_path / "samples.npy"
+    locations = write_npy(path, samples)
+    values = read_npy(path)
+    assert len(locations) == len(samples)
+    for location, timings in zip(locations, samples):
+        if timings is None:
+            assert location is None
+        else:
+            offset, count = location
+            assert list(values[offset:offset + count]) == list(timings)
+
+
+def test_npy_rewrite_mapped_samples(tmp_path):
+    path = tmp_path / "samples.npy"
+    write_npy(path, [[1.0, 2.0], [3.0]])
+    values = read_npy(path)
+    # The samples being written are views of the file they replace
+    locations = write_npy(path, [values[:2], values[2:]])
+    assert locations == [(0, 2), (2, 1)]
+    assert list(read_npy(path)) == [1.0, 2.0, 3.0]
+    assert [i.name for i in tmp_path.iterdir()] == ["samples.npy"]
+
+
+def test_npy_data_is_aligned(tmp_path):
+    path = tmp_path / "samples.npy"
+    write_npy(path, [[1.0]])
+    data = path.read_bytes()
+    header_length, = struct.unpack_from("<H", data, 8)
+    assert (10 + header_length) % 64 == 0
+    assert data[10 + header_length - 1:10 + header_length] == b"\n"
+
+
+@pytest.mark.parametrize("content", [b"not numpy", b"\x93NUMPY\x01\x00" + struct.pack("<H", 70) + INTEGER_HEADER])
+def test_read_invalid_npy(tmp_path, content):
+    path = tmp_path / "samples.npy"
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        read_npy(path)
+
+
+def test_load_export(tmp_path):
+    path = tmp_path / "results.json"
+    locations = write_npy(npy_filename(path), [[1.0, 2.0], [3.0]])
+    path.write_text(json.dumps({
+        "samples": {"file": npy_filename(path).name},
+        "results": [{"timings": {"offset": offset, "count": count}} for offset, count in locations],
+    }))
+    assert [list(result["timings"]) for result in load_export(path)["results"]] == [[1.0, 2.0], [3.0]]
+
+
+def test_npy_samples_option(run_fastero, tmp_path):
+    process = run_fastero("--no-check-system", "--runs", "10", "--export-json", "out.json", "--npy-samples", "1 + 1")
+    assert process.returncode == 0, process.stderr
+    result, = load_export(tmp_path / "out.json")["results"]
+    assert len(result["timings"]) > 0 and all(i > 0 for i in result["timings"])
+
+
+@pytest.mark.parametrize("arguments", [("-f", "out.json", "-e"), ("merge", "out.json")])
+def test_npy_samples_export_to_same_file(run_fastero, tmp_path, arguments):
+    export = ("--export-json", "out.json", "--npy-samples")
+    assert run_fastero("--no-check-system", "--runs", "10", *export, "1 + 1").returncode == 0
+    timings = list(load_export(tmp_path / "out.json")["results"][0]["timings"])
+    process = run_fastero(*arguments, *export)
+    assert process.returncode == 0, process.stderr
+    assert list(load_export(tmp_path / "out.json")["results"][0]["timings"]) == timings
@@ -0,0 +1,71 @@
+import json
+import os
+
+import click
+import pytest
+
+from fastero.shell import CommandFailed, run_command, run_prepare, shell_arguments
+
+posix_only = pytest.mark.skipif(os.name == "nt", reason="uses a POSIX shell")
+
+
+@pytest.mark.parametrize("shell, expected", [
+    ("none", None),
+    ("bash", ["bash", "-c"]),
+    ("bash -e -c", ["bash", "-e", "-c"]),
+    ("cmd.exe", ["cmd.exe", "/C"]),
+])
+def test_shell_arguments(shell, expected):
+    assert shell_arguments(shell) == expected
+
+
+@posix_only
+def test_run_command():
+    assert run_command("true", ["/bin/sh", "-c"]) > 0
+    assert run_command("true", None) > 0
+    with pytest.raises(CommandFailed) as info:
+        run_command("echo oops >&2; exit 3", ["/bin/sh", "-c"])
+    assert info.value.returncode == 3 and info.value.stderr.strip() == "oops"
+
+
+@posix_only
+def test_run_prepare(tmp_path):
+    run_prepare(f"touch {tmp_path / 'prepared'}", ["/bin/sh", "-c"])
+    assert (tmp_path / "prepared").exists()
+    run_prepare(None, ["/bin/sh", "-c"])
+    with pytest.raises(click.ClickException):
+        run_prepare("false", ["/bin/sh", "-c"])
+
+
+@posix_only
+def test_shell_option(run_fastero, tmp_path):
+    process = run_fastero("--no-check-system", "--shell", "--runs", "3", "--prepare", "echo x >> prepared",
+                          "--export-json", "out.json", "true")
+    assert process.returncode == 0, process.stderr
+    assert json.loads((tmp_path / "out.json").read_text())["results"][0]["runs"] == 3
+    # The prepare command runs before every run, including the calibration
+    assert len((tmp_path / "prepared").read_text().splitlines()) >= 3
+    assert run_fastero("--no-check-system", "--shell", "--runs", "3", "false").returncode == 1
+
+
+@posix_only
+def test_commands_faster_than_the_shell(run_fastero, tmp_path):
+    process = run_fastero(
+        "--no-check-system", "--shell", "--total-time", "300ms", "--export-json", "out.json", "true", "sleep 0.01"
+    )
+    assert process.returncode == 0, process.stderr
+    assert "took less than starting the shell" in process.stderr
+    # The raw times are kept instead of being cut off at 0
+    assert all(result["min"] > 0 for result in json.loads((tmp_path / "out.json").read_text())["results"])
+
+
+def test_summary_with_zero_times(run_fastero, tmp_path):
+    results = [
+        {"snippet_code": code, "snippet_name": code, "runs": 2, "mean": 0.0, "median": 0.0, "stddev": 0.0,
+         "min": 0.0, "max": 0.0, "timings": [0.0, 0.0]}
+        for code in ("1 + 1", "2 + 2")
+    ]
+    (tmp_path / "results.json").write_text(json.dumps({"results": results}))
+    process = run_fastero("--from-json", "results.json", "--only-export")
+    assert process.returncode == 0, process.stderr
+    assert "- (- … -) times faster than" in process.stdout
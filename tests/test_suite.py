@@ -0,0 +1,79 @@
+import json
+
+import click
+import pytest
+
+from fastero.suite import filter_benchmarks, load_suite, matches_keyword
+
+DEFAULTS = {"warmup": None, "runs": None, "min_runs": 2, "max_runs": None, "total_time": 3.0,
+            "time_per_batch": 0.2, "input": None, "input_pool": 1000}
+
+
+@pytest.fixture
+def suite_file(tmp_path):
+    path = tmp_path / "suite.json"
+    path.write_text(json.dumps({
+        "setup": "import json",
+        "options": {"runs": 5},
+        "tags": ["all"],
+        "groups": [
+            {
+                "name": "parsing",
+                "setup": "data = '[1, 2]'",
+                "tags": ["json"],
+                "benchmarks": [
+                    {"name": "loads", "code": "json.loads(data)", "tags": ["fast"]},
+                    {"name": "eval", "code": "eval(data)", "options": {"total-time": "1s"}},
+                ],
+            },
+            {
+                "name": "dumping",
+                "benchmarks": ["json.dumps([1, 2])"],
+            },
+        ],
+    }))
+    return path
+
+
+def test_load_suite(suite_file):
+    setup, benchmarks = load_suite(suite_file, DEFAULTS)
+    assert setup == "import json"
+    assert [i["snippet_name"] for i in benchmarks] == ["parsing/loads", "parsing/eval", "dumping/Benchmark 1"]
+    assert benchmarks[0]["setup"] == "import json\ndata = '[1, 2]'"
+    assert benchmarks[0]["tags"] == ["all", "json", "fast"]
+    assert benchmarks[0]["options"]["runs"] == 5
+    assert benchmarks[1]["options"]["total_time"] == 1.0
+    assert benchmarks[2]["options"]["total_time"] == 3.0
+
+
+def test_load_suite_unknown_option(tmp_path):
+    path = tmp_path / "suite.json"
+    path.write_text(json.dumps({"options": {"color": "red"}, "groups": []}))
+    with pytest.raises(click.BadParameter):
+        load_suite(path, DEFAULTS)
+
+
+@pytest.mark.parametrize("expression, names", [
+    ("loads", ["parsing/loads"]),
+    ("PARSING", ["parsing/loads", "parsing/eval"]),
+    ("fast or dumping", ["parsing/loads", "dumping/Benchmark 1"]),
+    ("json and not fast", ["parsing/eval"]),
+    ("not (parsing or dumping)", []),
+    ("", ["parsing/loads", "parsing/eval", "dumping/Benchmark 1"]),
+])
+def test_filter_benchmarks(suite_file, expression, names):
+    _, benchmarks = load_suite(suite_file, DEFAULTS)
+    assert [i["snippet_name"] for i in filter_benchmarks(benchmarks, expression)] == names
+
+
+def test_invalid_keyword_expression():
+    with pytest.raises(click.BadParameter):
+        matches_keyword("fast and", {"snippet_name": "fast", "tags": []})
+
+
+def test_keyword_option(run_fastero):
+    process = run_fastero(
+        "--no-check-system", "--json", "--runs", "10", "-k", "second", "-n", "first", "-n", "second", "1 + 1", "2 + 2"
+    )
+    assert process.returncode == 0
+    assert [i["snippet_name"] for i in json.loads(process.stdout)["results"]] == ["second"]
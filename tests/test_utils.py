@@ -0,0 +1,76 @@
+import json
+from pathlib import Path
+
+import click
+import pytest
+
+from fastero.utils import (histogram_counts, is_file_directive, make_sparkline, mean_or_min, parse_file_directive,
+                           read_file_directive, select_lines)
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+def test_histogram_counts():
+    assert histogram_counts([1, 2, 3, 4], 3) == [1, 1, 2]
+    assert histogram_counts([1, 1, 1], 4) == [3, 0, 0, 0]
+    # Timings outside of the range go in the first or the last bin
+    assert histogram_counts([0, 5, 10, 20], 2, low=5, high=15) == [2, 2]
+
+
+def test_sparkline_shows_gaps():
+    sparkline = make_sparkline([1, 1, 1, 1, 10, 10], bins=10)
+    assert len(sparkline.plain) == 10
+    assert sparkline.plain[0] == "█"
+    assert sparkline.plain[1:9] == " " * 8
+    assert sparkline.plain[9] == "▄"
+    assert set(make_sparkline([1, 2, 2, 3], bins=3, ascii_only=True).plain) <= set(".:-=+*#@")
+
+
+def test_only_export_without_timings(run_fastero, tmp_path):
+    export = EXAMPLES / "export" / "python_http_library_benchmark.json"
+    process = run_fastero("--from-json", str(export), "--only-export", "--export-json", "out.json")
+    assert process.returncode == 0, process.stderr
+    results = json.loads((tmp_path / "out.json").read_text())["results"]
+    assert len(results) == len(json.loads(export.read_text())["results"])
+
+
+@pytest.mark.parametrize("directive, expected", [
+    ("file: bench.py", ("bench.py", None, None)),
+    ("file:bench.py:3", ("bench.py", 3, 3)),
+    ("file: bench.py:3-5", ("bench.py", 3, 5)),
+    ("file: bench.py:3-", ("bench.py", 3, None)),
+])
+def test_parse_file_directive(directive, expected):
+    assert is_file_directive(directive)
+    assert parse_file_directive(directive) == expected
+
+
+def test_escaped_file_directive():
+    assert not is_file_directive("file:  not a file")
+
+
+def test_select_lines():
+    code = "def f():\n    a = 1\n    b = 2\n    return a + b\n"
+    assert select_lines(code) == code
+    assert select_lines(code, 2, 3) == "a = 1\nb = 2\n"
+    assert select_lines(code, 3, None) == "b = 2\nreturn a + b\n"
+    with pytest.raises(click.BadParameter):
+        select_lines(code, 5, 6)
+    with pytest.raises(click.BadParameter):
+        select_lines(code, 3, 2)
+
+
+def test_read_file_directive(tmp_path):
+    path = tmp_path / "bench.py"
+    path.write_text("import math\nfor i in range(3):\n    math.sqrt(i)\n")
+    assert read_file_directive(f"file: {path}:3") == ("math.sqrt(i)\n", str(path), 3)
+    assert read_file_directive(f"file: {path}")[0] == path.read_text()
+
+
+@pytest.mark.parametrize("result, expected", [
+    ({"mean": 2.0, "min": 1.0}, 2.0),
+    # A single batch has no mean
+    ({"mean": -1, "min": 1.0}, 1.0),
+])
+def test_mean_or_min(result, expected):
+    assert mean_or_min(result) == expected